@@ -0,0 +1,93 @@
+"""
+Cost of HTML escaping during serialization.
+
+Times to_html over the node trees of a synthetic corpus twice: as shipped,
+and with escape_text and props_to_html swapped for unescaped versions. The
+difference is what escaping costs serialization. For reference it also
+times the escaping functions alone and html.escape on the same strings.
+
+    python3 bench/bench_escape.py [--shape inline] [--pages 50] [--repeat 5]
+"""
+import argparse
+import html
+import os
+import sys
+import tempfile
+import time
+from unittest import mock
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+import htmlnode
+import leafnode
+from corpus import SHAPES, generate_corpus
+from escape import escape_text, props_to_html
+from textutils import markdown_to_html_node
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def collect(node, values, props):
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node.props is not None:
+            props.append(node.props)
+        if node.children is None:
+            values.append(node.value)
+        else:
+            stack.extend(node.children)
+
+
+def unescaped_props(props):
+    return "".join([f' {name}="{value}"' for name, value in props.items()])
+
+
+def serialize_unescaped(trees, repeat):
+    with mock.patch.object(leafnode, "escape_text", str), \
+            mock.patch.object(htmlnode, "props_to_html", unescaped_props):
+        return best_of(lambda: [tree.to_html() for tree in trees], repeat)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shape", choices=sorted(SHAPES), default="inline")
+    parser.add_argument("--pages", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        paths = generate_corpus(work_dir, args.shape, pages=args.pages)
+        sources = []
+        for path in paths:
+            with open(path) as f:
+                sources.append(f.read())
+    trees = [markdown_to_html_node(markdown) for markdown in sources]
+    values = []
+    props = []
+    for tree in trees:
+        collect(tree, values, props)
+
+    serialize = best_of(lambda: [tree.to_html() for tree in trees], args.repeat)
+    plain = serialize_unescaped(trees, args.repeat)
+    text = best_of(lambda: [escape_text(value) for value in values], args.repeat)
+    attrs = best_of(lambda: [props_to_html(p) for p in props], args.repeat)
+    stdlib = best_of(lambda: [html.escape(value, quote=False) for value in values], args.repeat)
+
+    print(f"{args.shape}: {len(trees)} page(s), {len(values)} leaf values, {len(props)} props dicts")
+    print(f"  to_html (escaped)      {serialize * 1000:10.2f} ms")
+    print(f"  to_html (unescaped)    {plain * 1000:10.2f} ms  escaping adds {serialize / plain - 1:6.1%}")
+    print(f"  escape_text alone      {text * 1000:10.2f} ms")
+    print(f"  props_to_html alone    {attrs * 1000:10.2f} ms  (cached)")
+    print(f"  html.escape            {stdlib * 1000:10.2f} ms  ({stdlib / text:.1f}x escape_text)")
+
+if __name__ == "__main__":
+    main()
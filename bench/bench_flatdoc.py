@@ -0,0 +1,81 @@
+"""
+Flat array document versus the node tree on large pages.
+
+Measures the memory retained by each representation with tracemalloc and
+the time to build and to render it, on the same synthetic corpus.
+
+    python3 bench/bench_flatdoc.py [--shape huge] [--pages 2] [--repeat 3]
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from corpus import SHAPES, generate_corpus
+from flatdoc import render_flat_document
+from textutils import markdown_to_flat_document, markdown_to_html_node
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def retained(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shape", choices=sorted(SHAPES), default="huge")
+    parser.add_argument("--pages", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        paths = generate_corpus(work_dir, args.shape, pages=args.pages)
+        sources = []
+        for path in paths:
+            with open(path) as f:
+                sources.append(f.read())
+
+    trees, tree_bytes = retained(lambda: [markdown_to_html_node(markdown) for markdown in sources])
+    docs, flat_bytes = retained(lambda: [markdown_to_flat_document(markdown) for markdown in sources])
+    for tree, doc in zip(trees, docs):
+        assert tree.to_html() == render_flat_document(doc)
+
+    rows = [
+        ("build", best_of(lambda: [markdown_to_html_node(m) for m in sources], args.repeat),
+         best_of(lambda: [markdown_to_flat_document(m) for m in sources], args.repeat)),
+        ("render", best_of(lambda: [tree.to_html() for tree in trees], args.repeat),
+         best_of(lambda: [render_flat_document(doc) for doc in docs], args.repeat)),
+    ]
+    size = sum(len(markdown) for markdown in sources)
+    nodes = sum(len(doc) for doc in docs)
+    print(f"{args.shape}: {len(sources)} page(s), {size / 1e6:.2f} MB of Markdown, {nodes} nodes")
+    print(f"  {'':<16} {'tree':>12} {'flat':>12} {'ratio':>8}")
+    print(f"  {'retained MiB':<16} {tree_bytes / 2**20:>12.2f} {flat_bytes / 2**20:>12.2f} "
+          f"{flat_bytes / tree_bytes:>8.2f}")
+    for name, tree_seconds, flat_seconds in rows:
+        print(f"  {name + ' ms':<16} {tree_seconds * 1000:>12.1f} {flat_seconds * 1000:>12.1f} "
+              f"{flat_seconds / tree_seconds:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
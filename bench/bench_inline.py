@@ -0,0 +1,60 @@
+"""
+Inline tokenizer throughput on inline-heavy paragraphs.
+
+Compares the single-pass scanner behind text_to_textnodes with the previous
+five-pass pipeline built from the split_nodes_* helpers.
+
+    python3 bench/bench_inline.py [--paragraphs 2000]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from corpus import inline_text
+from textnode import TextNode, TextType
+from textutils import split_nodes_delimiter, split_nodes_image, split_nodes_link, text_to_textnodes
+
+
+def multipass_text_to_textnodes(text):
+    nodes = [TextNode(text, TextType.TEXT)]
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_image(nodes)
+    nodes = split_nodes_link(nodes)
+    return nodes
+
+
+def best_of(fn, repeat=7):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--paragraphs", type=int, default=2000)
+    args = parser.parse_args()
+
+    count = args.paragraphs
+    rng = random.Random(0)
+    for spans in (10, 40, 160):
+        texts = [inline_text(rng, spans) for _ in range(count)]
+        assert [multipass_text_to_textnodes(t) for t in texts] == [text_to_textnodes(t) for t in texts]
+        mb = sum(len(t) for t in texts) / 1e6
+        multipass = best_of(lambda: [multipass_text_to_textnodes(t) for t in texts])
+        single = best_of(lambda: [text_to_textnodes(t) for t in texts])
+        print(f"{spans:>4} spans/paragraph: multi-pass {mb / multipass:6.1f} MB/s, "
+              f"single-pass {mb / single:6.1f} MB/s ({multipass / single:.2f}x)")
+
+
+if __name__ == "__main__":
+    main()
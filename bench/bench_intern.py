@@ -0,0 +1,91 @@
+"""
+Subtree interning on a site with repeated fragments.
+
+Each page of a synthetic corpus gets the same navigation list, callout and
+footer appended. Compares the memory retained by the plain node trees with
+the interned frozen trees, and the time to serialize every page from cold
+(interned fragments are serialized once and reused).
+
+    python3 bench/bench_intern.py [--shape small] [--pages 200] [--repeat 3]
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from corpus import SHAPES, generate_corpus
+from frozennode import NodeInterner
+from textutils import markdown_to_html_node
+
+BOILERPLATE = "\n\n".join([
+    "* [Home](/)\n* [Guides](/guides/)\n* [Reference](/reference/)\n* [Blog](/blog/)\n* [About](/about/)",
+    "> **Note:** this site is generated from *Markdown* sources; see the `README` for details.",
+    "1. [Edit this page](/edit/)\n2. [Report an issue](/issues/)\n3. [License](/license/)",
+])
+
+
+def retained(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def cold_serialize(sources, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        interner = NodeInterner()
+        trees = [interner.intern(markdown_to_html_node(markdown)) for markdown in sources]
+        start = time.perf_counter()
+        for tree in trees:
+            tree.to_html()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shape", choices=sorted(SHAPES), default="small")
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        paths = generate_corpus(work_dir, args.shape, pages=args.pages)
+        sources = []
+        for path in paths:
+            with open(path) as f:
+                sources.append(f"{f.read()}\n\n{BOILERPLATE}")
+
+    trees, tree_bytes = retained(lambda: [markdown_to_html_node(markdown) for markdown in sources])
+    interner = NodeInterner()
+    interned, interned_bytes = retained(lambda: [interner.intern(markdown_to_html_node(m)) for m in sources])
+    for tree, frozen in zip(trees, interned):
+        assert tree.to_html() == frozen.to_html()
+
+    plain = float("inf")
+    for _ in range(args.repeat):
+        start = time.perf_counter()
+        for tree in trees:
+            tree.to_html()
+        plain = min(plain, time.perf_counter() - start)
+    cold = cold_serialize(sources, args.repeat)
+
+    print(f"{args.shape}: {len(sources)} page(s), {len(interner)} distinct subtrees, {interner.hits} shared")
+    print(f"  {'':<18} {'plain':>10} {'interned':>10} {'ratio':>8}")
+    print(f"  {'retained MiB':<18} {tree_bytes / 2**20:>10.2f} {interned_bytes / 2**20:>10.2f} "
+          f"{interned_bytes / tree_bytes:>8.2f}")
+    print(f"  {'serialize ms':<18} {plain * 1000:>10.2f} {cold * 1000:>10.2f} {cold / plain:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
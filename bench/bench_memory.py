@@ -0,0 +1,112 @@
+"""
+Memory footprint of the node model, measured with tracemalloc.
+
+Builds the node trees for a synthetic corpus twice: with the slotted node
+classes used by the pipeline, and with copies of the previous
+__dict__-based classes (TextNode storing the enum's .value string). Prints
+bytes per node and per page for both.
+
+    python3 bench/bench_memory.py [--shape inline] [--pages 50]
+"""
+import argparse
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from corpus import SHAPES, generate_corpus
+from leafnode import LeafNode
+from parentnode import ParentNode
+from textnode import TextNode
+from textutils import markdown_to_html_node, text_to_textnodes, markdown_to_blocks
+
+
+class DictHTMLNode():
+    def __init__(self, tag=None, value=None, children=None, props=None):
+        self.tag = tag
+        self.value = value
+        self.children = children
+        self.props = props
+
+
+class DictTextNode():
+    def __init__(self, text, text_type, url=None):
+        self.text = text
+        self.text_type = text_type.value
+        self.url = url
+
+
+def to_dict_tree(node):
+    if isinstance(node, LeafNode):
+        return DictHTMLNode(node.tag, node.value, None, node.props)
+    return DictHTMLNode(node.tag, None, [to_dict_tree(child) for child in node.children], node.props)
+
+
+def to_slotted_tree(node):
+    if isinstance(node, LeafNode):
+        return LeafNode(node.tag, node.value, node.props)
+    return ParentNode(node.tag, [to_slotted_tree(child) for child in node.children], node.props)
+
+
+def count_nodes(node):
+    if node.children is None:
+        return 1
+    return 1 + sum(count_nodes(child) for child in node.children)
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    result = build()
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, after - before
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--shape", choices=sorted(SHAPES), default="inline")
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        paths = generate_corpus(work_dir, args.shape, pages=args.pages)
+        sources = []
+        for path in paths:
+            with open(path) as f:
+                sources.append(f.read())
+
+    trees, full = measure(lambda: [markdown_to_html_node(markdown) for markdown in sources])
+    nodes = sum(count_nodes(tree) for tree in trees)
+    # copies of the same trees share their strings and props dicts, so these
+    # two numbers isolate the node objects and child lists
+    _, slotted = measure(lambda: [to_slotted_tree(tree) for tree in trees])
+    _, dict_based = measure(lambda: [to_dict_tree(tree) for tree in trees])
+
+    texts = [block.replace("\n", " ") for markdown in sources for block in markdown_to_blocks(markdown)
+             if not block.startswith(("#", "```", ">", "* ", "- "))]
+    text_nodes = [text_to_textnodes(text) for text in texts]
+    count = sum(len(group) for group in text_nodes)
+    _, slotted_text = measure(lambda: [[TextNode(n.text, n.text_type, n.url) for n in group]
+                                       for group in text_nodes])
+    _, dict_text = measure(lambda: [[DictTextNode(n.text, n.text_type, n.url) for n in group]
+                                    for group in text_nodes])
+
+    pages = len(sources)
+    print(f"{args.shape}: {pages} page(s), {nodes} HTML nodes, {count} TextNodes")
+    print(f"  full tree per page (nodes, strings, props): {full / pages / 1024:8.1f} KiB")
+    print(f"  {'':<28} {'slotted':>10} {'__dict__':>10} {'saved':>8}")
+    print(f"  {'HTML node bytes/node':<28} {slotted / nodes:>10.0f} {dict_based / nodes:>10.0f} "
+          f"{1 - slotted / dict_based:>8.0%}")
+    print(f"  {'HTML node KiB/page':<28} {slotted / pages / 1024:>10.1f} {dict_based / pages / 1024:>10.1f}")
+    print(f"  {'TextNode bytes/node':<28} {slotted_text / count:>10.0f} {dict_text / count:>10.0f} "
+          f"{1 - slotted_text / dict_text:>8.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+"""
+Serialization throughput on pages with thousands of blocks.
+
+Compares the iterative serializer behind HTMLNode.to_html / render_to with the
+old recursive `children_html += child.to_html()` implementation, on flat
+pages and on deeply nested trees where every level of the recursive version
+copies the whole subtree string again.
+
+    python3 bench/bench_serializer.py [--blocks 1000 5000 20000]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+from leafnode import LeafNode
+from parentnode import ParentNode
+from textutils import markdown_to_html_node
+
+
+def recursive_to_html(node):
+    if isinstance(node, LeafNode):
+        return node.to_html()
+    children_html = ""
+    for child in node.children:
+        children_html += recursive_to_html(child)
+    return f"<{node.tag}{node.props_to_html()}>{children_html}</{node.tag}>"
+
+
+def make_markdown(blocks):
+    parts = []
+    for i in range(blocks):
+        kind = i % 4
+        if kind == 0:
+            parts.append(f"## Section {i}")
+        elif kind == 1:
+            parts.append(f"Paragraph {i} with **bold**, *italic*, `code` and a [link](/page/{i}).")
+        elif kind == 2:
+            parts.append("\n".join(f"- item {j} of list {i}" for j in range(5)))
+        else:
+            parts.append(f"> quoted line {i}\n> and another")
+    return "\n\n".join(parts)
+
+
+def make_nested(depth, leaves_per_level=20):
+    node = ParentNode("div", [LeafNode("p", "bottom")])
+    for level in range(depth):
+        leaves = [LeafNode("span", f"level {level} leaf {i}") for i in range(leaves_per_level)]
+        node = ParentNode("div", leaves + [node])
+    return node
+
+
+def best_of(fn, repeat=20):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--blocks", type=int, nargs="+", default=[1000, 5000, 20000])
+    args = parser.parse_args()
+
+    sizes = args.blocks
+    print(f"{'blocks':>8} {'size MB':>8} {'recursive MB/s':>15} {'to_html MB/s':>13} {'render_to MB/s':>15}")
+    for blocks in sizes:
+        node = markdown_to_html_node(make_markdown(blocks))
+        html = node.to_html()
+        assert html == recursive_to_html(node)
+        mb = len(html) / 1e6
+        recursive = best_of(lambda: recursive_to_html(node))
+        iterative = best_of(node.to_html)
+        streamed = best_of(lambda: node.render_to(io.StringIO()))
+        print(f"{blocks:>8} {mb:>8.2f} {mb / recursive:>15.1f} {mb / iterative:>13.1f} {mb / streamed:>15.1f}")
+
+    print()
+    print(f"{'depth':>8} {'size MB':>8} {'recursive MB/s':>15} {'to_html MB/s':>13}")
+    for depth in (100, 400, 800, 5000):
+        node = make_nested(depth)
+        mb = len(node.to_html()) / 1e6
+        iterative = best_of(node.to_html)
+        try:
+            recursive = f"{mb / best_of(lambda: recursive_to_html(node)):.1f}"
+        except RecursionError:
+            recursive = "RecursionError"
+        print(f"{depth:>8} {mb:>8.2f} {recursive:>15} {mb / iterative:>13.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Synthetic Markdown corpus generator for the benchmark suite.
+
+Each shape stresses a different part of the pipeline:
+
+    small     many small pages with a few mixed blocks each
+    huge      a few very long pages
+    inline    paragraphs dense with bold/italic/code/links/images
+    lists     long unordered and ordered lists
+    code      large fenced code blocks
+
+    python3 bench/corpus.py OUT_DIR --shape small --pages 1000
+"""
+import argparse
+import os
+import random
+
+WORDS = (
+    "the ring hobbit shire elves dwarves wizard mordor gondor rohan road "
+    "mountain river forest tower king steward journey fellowship shadow light"
+).split()
+
+SHAPES = {
+    # shape: (default pages, blocks per page)
+    "small": (500, 8),
+    "huge": (4, 4000),
+    "inline": (100, 60),
+    "lists": (100, 20),
+    "code": (100, 20),
+}
+
+
+def words(rng, count):
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def inline_text(rng, count):
+    parts = []
+    for i in range(count):
+        kind = rng.randrange(8)
+        word = rng.choice(WORDS)
+        if kind == 0:
+            parts.append(f"**{word}**")
+        elif kind == 1:
+            parts.append(f"*{word}*")
+        elif kind == 2:
+            parts.append(f"`{word}()`")
+        elif kind == 3:
+            parts.append(f"[{word}](/{word}/{i})")
+        elif kind == 4:
+            parts.append(f"![{word}](/images/{word}.png)")
+        else:
+            parts.append(words(rng, 3))
+    return " ".join(parts)
+
+
+def make_block(rng, shape, index):
+    if shape == "inline":
+        return inline_text(rng, 40)
+    if shape == "lists":
+        if index % 2:
+            return "\n".join(f"{i}. {inline_text(rng, 3)}" for i in range(1, 31))
+        return "\n".join(f"- {inline_text(rng, 3)}" for _ in range(30))
+    if shape == "code":
+        if index % 2:
+            return f"paragraph about {words(rng, 12)}"
+        lines = [f"    call_{rng.choice(WORDS)}({i}, {rng.randrange(100)})" for i in range(60)]
+        return "```\n" + "\n".join(["def generated():"] + lines) + "\n```"
+    kind = index % 6
+    if kind == 0:
+        return f"## {words(rng, 4)}"
+    if kind == 1:
+        return "\n".join(f"> {words(rng, 8)}" for _ in range(2))
+    if kind == 2:
+        return "\n".join(f"* {inline_text(rng, 2)}" for _ in range(4))
+    return inline_text(rng, 12)
+
+
+def make_page(rng, shape, blocks):
+    parts = [f"# {words(rng, 3).title()}"]
+    for index in range(blocks):
+        parts.append(make_block(rng, shape, index))
+    return "\n\n".join(parts) + "\n"
+
+
+def generate_corpus(out_dir, shape="small", pages=None, blocks=None, seed=0):
+    """Write a deterministic content tree for `shape`; returns the page paths."""
+    default_pages, default_blocks = SHAPES[shape]
+    pages = default_pages if pages is None else pages
+    blocks = default_blocks if blocks is None else blocks
+    rng = random.Random(f"{shape}-{seed}")
+    paths = []
+    for i in range(pages):
+        dir_path = os.path.join(out_dir, f"section{i % 10}")
+        os.makedirs(dir_path, exist_ok=True)
+        path = os.path.join(dir_path, f"page{i}.md")
+        with open(path, "w") as f:
+            f.write(make_page(rng, shape, blocks))
+        paths.append(path)
+    return paths
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic Markdown content tree")
+    parser.add_argument("out_dir")
+    parser.add_argument("--shape", choices=sorted(SHAPES), default="small")
+    parser.add_argument("--pages", type=int)
+    parser.add_argument("--blocks", type=int)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    paths = generate_corpus(args.out_dir, args.shape, args.pages, args.blocks, args.seed)
+    print(f"Wrote {len(paths)} page(s) to {args.out_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+"""
+Benchmark suite for the page pipeline.
+
+Generates a synthetic corpus per shape (see corpus.py), times
+text_to_textnodes, markdown_to_html_node, to_html, a full
+generate_pages_recursive build, the same build from and to memory through
+build_site (no disk I/O) and a from-scratch search index, writes the results to JSON and compares them
+with a saved baseline. Exits with status 1 when any case is slower than the
+baseline by more than --threshold.
+
+    python3 bench/run.py --save-baseline       # record a baseline
+    python3 bench/run.py                       # compare against it
+    python3 bench/run.py --scale 0.1 --repeat 3 --shape small --shape inline
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "..", "src"))
+
+from backends import MemorySink, MemorySource
+from corpus import SHAPES, generate_corpus
+from search import SearchIndex
+from siteindex import SiteIndex
+from sitebuild import BuildConfig, build_site
+from textutils import generate_pages_recursive, markdown_to_blocks, markdown_to_html_node, text_to_textnodes
+
+DEFAULT_RESULTS = os.path.join(BENCH_DIR, "results.json")
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+TEMPLATE = "<html><head><title>{{ Title }}</title></head><body>{{ Content }}</body></html>"
+
+
+def best_of(fn, repeat):
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def inline_texts(sources):
+    texts = []
+    for markdown in sources:
+        for block in markdown_to_blocks(markdown):
+            if not block.startswith(("#", "```", ">", "* ", "- ")) and not block[:1].isdigit():
+                texts.append(block.replace("\n", " "))
+    return texts
+
+
+def run_shape(shape, work_dir, scale, repeat):
+    default_pages, _ = SHAPES[shape]
+    content_dir = os.path.join(work_dir, shape, "content")
+    paths = generate_corpus(content_dir, shape, pages=max(1, int(default_pages * scale)))
+    sources = []
+    for path in paths:
+        with open(path) as f:
+            sources.append(f.read())
+    template_path = os.path.join(work_dir, shape, "template.html")
+    with open(template_path, "w") as f:
+        f.write(TEMPLATE)
+
+    texts = inline_texts(sources)
+    nodes = [markdown_to_html_node(markdown) for markdown in sources]
+    public_dir = os.path.join(work_dir, shape, "public")
+
+    def build():
+        with contextlib.redirect_stdout(io.StringIO()):
+            generate_pages_recursive(content_dir, template_path, public_dir)
+
+    memory_files = {"template.html": TEMPLATE}
+    for path, markdown in zip(paths, sources):
+        memory_files["content/" + os.path.relpath(path, content_dir).replace(os.sep, "/")] = markdown
+    memory_source = MemorySource(memory_files)
+
+    def build_memory():
+        build_site(BuildConfig(memory_source, MemorySink()))
+
+    site_index = SiteIndex(public_dir)
+    with contextlib.redirect_stdout(io.StringIO()):
+        generate_pages_recursive(content_dir, template_path, public_dir, site_index=site_index)
+
+    def search_index():
+        index = SearchIndex()
+        index.update(site_index)
+        index.write(public_dir)
+
+    results = {
+        "markdown_to_html_node": best_of(lambda: [markdown_to_html_node(markdown) for markdown in sources], repeat),
+        "to_html": best_of(lambda: [node.to_html() for node in nodes], repeat),
+        "build": best_of(build, repeat),
+        "build_memory": best_of(build_memory, repeat),
+        "search_index": best_of(search_index, repeat),
+    }
+    if texts:
+        results["text_to_textnodes"] = best_of(lambda: [text_to_textnodes(text) for text in texts], repeat)
+    size = sum(len(markdown) for markdown in sources)
+    return {f"{shape}/{case}": seconds for case, seconds in results.items()}, len(paths), size
+
+
+def compare(results, baseline, threshold):
+    regressions = []
+    lines = [f"{'case':<34} {'baseline ms':>12} {'current ms':>12} {'change':>8}"]
+    for case, seconds in results.items():
+        before = baseline.get(case)
+        if before is None:
+            lines.append(f"{case:<34} {'-':>12} {seconds * 1000:>12.2f} {'new':>8}")
+            continue
+        change = seconds / before - 1
+        flag = ""
+        if change > threshold:
+            regressions.append(case)
+            flag = "  REGRESSION"
+        lines.append(f"{case:<34} {before * 1000:>12.2f} {seconds * 1000:>12.2f} {change:>+8.1%}{flag}")
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the Markdown pipeline on synthetic corpora")
+    parser.add_argument("--shape", action="append", choices=sorted(SHAPES),
+                        help="shape to benchmark (repeatable, default all)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply the page count of every shape")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case; the best time is kept")
+    parser.add_argument("--output", default=DEFAULT_RESULTS)
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="slowdown relative to the baseline that counts as a regression")
+    args = parser.parse_args()
+
+    results = {}
+    with tempfile.TemporaryDirectory() as work_dir:
+        for shape in args.shape or sorted(SHAPES):
+            shape_results, pages, size = run_shape(shape, work_dir, args.scale, args.repeat)
+            print(f"{shape}: {pages} page(s), {size / 1e6:.2f} MB of Markdown")
+            results.update(shape_results)
+
+    report = {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": args.scale,
+        "repeat": args.repeat,
+        "results": results,
+    }
+    with open(args.output, "w") as f:
+        json.dump(report, f, indent=1, sort_keys=True)
+    print(f"Results written to {args.output}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(report, f, indent=1, sort_keys=True)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            saved = json.load(f)
+        if saved.get("scale") != args.scale:
+            print(f"Baseline was recorded with --scale {saved.get('scale')}; times are not comparable")
+        baseline = saved["results"]
+    lines, regressions = compare(results, baseline, args.threshold)
+    print("\n".join(lines))
+    if regressions:
+        print(f"{len(regressions)} regression(s) over {args.threshold:.0%}: {', '.join(regressions)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
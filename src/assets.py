@@ -0,0 +1,171 @@
+import hashlib
+import json
+import mmap
+import os
+import posixpath
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+from discovery import PathFilter, scan_tree
+from output import load_state, save_state, write_output
+from sync import copy_file
+
+ASSETS_VERSION = 1
+# the URL -> fingerprinted URL map written next to the site for other tools
+ASSET_MANIFEST_NAME = "assets.json"
+# static files that get fingerprinted copies; everything else keeps only its plain name
+ASSET_PATTERNS = ("*.css", "*.js", "*.mjs", "*.png", "*.jpg", "*.jpeg", "*.gif", "*.webp", "*.avif",
+                  "*.svg", "*.ico", "*.woff", "*.woff2", "*.ttf", "*.otf")
+FINGERPRINT_LENGTH = 10
+# files at least this big are hashed through a memory map instead of read()
+MMAP_THRESHOLD = 1 << 20
+
+_url_attr_pattern = re.compile(r"""(\b(?:href|src)=)(["'])([^"']*)\2""")
+_url_suffix_pattern = re.compile(r"[?#]")
+
+# URL -> fingerprinted URL used while rendering, set with set_asset_urls
+_asset_urls = {}
+_asset_digest = ""
+
+
+def hash_file(path, size=None):
+    if size is None:
+        size = os.path.getsize(path)
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                digest.update(mapped)
+        else:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def fingerprint_path(rel_path, file_hash):
+    """images/a.png -> images/a.<hash prefix>.png"""
+    root, ext = posixpath.splitext(rel_path)
+    return f"{root}.{file_hash[:FINGERPRINT_LENGTH]}{ext}"
+
+
+def urls_digest(urls):
+    if not urls:
+        return ""
+    data = json.dumps(sorted(urls.items()), separators=(",", ":")).encode()
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def set_asset_urls(urls):
+    """Make asset_url and rewrite_urls use urls; returns its digest ("" when empty)."""
+    global _asset_urls, _asset_digest
+    _asset_urls = dict(urls or {})
+    _asset_digest = urls_digest(_asset_urls)
+    return _asset_digest
+
+
+def asset_urls():
+    return _asset_urls
+
+
+def asset_digest():
+    return _asset_digest
+
+
+def asset_url(url):
+    """The fingerprinted URL of a static asset, keeping any query or fragment; other URLs are returned as is."""
+    if not _asset_urls or not url:
+        return url
+    fingerprinted = _asset_urls.get(url)
+    if fingerprinted is not None:
+        return fingerprinted
+    match = _url_suffix_pattern.search(url)
+    if match is None:
+        return url
+    fingerprinted = _asset_urls.get(url[:match.start()])
+    return url if fingerprinted is None else fingerprinted + url[match.start():]
+
+
+def rewrite_urls(html):
+    """Point the href and src attributes of html at fingerprinted assets."""
+    if not _asset_urls:
+        return html
+    return _url_attr_pattern.sub(lambda m: f"{m.group(1)}{m.group(2)}{asset_url(m.group(3))}{m.group(2)}", html)
+
+
+class AssetManifest():
+    """
+    Content hashes of the static assets, kept between builds so a file is
+    only hashed again when its size or mtime changes. Changed files are
+    hashed on a thread pool (hashlib releases the GIL), large ones through
+    a memory map.
+
+    Each asset is also published under a fingerprinted name, e.g.
+    /index.css as /index.3f2a1b9c0d.css, which can be served with a
+    long-lived Cache-Control header since its content never changes.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        # static-relative path -> {"size", "mtime_ns", "hash"}
+        self.entries = {}
+        self.hashed = 0
+
+    @classmethod
+    def load(cls, path):
+        manifest = cls(path)
+        data = load_state(path, ASSETS_VERSION)
+        if data is not None:
+            manifest.entries = data.get("assets", {})
+        return manifest
+
+    def save(self):
+        if self.path is not None:
+            save_state(self.path, ASSETS_VERSION, {"assets": self.entries}, indent=1, sort_keys=True)
+
+    def update(self, static_dir, stat_cache=None, workers=None):
+        """Hash the assets under static_dir that are new or changed since the last build."""
+        static_dir = os.path.normpath(static_dir)
+        entries = {}
+        stale = []
+        for path, st in scan_tree(static_dir, PathFilter(ASSET_PATTERNS), stat_cache):
+            rel_path = os.path.relpath(path, static_dir).replace(os.sep, "/")
+            entry = self.entries.get(rel_path)
+            if entry is None or entry["size"] != st.st_size or entry["mtime_ns"] != st.st_mtime_ns:
+                entry = {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "hash": None}
+                stale.append((path, entry))
+            entries[rel_path] = entry
+        if len(stale) == 1 or workers == 1:
+            for path, entry in stale:
+                entry["hash"] = hash_file(path, entry["size"])
+        elif stale:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                hashes = executor.map(hash_file, [path for path, _ in stale], [entry["size"] for _, entry in stale])
+                for (_, entry), file_hash in zip(stale, hashes):
+                    entry["hash"] = file_hash
+        self.hashed += len(stale)
+        self.entries = entries
+
+    def urls(self):
+        """Map each asset's URL to its fingerprinted URL."""
+        return {f"/{rel_path}": f"/{fingerprint_path(rel_path, entry['hash'])}"
+                for rel_path, entry in sorted(self.entries.items())}
+
+    def write(self, static_dir, public_dir, link=False):
+        """
+        Publish the fingerprinted copies and the assets.json URL map; copies
+        that already exist are left alone. Returns every path written.
+        """
+        static_dir = os.path.normpath(static_dir)
+        written = set()
+        for rel_path, entry in self.entries.items():
+            dest = os.path.normpath(os.path.join(public_dir, fingerprint_path(rel_path, entry["hash"])))
+            written.add(dest)
+            try:
+                if os.path.getsize(dest) == entry["size"]:
+                    continue
+            except OSError:
+                os.makedirs(os.path.dirname(dest), exist_ok=True)
+            copy_file(os.path.join(static_dir, rel_path), dest, entry["size"], link)
+        manifest_path = os.path.normpath(os.path.join(public_dir, ASSET_MANIFEST_NAME))
+        write_output(manifest_path, json.dumps(self.urls(), indent=1, sort_keys=True))
+        written.add(manifest_path)
+        return written
@@ -0,0 +1,155 @@
+import io
+import os
+import posixpath
+import tarfile
+import time
+import zipfile
+
+from discovery import PathFilter, scan_tree
+from output import write_output
+
+# Sources and sinks address files by POSIX paths relative to their root,
+# e.g. "content/blog/post.md" or "blog/post.html".
+
+
+def _data(data):
+    return data.encode() if isinstance(data, str) else data
+
+
+class FileSystemSource():
+    """Reads the site's inputs from a directory on disk."""
+
+    def __init__(self, root="."):
+        self.root = os.path.normpath(str(root))
+
+    def path(self, path):
+        return os.path.normpath(os.path.join(self.root, *path.split("/")))
+
+    def files(self, dir_path, path_filter=None):
+        """Every file under dir_path that path_filter accepts, in sorted order."""
+        root = self.path(dir_path)
+        if not os.path.isdir(root):
+            return []
+        return [posixpath.join(dir_path, os.path.relpath(path, root).replace(os.sep, "/"))
+                for path, _ in scan_tree(root, path_filter)]
+
+    def isfile(self, path):
+        return os.path.isfile(self.path(path))
+
+    def read_bytes(self, path):
+        with open(self.path(path), "rb") as f:
+            return f.read()
+
+    def read_text(self, path):
+        with open(self.path(path), "r") as f:
+            return f.read()
+
+
+class MemorySource():
+    """Serves the site's inputs from a dict of path -> str or bytes."""
+
+    def __init__(self, files):
+        self.data = {posixpath.normpath(path): data for path, data in files.items()}
+
+    def files(self, dir_path, path_filter=None):
+        path_filter = PathFilter() if path_filter is None else path_filter
+        prefix = posixpath.normpath(dir_path) + "/"
+        found = []
+        for path in sorted(self.data):
+            if not path.startswith(prefix):
+                continue
+            names = path[len(prefix):].split("/")
+            if any(path_filter.is_ignored(name) for name in names) or not path_filter.accepts(names[-1]):
+                continue
+            found.append(path)
+        return found
+
+    def isfile(self, path):
+        return posixpath.normpath(path) in self.data
+
+    def read_bytes(self, path):
+        return _data(self.data[posixpath.normpath(path)])
+
+    def read_text(self, path):
+        data = self.data[posixpath.normpath(path)]
+        return data if isinstance(data, str) else data.decode()
+
+
+class Sink():
+    """Where a build's outputs go; use as a context manager, or call close() when done."""
+
+    def write(self, path, data):
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FileSystemSink(Sink):
+    """Writes outputs into a directory on disk."""
+
+    def __init__(self, root):
+        self.root = os.path.normpath(str(root))
+        self._made_dirs = set()
+
+    def path(self, path):
+        return os.path.normpath(os.path.join(self.root, *path.split("/")))
+
+    def write(self, path, data):
+        path = self.path(path)
+        dir_path = os.path.dirname(path)
+        if dir_path not in self._made_dirs:
+            os.makedirs(dir_path, exist_ok=True)
+            self._made_dirs.add(dir_path)
+        write_output(path, data)
+
+
+class MemorySink(Sink):
+    """Keeps outputs in the files dict as path -> bytes."""
+
+    def __init__(self):
+        self.files = {}
+
+    def write(self, path, data):
+        self.files[posixpath.normpath(path)] = _data(data)
+
+
+class TarSink(Sink):
+    """
+    Streams outputs into a tar archive (gzip-compressed by default), so a
+    whole build is one file write instead of one per output.
+    """
+
+    def __init__(self, path, mode="w:gz"):
+        self.archive = tarfile.open(path, mode)
+        self.mtime = int(time.time())
+
+    def write(self, path, data):
+        data = _data(data)
+        info = tarfile.TarInfo(posixpath.normpath(path))
+        info.size = len(data)
+        info.mtime = self.mtime
+        info.mode = 0o644
+        self.archive.addfile(info, io.BytesIO(data))
+
+    def close(self):
+        self.archive.close()
+
+
+class ZipSink(Sink):
+    """Writes outputs into a zip archive."""
+
+    def __init__(self, path, compression=zipfile.ZIP_DEFLATED):
+        self.archive = zipfile.ZipFile(path, "w", compression)
+
+    def write(self, path, data):
+        self.archive.writestr(posixpath.normpath(path), _data(data))
+
+    def close(self):
+        self.archive.close()
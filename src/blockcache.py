@@ -0,0 +1,99 @@
+import hashlib
+from collections import OrderedDict
+
+from output import load_state, save_state
+
+# bump whenever block rendering changes, so stale fragments and pages are not reused
+RENDER_VERSION = 3
+
+
+class BlockCache():
+    """
+    LRU cache of rendered HTML fragments, keyed by a hash of a block's type
+    and raw lines (and the salt, which changes with anything else rendering
+    depends on, such as the fingerprinted asset URLs), persisted between
+    builds as JSON. The total length of the
+    cached fragments is kept under max_size characters.
+
+    Worker processes set track_changes so their additions and hits can be
+    drained with take_changes() and replayed into the parent's cache with
+    merge_changes().
+    """
+
+    def __init__(self, path=None, max_size=64 * 1024 * 1024):
+        self.path = path
+        self.max_size = max_size
+        self.entries = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.salt = ""
+        self.track_changes = False
+        self._added = []
+        self._used = []
+
+    @classmethod
+    def load(cls, path, max_size=64 * 1024 * 1024):
+        cache = cls(path, max_size)
+        data = load_state(path, RENDER_VERSION)
+        if data is None:
+            return cache
+        for key, html in data.get("entries", []):
+            cache._insert(key, html)
+        return cache
+
+    def save(self):
+        if self.path is not None:
+            save_state(self.path, RENDER_VERSION, {"entries": list(self.entries.items())})
+
+    def key(self, block_type, lines):
+        digest = hashlib.blake2b(digest_size=16)
+        if self.salt:
+            digest.update(self.salt.encode())
+            digest.update(b"\0")
+        digest.update(block_type.encode())
+        digest.update(b"\0")
+        digest.update("\n".join(lines).encode())
+        return digest.hexdigest()
+
+    def get(self, key):
+        html = self.entries.get(key)
+        if html is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.entries.move_to_end(key)
+        if self.track_changes:
+            self._used.append(key)
+        return html
+
+    def put(self, key, html):
+        self._insert(key, html)
+        if self.track_changes:
+            self._added.append((key, html))
+
+    def _insert(self, key, html):
+        old = self.entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        if len(html) > self.max_size:
+            return
+        self.entries[key] = html
+        self.size += len(html)
+        while self.size > self.max_size:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= len(evicted)
+
+    def take_changes(self):
+        changes = (self._added, self._used)
+        self._added = []
+        self._used = []
+        return changes
+
+    def merge_changes(self, changes):
+        added, used = changes
+        for key in used:
+            if key in self.entries:
+                self.entries.move_to_end(key)
+        for key, html in added:
+            self._insert(key, html)
@@ -0,0 +1,200 @@
+import gzip
+import hashlib
+import os
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+
+from discovery import PathFilter
+from output import load_state, save_state, write_output
+
+COMPRESS_VERSION = 1
+# outputs that get precompressed variants next to them
+COMPRESS_PATTERNS = ("*.html", "*.css", "*.js", "*.mjs", "*.svg")
+# smaller files gain too little to be worth a second request path
+MIN_SIZE = 1024
+
+
+def _gzip(data, level):
+    # mtime=0 keeps the output identical for identical input
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _zlib(data, level):
+    return zlib.compress(data, level)
+
+
+# variant suffix -> compress function
+FORMATS = {".gz": _gzip, ".zz": _zlib}
+
+
+def _content_hash(data):
+    return hashlib.blake2b(data, digest_size=16).hexdigest()
+
+
+def _compress(path, data, level):
+    """Write every variant of path; returns their sizes."""
+    sizes = {}
+    for suffix, compress in FORMATS.items():
+        compressed = compress(data, level)
+        write_output(path + suffix, compressed)
+        sizes[suffix] = len(compressed)
+    return sizes
+
+
+def _remove_variants(path):
+    for suffix in FORMATS:
+        try:
+            os.remove(path + suffix)
+        except FileNotFoundError:
+            pass
+
+
+class Precompressor():
+    """
+    Writes gzip (.gz) and zlib (.zz) variants of text outputs for servers
+    that send precompressed files as they are.
+
+    Pages hand over the bytes they just wrote with add(), so nothing is read
+    back from disk; other outputs go through add_file(). Compression runs on
+    a thread pool (zlib releases the GIL) and wait() collects it. The
+    content hash of every compressed file is kept between builds, and a file
+    whose hash is unchanged and whose variants still exist is skipped.
+
+    With workers=0 files are compressed in the calling thread, as in page
+    worker processes, which set track_changes so the parent can
+    merge_changes() what they did.
+    """
+
+    def __init__(self, path=None, min_size=MIN_SIZE, level=9, workers=None):
+        self.path = path
+        self.min_size = min_size
+        self.level = level
+        self.workers = workers
+        # output path -> {"hash", "size", "mtime_ns", "variants": {suffix: size}}
+        self.entries = {}
+        self.compressed = 0
+        self.track_changes = False
+        self._filter = PathFilter(COMPRESS_PATTERNS)
+        self._executor = None
+        self._pending = []
+        self._changes = []
+
+    @classmethod
+    def load(cls, path, min_size=MIN_SIZE, level=9, workers=None):
+        compressor = cls(path, min_size, level, workers)
+        data = load_state(path, COMPRESS_VERSION)
+        if data is not None and data.get("level") == level:
+            compressor.entries = data.get("files", {})
+        return compressor
+
+    def save(self):
+        if self.path is not None:
+            save_state(self.path, COMPRESS_VERSION, {"level": self.level, "files": self.entries},
+                       indent=1, sort_keys=True)
+
+    def accepts(self, path):
+        return self._filter.accepts(os.path.basename(path))
+
+    def add(self, path, data):
+        """Precompress data, the bytes just written to path."""
+        path = os.path.normpath(str(path))
+        if len(data) < self.min_size or not self.accepts(path):
+            self._forget(path)
+            return
+        self._compress(path, data, _content_hash(data))
+
+    def add_file(self, path):
+        """Precompress an output that was written elsewhere; unchanged size and mtime skip reading it."""
+        path = os.path.normpath(str(path))
+        if not self.accepts(path):
+            return
+        st = os.stat(path)
+        if st.st_size < self.min_size:
+            self._forget(path)
+            return
+        entry = self.entries.get(path)
+        if (entry is not None and entry["size"] == st.st_size and entry["mtime_ns"] == st.st_mtime_ns
+                and self._has_variants(path)):
+            return
+        with open(path, "rb") as f:
+            data = f.read()
+        self._compress(path, data, _content_hash(data), st)
+
+    def remove(self, path):
+        """Forget an output that is no longer published, and delete its variants."""
+        path = os.path.normpath(str(path))
+        if path in self.entries:
+            self._forget(path)
+        else:
+            _remove_variants(path)
+
+    def _forget(self, path):
+        # a file that is no longer compressed loses its variants, which would go stale
+        if self.entries.pop(path, None) is not None:
+            _remove_variants(path)
+            self._record(path, None, False)
+
+    def _has_variants(self, path):
+        return all(os.path.exists(path + suffix) for suffix in FORMATS)
+
+    def _compress(self, path, data, content_hash, st=None):
+        if st is None:
+            st = os.stat(path)
+        entry = self.entries.get(path)
+        if entry is not None and entry["hash"] == content_hash and self._has_variants(path):
+            entry["mtime_ns"] = st.st_mtime_ns
+            self._record(path, entry, False)
+            return
+        entry = {"hash": content_hash, "size": len(data), "mtime_ns": st.st_mtime_ns, "variants": {}}
+        self.entries[path] = entry
+        self.compressed += 1
+        if self.workers == 0:
+            entry["variants"] = _compress(path, data, self.level)
+            self._record(path, entry, True)
+            return
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers)
+        self._pending.append((entry, self._executor.submit(_compress, path, data, self.level)))
+
+    def _record(self, path, entry, compressed):
+        if self.track_changes:
+            self._changes.append((path, entry, compressed))
+
+    def wait(self):
+        """Wait for every submitted file to be compressed."""
+        pending, self._pending = self._pending, []
+        for entry, future in pending:
+            entry["variants"] = future.result()
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def take_changes(self):
+        changes, self._changes = self._changes, []
+        return changes
+
+    def merge_changes(self, changes):
+        for path, entry, compressed in changes:
+            if entry is None:
+                self.entries.pop(path, None)
+                continue
+            self.entries[path] = entry
+            if compressed:
+                self.compressed += 1
+
+    def variants(self, paths):
+        """
+        Return the variant paths of those of paths that were compressed, and
+        forget every other file.
+        """
+        keep = {os.path.normpath(str(path)) for path in paths}
+        self.entries = {path: entry for path, entry in self.entries.items() if path in keep}
+        return {path + suffix for path, entry in self.entries.items() for suffix in entry["variants"]}
+
+    def report(self):
+        original = sum(entry["size"] for entry in self.entries.values())
+        lines = [f"Precompressed files: {len(self.entries)}, compressed this build: {self.compressed}"]
+        for suffix in FORMATS:
+            size = sum(entry["variants"].get(suffix, 0) for entry in self.entries.values())
+            lines.append(f"  {suffix}: {original} -> {size} bytes, {original - size} saved")
+        return "\n".join(lines)
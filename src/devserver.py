@@ -0,0 +1,249 @@
+import gzip
+import hashlib
+import logging
+import mimetypes
+import os
+import posixpath
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import unquote, urlsplit
+
+from compress import MIN_SIZE
+from discovery import CONTENT_IGNORE_PATTERNS, PathFilter
+from templates import TemplateResolver, load_template
+from textutils import render_page, scan_metadata
+
+# files bigger than this are read on every request instead of being kept in memory
+MAX_CACHED_FILE_SIZE = 8 * 1024 * 1024
+
+_compressible_types = ("text/", "application/javascript", "application/json", "application/xml", "image/svg+xml")
+
+
+def _etag(body):
+    return f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"'
+
+
+def _content_type(path):
+    if path.endswith(".md"):
+        return "text/html; charset=utf-8"
+    content_type = mimetypes.guess_type(path)[0] or "application/octet-stream"
+    if content_type.startswith("text/"):
+        content_type += "; charset=utf-8"
+    return content_type
+
+
+class Response():
+    """
+    A cached response body with its ETag, and a gzip-encoded body (with its
+    own ETag) when the content type is worth compressing.
+    """
+
+    def __init__(self, body, content_type, gzipped=None, etag=None, location=None):
+        self.body = body
+        self.content_type = content_type
+        self.etag = _etag(body) if etag is None else etag
+        self.location = location
+        self.gzipped = gzipped
+        if gzipped is None and len(body) >= MIN_SIZE and content_type.startswith(_compressible_types):
+            self.gzipped = gzip.compress(body, mtime=0)
+        self.gzip_etag = None if self.gzipped is None else f'{self.etag[:-1]}-gzip"'
+
+    @classmethod
+    def redirect(cls, location):
+        return cls(b"", "text/plain", location=location)
+
+
+class DevSite():
+    """
+    The site served straight from its sources: nothing is built up front,
+    and a page is rendered the first time it is requested.
+
+    Request paths map to content/ the way the build maps pages to public/
+    ("/" and "/a/" to index.md, "/a/b.html" to b.md); static/ is checked
+    first and an existing public/ (for listings, feeds and the like) last.
+    Rendered pages and read files are kept in memory until the size or
+    mtime of their source or template changes.
+    """
+
+    def __init__(self, content_dir, static_dir, template_path, public_dir=None, block_cache=None):
+        self.content_dir = os.path.normpath(content_dir)
+        self.static_dir = os.path.normpath(static_dir)
+        self.template_path = os.path.normpath(template_path)
+        self.public_dir = None if public_dir is None else os.path.normpath(public_dir)
+        self.block_cache = block_cache
+        self.path_filter = PathFilter()
+        # pages follow the content/ rules, which hide dotfiles
+        self.content_filter = PathFilter(ignore=CONTENT_IGNORE_PATTERNS)
+        # path -> (stat key, Response)
+        self._cache = {}
+        # renders share the block cache, so they run one at a time
+        self._render_lock = threading.Lock()
+        self.renders = 0
+
+    def get(self, url_path):
+        """The Response for a request path, or None when nothing serves it."""
+        rel_path = self._rel_path(url_path)
+        if rel_path is None:
+            return None
+        if not url_path.endswith("/"):
+            response = self._file(os.path.join(self.static_dir, rel_path))
+            if response is not None:
+                return response
+        if not any(self.content_filter.is_ignored(part) for part in rel_path.split(os.sep)):
+            source = self._page_source(rel_path, url_path.endswith("/"))
+            if source is not None:
+                response = self._page(source)
+                if response is not None:
+                    return response
+            if not url_path.endswith("/") and os.path.isfile(os.path.join(self.content_dir, rel_path, "index.md")):
+                return Response.redirect(f"{url_path}/")
+        if self.public_dir is not None:
+            if url_path.endswith("/"):
+                rel_path = os.path.join(rel_path, "index.html")
+            return self._file(os.path.join(self.public_dir, rel_path))
+        return None
+
+    def _rel_path(self, url_path):
+        parts = [part for part in posixpath.normpath(unquote(url_path)).split("/") if part and part != "."]
+        if any(part == ".." or self.path_filter.is_ignored(part) for part in parts):
+            return None
+        return os.path.join(*parts) if parts else ""
+
+    def _page_source(self, rel_path, is_dir):
+        if is_dir:
+            return os.path.join(self.content_dir, rel_path, "index.md")
+        if rel_path.endswith(".html"):
+            return os.path.join(self.content_dir, rel_path[:-len(".html")] + ".md")
+        return None
+
+    def _page(self, source):
+        try:
+            st = os.stat(source)
+        except OSError:
+            return None
+        cached = self._cache.get(source)
+        if cached is not None:
+            key, response = cached
+            if key == self._page_key(st, key[2]):
+                return response
+        with self._render_lock:
+            with open(source, "r") as f:
+                markdown = f.read()
+            meta = scan_metadata(markdown.split("\n"))
+            template_path = TemplateResolver(self.content_dir, self.template_path).resolve(source, meta.template)
+            page, _ = render_page(markdown, load_template(template_path), block_cache=self.block_cache)
+            response = Response(page.encode(), _content_type(source))
+            self._cache[source] = (self._page_key(st, template_path), response)
+            self.renders += 1
+        logging.info(f"Rendered {source}")
+        return response
+
+    @staticmethod
+    def _page_key(st, template_path):
+        template_st = os.stat(template_path)
+        return (st.st_mtime_ns, st.st_size, template_path, template_st.st_mtime_ns, template_st.st_size)
+
+    def _file(self, path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        if not os.path.isfile(path):
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        cached = self._cache.get(path)
+        if cached is not None and cached[0] == key:
+            return cached[1]
+        with open(path, "rb") as f:
+            body = f.read()
+        gzipped = None
+        try:
+            # a precompressed variant from the build, if it is not older than the file
+            if os.stat(path + ".gz").st_mtime_ns >= st.st_mtime_ns:
+                with open(path + ".gz", "rb") as f:
+                    gzipped = f.read()
+        except OSError:
+            pass
+        response = Response(body, _content_type(path), gzipped)
+        if st.st_size <= MAX_CACHED_FILE_SIZE:
+            self._cache[path] = (key, response)
+        return response
+
+
+def _etag_matches(header, etag):
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    tags = [tag.strip() for tag in header.split(",")]
+    return etag in tags or f"W/{etag}" in tags
+
+
+class DevRequestHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self._respond(send_body=True)
+
+    def do_HEAD(self):
+        self._respond(send_body=False)
+
+    def _respond(self, send_body):
+        url_path = urlsplit(self.path).path
+        try:
+            response = self.server.site.get(url_path)
+        except Exception as e:
+            logging.error(f"Rendering {url_path} failed: {e}")
+            self.send_error(500, str(e))
+            return
+        if response is None:
+            self.send_error(404)
+            return
+        if response.location is not None:
+            self.send_response(301)
+            self.send_header("Location", response.location)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body, etag = response.body, response.etag
+        use_gzip = response.gzipped is not None and "gzip" in self.headers.get("Accept-Encoding", "")
+        if use_gzip:
+            body, etag = response.gzipped, response.gzip_etag
+        if _etag_matches(self.headers.get("If-None-Match"), etag):
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", response.content_type)
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("ETag", etag)
+        # always revalidate; unchanged pages cost a 304
+        self.send_header("Cache-Control", "no-cache")
+        if response.gzipped is not None:
+            self.send_header("Vary", "Accept-Encoding")
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        if send_body:
+            self.wfile.write(body)
+
+
+class DevServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, site):
+        super().__init__(address, DevRequestHandler)
+        self.site = site
+
+
+def serve(site, port=8888):
+    server = DevServer(("", port), site)
+    print(f"Serving {site.content_dir} on http://localhost:{port}, rendering pages on request...")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
@@ -0,0 +1,128 @@
+import os
+import re
+from fnmatch import translate
+from pathlib import Path
+
+# pages are Markdown files; everything else under content/ is left alone
+PAGE_PATTERNS = ("*.md",)
+# editor backup/swap files and version control directories, ignored everywhere;
+# static/ publishes every other file, dotfiles such as .htaccess included
+IGNORE_PATTERNS = ("*~", "*.swp", "*.swo", "#*#", ".DS_Store", ".git", ".hg", ".svn")
+# content/ ignores dotfiles as well; a leading "!" re-includes names an earlier pattern ignored
+CONTENT_IGNORE_PATTERNS = IGNORE_PATTERNS + (".*", "!.well-known")
+
+
+def _compile(patterns):
+    if not patterns:
+        return None
+    return re.compile("|".join(translate(pattern) for pattern in patterns)).match
+
+
+class PathFilter():
+    """
+    Include/ignore rules matched against file and directory names with
+    fnmatch syntax. Ignored directories are not descended into.
+    """
+
+    def __init__(self, include=None, ignore=IGNORE_PATTERNS):
+        self._include = _compile(include)
+        ignore = ignore or ()
+        self._ignore = _compile([pattern for pattern in ignore if not pattern.startswith("!")])
+        self._keep = _compile([pattern[1:] for pattern in ignore if pattern.startswith("!")])
+
+    def is_ignored(self, name):
+        if self._ignore is None or not self._ignore(name):
+            return False
+        return self._keep is None or not self._keep(name)
+
+    def accepts(self, name):
+        if self.is_ignored(name):
+            return False
+        return self._include is None or self._include(name) is not None
+
+
+class StatCache():
+    """
+    Directory entries gathered while scanning, reused by later build steps
+    (the manifest, template lookup) instead of asking the filesystem again.
+    A file's stat is taken at most once, when first needed, and lookups
+    under a scanned directory that the scan did not see are answered as
+    missing without a syscall. One cache covers one build: files edited
+    after the scan are not noticed.
+    """
+
+    def __init__(self):
+        self.entries = {}
+        self.stats = {}
+        self.scanned_dirs = set()
+
+    def __contains__(self, path):
+        return os.path.normpath(str(path)) in self.entries
+
+    def stat(self, path):
+        path = os.path.normpath(str(path))
+        st = self.stats.get(path)
+        if st is None:
+            entry = self.entries.get(path)
+            st = os.stat(path) if entry is None else entry.stat()
+            self.stats[path] = st
+        return st
+
+    def isfile(self, path):
+        path = os.path.normpath(str(path))
+        if path in self.entries:
+            return True
+        if os.path.dirname(path) in self.scanned_dirs:
+            return False
+        return os.path.isfile(path)
+
+
+def scan_tree(root, path_filter=None, stat_cache=None):
+    """
+    Yield (path, stat_result) for every accepted file under root in sorted
+    depth-first order, with one os.scandir call per directory and one stat
+    per accepted file. Every file that is not ignored is also recorded in
+    stat_cache, accepted or not.
+    """
+    if path_filter is None:
+        path_filter = PathFilter()
+    root = os.path.normpath(str(root))
+    stack = [iter(_sorted_entries(root, stat_cache))]
+    while stack:
+        for entry in stack[-1]:
+            name = entry.name
+            if path_filter.is_ignored(name):
+                continue
+            if entry.is_dir():
+                stack.append(iter(_sorted_entries(entry.path, stat_cache)))
+                break
+            if stat_cache is not None:
+                stat_cache.entries[entry.path] = entry
+            if path_filter.accepts(name):
+                try:
+                    st = entry.stat() if stat_cache is None else stat_cache.stat(entry.path)
+                except FileNotFoundError:
+                    continue
+                yield entry.path, st
+        else:
+            stack.pop()
+
+
+def _sorted_entries(dir_path, stat_cache):
+    with os.scandir(dir_path) as entries:
+        entries = sorted(entries, key=lambda entry: entry.name)
+    if stat_cache is not None:
+        stat_cache.scanned_dirs.add(dir_path)
+    return entries
+
+
+def discover_pages(dir_path_content, dest_dir_path, path_filter=None, stat_cache=None):
+    """Return (source, destination .html path) for every page, in a stable order."""
+    if path_filter is None:
+        path_filter = PathFilter(PAGE_PATTERNS, CONTENT_IGNORE_PATTERNS)
+    content_root = os.path.normpath(str(dir_path_content))
+    pages = []
+    for path, _ in scan_tree(content_root, path_filter, stat_cache):
+        dest_path = os.path.join(dest_dir_path, os.path.relpath(path, content_root))
+        pages.append((path, Path(dest_path).with_suffix(".html")))
+    return pages
@@ -0,0 +1,35 @@
+from functools import lru_cache
+
+
+def escape_text(text):
+    """Escape `&`, `<` and `>` for element content; clean strings are returned as is."""
+    if "&" not in text and "<" not in text and ">" not in text:
+        return text
+    return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+def escape_attr(value):
+    """Escape a double-quoted attribute value."""
+    if "&" not in value and "<" not in value and ">" not in value and '"' not in value:
+        return value
+    return (value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+            .replace('"', "&quot;"))
+
+
+def props_to_html(props):
+    """
+    Render a props dict as ` name="value"` pairs. The same links and images
+    recur across a site, so rendered strings are cached by the dict's items.
+    """
+    items = tuple(props.items())
+    try:
+        return _items_to_html(items)
+    except TypeError:
+        # unhashable values cannot be cache keys
+        return _items_to_html.__wrapped__(items)
+
+
+@lru_cache(maxsize=4096)
+def _items_to_html(items):
+    return "".join([f' {name}="{escape_attr(value if isinstance(value, str) else str(value))}"'
+                    for name, value in items])
@@ -0,0 +1,48 @@
+import os
+import tempfile
+import unittest
+
+# helpers shared by the test modules
+
+
+def write(path, data):
+    """Write str or bytes to path, creating its directory."""
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb" if isinstance(data, bytes) else "w") as f:
+        f.write(data)
+
+
+def read(path):
+    with open(path) as f:
+        return f.read()
+
+
+def read_bytes(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+class TempDirTestCase(unittest.TestCase):
+    """A test case with a fresh temporary directory at self.root, removed after each test."""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.root = self.tmp.name
+
+
+class SiteTestCase(TempDirTestCase):
+    """
+    A TempDirTestCase laid out as a site: self.content, self.static and
+    self.public under self.root, and self.template written with TEMPLATE.
+    """
+
+    TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+    def setUp(self):
+        super().setUp()
+        self.content = os.path.join(self.root, "content")
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "public")
+        self.template = os.path.join(self.root, "template.html")
+        write(self.template, self.TEMPLATE)
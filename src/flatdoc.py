@@ -0,0 +1,173 @@
+from array import array
+
+from assets import asset_url
+from escape import escape_attr, escape_text
+from leafnode import LeafNode
+from parentnode import ParentNode
+from textnode import TextType
+
+KIND_ELEMENT = 0
+KIND_LEAF = 1
+
+TAGS = (None, "div", "p", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "code", "blockquote",
+        "ul", "ol", "li", "b", "i", "a", "img")
+TAG_IDS = {tag: i for i, tag in enumerate(TAGS)}
+
+_inline_tag_ids = {
+    TextType.TEXT: TAG_IDS[None],
+    TextType.BOLD: TAG_IDS["b"],
+    TextType.ITALIC: TAG_IDS["i"],
+    TextType.CODE: TAG_IDS["code"],
+    TextType.LINK: TAG_IDS["a"],
+    TextType.IMAGE: TAG_IDS["img"],
+}
+_tag_a = TAG_IDS["a"]
+_tag_img = TAG_IDS["img"]
+
+
+class FlatDocument():
+    """
+    A document tree stored as parallel arrays instead of node objects.
+
+    Node i has a kind (element or leaf), a tag id into TAGS, a parent index
+    and first-child/next-sibling links (-1 for none). Leaf text, and the URL
+    of links and images, are (start, end) offsets into `text`, a single
+    buffer holding each block's inline source once. Nodes are stored in
+    document order, so a forward scan visits them depth first.
+    """
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.tags = array("B")
+        self.parents = array("l")
+        self.first_child = array("l")
+        self.next_sibling = array("l")
+        self.text_start = array("l")
+        self.text_end = array("l")
+        self.url_start = array("l")
+        self.url_end = array("l")
+        self.text = ""
+        self._chunks = []
+        self._length = 0
+        self._last_child = array("l")
+
+    def __len__(self):
+        return len(self.kinds)
+
+    def add_node(self, kind, tag_id, parent, start=0, end=0, url_start=0, url_end=0):
+        index = len(self.kinds)
+        self.kinds.append(kind)
+        self.tags.append(tag_id)
+        self.parents.append(parent)
+        self.first_child.append(-1)
+        self.next_sibling.append(-1)
+        self._last_child.append(-1)
+        self.text_start.append(start)
+        self.text_end.append(end)
+        self.url_start.append(url_start)
+        self.url_end.append(url_end)
+        if parent >= 0:
+            last = self._last_child[parent]
+            if last < 0:
+                self.first_child[parent] = index
+            else:
+                self.next_sibling[last] = index
+            self._last_child[parent] = index
+        return index
+
+    def add_element(self, tag, parent):
+        return self.add_node(KIND_ELEMENT, TAG_IDS[tag], parent)
+
+    def add_text(self, text, parent):
+        base = self._append_text(text)
+        return self.add_node(KIND_LEAF, TAG_IDS[None], parent, base, base + len(text))
+
+    def add_inline(self, text, spans, parent):
+        """Add a leaf per span of text, given as scan_inline yields them."""
+        base = self._append_text(text)
+        for text_type, start, end, url_start, url_end in spans:
+            self.add_node(KIND_LEAF, _inline_tag_ids[text_type], parent,
+                          base + start, base + end, base + url_start, base + url_end)
+
+    def _append_text(self, text):
+        base = self._length
+        self._chunks.append(text)
+        self._length += len(text)
+        return base
+
+    def finish(self):
+        self.text = "".join(self._chunks)
+        self._chunks = []
+        self._last_child = array("l")
+        return self
+
+    def children(self, index):
+        child = self.first_child[index]
+        while child >= 0:
+            yield child
+            child = self.next_sibling[child]
+
+    def to_html(self):
+        return render_flat_document(self)
+
+
+def render_flat_document(doc):
+    """Serialize a FlatDocument to HTML with one forward scan over its arrays."""
+    text = doc.text
+    kinds, tags, parents = doc.kinds, doc.tags, doc.parents
+    starts, ends = doc.text_start, doc.text_end
+    url_starts, url_ends = doc.url_start, doc.url_end
+    parts = []
+    append = parts.append
+    open_nodes = [-1]
+    closing = [""]
+    for i in range(len(kinds)):
+        parent = parents[i]
+        while open_nodes[-1] != parent:
+            open_nodes.pop()
+            append(closing.pop())
+        tag_id = tags[i]
+        tag = TAGS[tag_id]
+        if kinds[i] == KIND_ELEMENT:
+            append(f"<{tag}>")
+            open_nodes.append(i)
+            closing.append(f"</{tag}>")
+        elif tag is None:
+            append(escape_text(text[starts[i]:ends[i]]))
+        elif tag_id == _tag_a:
+            url = escape_attr(asset_url(text[url_starts[i]:url_ends[i]]))
+            append(f'<a href="{url}">{escape_text(text[starts[i]:ends[i]])}</a>')
+        elif tag_id == _tag_img:
+            url = escape_attr(asset_url(text[url_starts[i]:url_ends[i]]))
+            append(f'<img src="{url}" alt="{escape_attr(text[starts[i]:ends[i]])}"></img>')
+        else:
+            append(f"<{tag}>{escape_text(text[starts[i]:ends[i]])}</{tag}>")
+    parts.extend(reversed(closing))
+    return "".join(parts)
+
+
+def flat_document_to_html_node(doc):
+    """Materialize the equivalent ParentNode/LeafNode tree."""
+    text = doc.text
+    nodes = []
+    root = None
+    for i in range(len(doc)):
+        tag = TAGS[doc.tags[i]]
+        if doc.kinds[i] == KIND_ELEMENT:
+            node = ParentNode(tag, [])
+        else:
+            value = text[doc.text_start[i]:doc.text_end[i]]
+            url = asset_url(text[doc.url_start[i]:doc.url_end[i]])
+            if tag == "a":
+                node = LeafNode(tag, value, {"href": url})
+            elif tag == "img":
+                node = LeafNode(tag, "", {"src": url, "alt": value})
+            else:
+                node = LeafNode(tag, value)
+        nodes.append(node)
+        parent = doc.parents[i]
+        if parent < 0:
+            root = node
+        else:
+            nodes[parent].children.append(node)
+    return root
@@ -0,0 +1,158 @@
+from htmlnode import HTMLNode
+from leafnode import LeafNode
+from parentnode import ParentNode
+
+
+class FrozenNode():
+    """
+    Behaviour shared by the immutable node variants.
+
+    A frozen node cannot be modified after construction, hashes by structure
+    (computed once, from the already cached hashes of its children) and
+    memoizes its serialized HTML, so a subtree shared between many pages is
+    serialized once.
+    """
+
+    __slots__ = ()
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __hash__(self):
+        return self._hash
+
+    def __eq__(self, other):
+        if isinstance(other, FrozenNode) and other._hash != self._hash:
+            return False
+        return HTMLNode.__eq__(self, other)
+
+    def to_html(self):
+        html = self._html
+        if html is None:
+            html = _memoize(self)
+        return html
+
+    def _open(self, append):
+        append(self.to_html())
+
+
+class FrozenLeafNode(FrozenNode, LeafNode):
+    __slots__ = ("_hash", "_html")
+
+    def __init__(self, tag, value, props=None):
+        props = None if props is None else dict(props)
+        object.__setattr__(self, "tag", tag)
+        object.__setattr__(self, "value", value)
+        object.__setattr__(self, "children", None)
+        object.__setattr__(self, "props", props)
+        object.__setattr__(self, "_html", None)
+        object.__setattr__(self, "_hash", hash((tag, value, None if props is None else tuple(props.items()))))
+
+    def __reduce__(self):
+        return (FrozenLeafNode, (self.tag, self.value, self.props))
+
+    def _render(self):
+        return LeafNode.to_html(self)
+
+
+class FrozenParentNode(FrozenNode, ParentNode):
+    __slots__ = ("_hash", "_html")
+
+    def __init__(self, tag, children, props=None):
+        if children is not None:
+            children = tuple(child if isinstance(child, FrozenNode) else freeze(child) for child in children)
+        props = None if props is None else dict(props)
+        object.__setattr__(self, "tag", tag)
+        object.__setattr__(self, "value", None)
+        object.__setattr__(self, "children", children)
+        object.__setattr__(self, "props", props)
+        object.__setattr__(self, "_html", None)
+        object.__setattr__(self, "_hash", hash((tag, children, None if props is None else tuple(props.items()))))
+
+    def __reduce__(self):
+        return (FrozenParentNode, (self.tag, self.children, self.props))
+
+    def _render(self):
+        parts = []
+        close = ParentNode._open(self, parts.append)
+        parts.extend([child._html for child in self.children])
+        parts.append(close)
+        return "".join(parts)
+
+
+def _memoize(root):
+    # post-order, so every child's HTML is memoized before its parent joins it
+    stack = [(root, False)]
+    while stack:
+        node, ready = stack.pop()
+        if node._html is not None:
+            continue
+        if ready or node.children is None:
+            object.__setattr__(node, "_html", node._render())
+        else:
+            stack.append((node, True))
+            stack.extend([(child, False) for child in node.children])
+    return root._html
+
+
+def freeze(node):
+    """Return an immutable, hashable copy of a node tree."""
+    return _freeze(node, None)
+
+
+class NodeInterner():
+    """
+    Keeps one canonical frozen node per distinct subtree. Interning a tree
+    freezes it bottom up and replaces every subtree equal to one seen before
+    with the earlier instance, so repeated fragments share their nodes and
+    their memoized HTML.
+
+    The build does not intern: it serializes each block once and keeps only
+    the HTML, which the block cache already shares. Interning pays off for
+    callers that hold many node trees at once.
+    """
+
+    def __init__(self):
+        self.nodes = {}
+        self.hits = 0
+
+    def __len__(self):
+        return len(self.nodes)
+
+    def intern(self, node):
+        return _freeze(node, self._canonical)
+
+    def _canonical(self, node):
+        existing = self.nodes.get(node)
+        if existing is None:
+            self.nodes[node] = node
+            return node
+        self.hits += 1
+        return existing
+
+
+def _freeze(root, canonical):
+    results = []
+    stack = [(root, False)]
+    while stack:
+        node, expanded = stack.pop()
+        if isinstance(node, FrozenNode):
+            frozen = node
+        elif node.children is None:
+            frozen = FrozenLeafNode(node.tag, node.value, node.props)
+        elif not expanded:
+            stack.append((node, True))
+            stack.extend([(child, False) for child in reversed(node.children)])
+            continue
+        else:
+            count = len(node.children)
+            children = tuple(results[len(results) - count:])
+            del results[len(results) - count:]
+            frozen = FrozenParentNode(node.tag, children, node.props)
+        if canonical is not None:
+            frozen = canonical(frozen)
+        results.append(frozen)
+    return results[0]
@@ -1,5 +1,10 @@
 
+from escape import props_to_html
+
+
 class HTMLNode():
+    __slots__ = ("tag", "value", "children", "props")
+
     def __init__(self, tag: str = None, value: str  = None, children  = None, props  = None):
         self.tag = tag
         self.value = value
@@ -8,15 +13,82 @@ class HTMLNode():
         
 
     def to_html(self):
+        return serialize(self)
+
+    def render_to(self, stream):
+        serialize(self, stream)
+
+    def _open(self, append):
+        """
+        Emit this node's opening markup. Containers return their closing tag
+        so the serializer can walk their children; leaves emit everything
+        and return None.
+        """
         raise NotImplementedError("to_html method not implemented")
 
     def props_to_html(self):
         if self.props is None:
             return ""
-        props_html = ""
-        for prop in self.props:
-            props_html += f' {prop}="{self.props[prop]}"'
-        return props_html
+        return props_to_html(self.props)
  
+    def __eq__(self, other):
+        if not isinstance(other, HTMLNode):
+            return NotImplemented
+        return same_tree(self, other)
+
+    # nodes are mutable; frozennode has hashable variants
+    __hash__ = None
+
     def __repr__(self):
        return f"HTMLNode({self.tag}, {self.value}, children: {self.children}, {self.props})"
+
+
+def same_tree(a, b):
+    """Compare two node trees structurally, without recursion."""
+    pairs = [(a, b)]
+    while pairs:
+        a, b = pairs.pop()
+        if a is b:
+            continue
+        if a.tag != b.tag or a.value != b.value or a.props != b.props:
+            return False
+        if a.children is None or b.children is None:
+            if a.children is not b.children:
+                return False
+            continue
+        if len(a.children) != len(b.children):
+            return False
+        pairs.extend(zip(a.children, b.children))
+    return True
+
+
+def serialize(node, stream=None, flush_every=4096):
+    """
+    Serialize a node tree without recursion.
+
+    Fragments are appended to one list and joined once, so output is linear in
+    the size of the tree and nesting depth is not limited by the recursion
+    limit. With a stream, buffered fragments are written out whenever more
+    than `flush_every` have piled up and nothing is returned.
+    """
+    parts = []
+    append = parts.append
+    close = node._open(append)
+    stack = [] if close is None else [(iter(node.children), close)]
+    while stack:
+        children, close = stack[-1]
+        for child in children:
+            child_close = child._open(append)
+            if child_close is not None:
+                stack.append((iter(child.children), child_close))
+                break
+        else:
+            stack.pop()
+            append(close)
+            if stream is not None and len(parts) > flush_every:
+                stream.write("".join(parts))
+                parts.clear()
+    if stream is None:
+        return "".join(parts)
+    if parts:
+        stream.write("".join(parts))
@@ -1,6 +1,9 @@
+from escape import escape_text
 from htmlnode import HTMLNode
 
 class LeafNode(HTMLNode):
+    __slots__ = ()
+
     def __init__(self, tag, value, props=None):
         super().__init__(tag, value, None, props)
 
@@ -8,8 +11,19 @@ class LeafNode(HTMLNode):
         if self.value is None:
             raise ValueError("Invalid HTML: no value")
         if self.tag is None:
-            return self.value
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+            return escape_text(self.value)
+        return f"<{self.tag}{self.props_to_html()}>{escape_text(self.value)}</{self.tag}>"
+
+    def _open(self, append):
+        if self.value is None:
+            raise ValueError("Invalid HTML: no value")
+        value = escape_text(self.value)
+        if self.tag is None:
+            append(value)
+        elif self.props is None:
+            append(f"<{self.tag}>{value}</{self.tag}>")
+        else:
+            append(f"<{self.tag}{self.props_to_html()}>{value}</{self.tag}>")
 
     def __repr__(self):
         return f"LeafNode({self.tag}, {self.value}, {self.props})"
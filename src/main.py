@@ -1,45 +1,121 @@
-import os
-import shutil
 import logging
-from textutils import generate_pages_recursive
-
-def copy_directory_recursive(src_dir, dest_dir):
-    logging.basicConfig(level=logging.INFO, 
-                       format='%(asctime)s - %(message)s',
-                       datefmt='%Y-%m-%d %H:%M:%S')
-    
-    if not os.path.exists(src_dir):
-        raise FileNotFoundError(f"Source directory '{src_dir}' does not exist")
-    
-    if os.path.exists(dest_dir):
-        logging.info(f"Cleaning destination directory: {dest_dir}")
-        shutil.rmtree(dest_dir)
-    
-    logging.info(f"Creating destination directory: {dest_dir}")
-    os.mkdir(dest_dir)
-    
-    for item in os.listdir(src_dir):
-        sp = os.path.join(src_dir, item)
-        dp = os.path.join(dest_dir, item)
-        
-        if os.path.isfile(sp):
-            logging.info(f"Copying file: {sp} -> {dp}")
-            shutil.copy(sp, dp)
-        else:
-            logging.info(f"Copying directory: {sp} -> {dp}")
-            copy_directory_recursive(sp, dp)
-
+import argparse
+from backends import FileSystemSink, FileSystemSource, TarSink, ZipSink
+from blockcache import BlockCache
+from compress import MIN_SIZE
+from devserver import DevSite, serve
+from sitebuild import BuildConfig, build_site
+from watch import SiteWatcher, watch
 
 dir_path_static = "./static"
 dir_path_public = "./public"
 dir_path_content = "./content"
 template_path = "./template.html"
+state_dir = "./.sitegen"
+profile_path = "./.sitegen/profile.json"
+block_cache_path = "./.sitegen/blocks.json"
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Build the static site into ./public")
+    parser.add_argument("-j", "--jobs", type=int, default=1,
+                        help="render pages on N worker processes (0 = one per CPU core)")
+    parser.add_argument("--clean", action="store_true",
+                        help="rebuild everything from scratch, ignoring the saved build state")
+    parser.add_argument("--checksum", action="store_true",
+                        help="compare static files by content hash instead of size and mtime")
+    parser.add_argument("--link", action="store_true",
+                        help="hardlink static files into ./public instead of copying them")
+    parser.add_argument("--block-cache-mb", type=int, default=64, metavar="MB",
+                        help="size limit of the rendered block cache (0 disables it)")
+    parser.add_argument("--base-url", metavar="URL",
+                        help="absolute site URL; when given, sitemap.xml and feed.xml are written too")
+    parser.add_argument("--per-page", type=int, default=10, metavar="N",
+                        help="pages per section listing page")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="publish static assets under content-hashed names and point pages at them")
+    parser.add_argument("--precompress", action="store_true",
+                        help="write .gz and .zz variants of HTML, CSS, JS and SVG outputs")
+    parser.add_argument("--precompress-min-size", type=int, default=MIN_SIZE, metavar="BYTES",
+                        help="smallest output to precompress")
+    parser.add_argument("--search", action="store_true",
+                        help="write a full-text search index to ./public/search")
+    parser.add_argument("--archive", metavar="PATH",
+                        help="write the whole site into a .tar.gz, .tar or .zip file instead of ./public")
+    parser.add_argument("--profile", nargs="?", const=profile_path, metavar="PATH",
+                        help=f"time every build phase per page and write a JSON report (default {profile_path})")
+    parser.add_argument("--profile-top", type=int, default=10, metavar="N",
+                        help="number of slowest pages to list in the --profile summary")
+    parser.add_argument("--watch", action="store_true",
+                        help="after building, rebuild on changes and serve ./public with live reload")
+    parser.add_argument("--serve", action="store_true",
+                        help="skip the build and serve the site from ./content and ./static, rendering pages on request")
+    parser.add_argument("--port", type=int, default=8888,
+                        help="port for the --watch and --serve servers")
+    args = parser.parse_args(argv)
+    if args.archive:
+        # an archive gets a full build: none of the incremental build's state or extras apply
+        rejected = [flag for flag, given in (("--jobs", args.jobs != 1), ("--clean", args.clean),
+                                             ("--checksum", args.checksum), ("--link", args.link),
+                                             ("--fingerprint", args.fingerprint),
+                                             ("--precompress", args.precompress), ("--search", args.search),
+                                             ("--profile", args.profile), ("--watch", args.watch),
+                                             ("--serve", args.serve)) if given]
+        if rejected:
+            parser.error(f"--archive cannot be combined with {', '.join(rejected)}")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    logging.basicConfig(level=logging.INFO,
+                        format='%(asctime)s - %(message)s',
+                        datefmt='%Y-%m-%d %H:%M:%S')
+
+    if args.serve:
+        block_cache = None
+        if args.block_cache_mb > 0:
+            block_cache = BlockCache.load(block_cache_path, args.block_cache_mb * 1024 * 1024)
+        site = DevSite(dir_path_content, dir_path_static, template_path, dir_path_public, block_cache)
+        try:
+            serve(site, port=args.port)
+        finally:
+            if block_cache is not None:
+                block_cache.save()
+        return
+
+    sink = _archive_sink(args.archive) if args.archive else FileSystemSink(dir_path_public)
+    config = BuildConfig(FileSystemSource(), sink, content_dir=dir_path_content, static_dir=dir_path_static,
+                         template_path=template_path, state_dir=state_dir, jobs=args.jobs, clean=args.clean,
+                         checksum=args.checksum, link=args.link, block_cache_mb=args.block_cache_mb,
+                         base_url=args.base_url, per_page=args.per_page, fingerprint=args.fingerprint,
+                         precompress=args.precompress, precompress_min_size=args.precompress_min_size,
+                         search=args.search, profile=bool(args.profile))
+    with sink:
+        result = build_site(config)
+    if args.archive:
+        print(f"Wrote {len(result.outputs)} file(s) to {args.archive}")
+        return
+
+    profile = result.profile
+    if profile is not None:
+        profile.write_json(args.profile, args.profile_top)
+        print(profile.summary(args.profile_top))
+        print(f"Profile written to {args.profile}")
+
+    if args.watch:
+        watcher = SiteWatcher(dir_path_content, dir_path_static, template_path, dir_path_public,
+                              result.manifest, link=args.link, block_cache=result.block_cache,
+                              base_url=args.base_url, per_page=args.per_page, search_index=result.search_index,
+                              assets=result.assets, compressor=result.compressor)
+        # the watcher saves its state when watch() returns
+        watch(watcher, port=args.port)
+
 
-def main():
-    copy_directory_recursive(dir_path_static, dir_path_public)
+def _archive_sink(path):
+    if path.endswith(".zip"):
+        return ZipSink(path)
+    return TarSink(path, "w" if path.endswith(".tar") else "w:gz")
 
-    print("Generating page...")
-    
-    generate_pages_recursive(dir_path_content, template_path, dir_path_public)
 
-main()
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,117 @@
+import hashlib
+import os
+
+from blockcache import RENDER_VERSION
+from output import load_state, save_state
+from pagemeta import PageMeta
+
+MANIFEST_VERSION = 2
+
+
+def file_digest(path, chunk_size=1 << 16):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _key(path):
+    return os.path.normpath(str(path))
+
+
+class BuildManifest():
+    """
+    Persistent record of what the last build produced.
+
+    Each rendered page is stored as source path -> source content hash,
+    template content hash and output path. A page is current when both
+    hashes still match and its output file still exists, so only edited
+    pages and pages whose template changed need to be re-rendered. The
+    page's metadata is kept too, so unchanged pages need not be read.
+
+    `assets` is the digest of the fingerprinted asset URLs the build renders
+    with; pages recorded under a different one are not current. Nor are
+    pages rendered by another RENDER_VERSION of the renderer.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self.entries = {}
+        self.assets = ""
+        # path -> (size, mtime_ns, digest); lets unchanged files skip hashing
+        self._digests = {}
+
+    @classmethod
+    def load(cls, path):
+        manifest = cls(path)
+        data = load_state(path, MANIFEST_VERSION)
+        if data is None:
+            return manifest
+        manifest.entries = data.get("pages", {})
+        for source, entry in manifest.entries.items():
+            manifest._digests[source] = (entry["size"], entry["mtime_ns"], entry["hash"])
+        return manifest
+
+    def save(self):
+        if self.path is not None:
+            save_state(self.path, MANIFEST_VERSION, {"pages": self.entries}, indent=1, sort_keys=True)
+
+    def digest(self, path, stat_cache=None):
+        key = _key(path)
+        st = os.stat(key) if stat_cache is None else stat_cache.stat(key)
+        cached = self._digests.get(key)
+        if cached is not None and cached[0] == st.st_size and cached[1] == st.st_mtime_ns:
+            return cached[2]
+        value = file_digest(key)
+        self._digests[key] = (st.st_size, st.st_mtime_ns, value)
+        return value
+
+    def is_current(self, source_path, template_path, dest_path, stat_cache=None):
+        entry = self.entries.get(_key(source_path))
+        if entry is None:
+            return False
+        if entry["output"] != _key(dest_path) or not os.path.exists(entry["output"]):
+            return False
+        if entry["template"] != self.digest(template_path, stat_cache):
+            return False
+        if entry.get("assets", "") != self.assets or entry.get("render") != RENDER_VERSION:
+            return False
+        return entry["hash"] == self.digest(source_path, stat_cache)
+
+    def metadata(self, source_path, stat_cache=None):
+        """The recorded PageMeta, or None if there is none or the source changed since."""
+        key = _key(source_path)
+        entry = self.entries.get(key)
+        if entry is None or entry.get("meta") is None:
+            return None
+        st = os.stat(key) if stat_cache is None else stat_cache.stat(key)
+        if st.st_size != entry["size"] or st.st_mtime_ns != entry["mtime_ns"]:
+            return None
+        return PageMeta.from_dict(entry["meta"])
+
+    def record(self, source_path, template_path, dest_path, stat_cache=None, meta=None):
+        key = _key(source_path)
+        source_hash = self.digest(key, stat_cache)
+        size, mtime_ns, _ = self._digests[key]
+        self.entries[key] = {
+            "hash": source_hash,
+            "size": size,
+            "mtime_ns": mtime_ns,
+            "template": self.digest(template_path, stat_cache),
+            "output": _key(dest_path),
+            "render": RENDER_VERSION,
+            "meta": None if meta is None else meta.to_dict(),
+        }
+        if self.assets:
+            self.entries[key]["assets"] = self.assets
+
+    def prune(self, seen_sources):
+        """Drop entries for sources that no longer exist; returns their outputs."""
+        seen = {_key(source) for source in seen_sources}
+        removed = []
+        for source in list(self.entries):
+            if source not in seen:
+                removed.append(self.entries.pop(source)["output"])
+                self._digests.pop(source, None)
+        return removed
@@ -0,0 +1,105 @@
+import json
+import os
+from contextlib import contextmanager
+
+WRITE_BUFFER_SIZE = 1 << 16
+
+
+def temporary_path(path):
+    # a hidden file in the same directory, so it is on the same filesystem for os.replace
+    dir_path, name = os.path.split(str(path))
+    return os.path.join(dir_path, f".{name}.{os.getpid()}.tmp")
+
+
+@contextmanager
+def open_output(path, mode="w", compare=True):
+    """
+    Open a buffered temporary file next to path for writing. When the block
+    finishes it is flushed, closed and renamed over path, so a reader sees
+    either the old file or the new one, never a partial one. On error the
+    temporary file is removed and path is left alone.
+
+    With compare, a finished file with the same bytes as path is discarded
+    instead, so path keeps its mtime.
+    """
+    tmp_path = temporary_path(path)
+    f = open(tmp_path, mode, buffering=WRITE_BUFFER_SIZE)
+    try:
+        yield f
+        f.flush()
+        f.close()
+        if compare and _same_file_content(tmp_path, path):
+            os.remove(tmp_path)
+        else:
+            os.replace(tmp_path, path)
+    except BaseException:
+        f.close()
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _same_file_content(tmp_path, path):
+    # size first, then chunk by chunk; filecmp.cmp would cache every pair it sees for the process lifetime
+    try:
+        if os.path.getsize(tmp_path) != os.path.getsize(path):
+            return False
+        with open(tmp_path, "rb") as new, open(path, "rb") as old:
+            while True:
+                chunk = new.read(WRITE_BUFFER_SIZE)
+                if chunk != old.read(WRITE_BUFFER_SIZE):
+                    return False
+                if not chunk:
+                    return True
+    except FileNotFoundError:
+        return False
+
+
+def same_content(path, data):
+    try:
+        if os.path.getsize(path) != len(data):
+            return False
+        with open(path, "rb") as f:
+            return f.read() == data
+    except FileNotFoundError:
+        return False
+
+
+def write_output(path, data):
+    """
+    Atomically replace path with data (str or bytes). Returns False without
+    touching the file when it already holds exactly those bytes, so its
+    mtime only changes when its content does.
+    """
+    if isinstance(data, str):
+        data = data.encode()
+    if same_content(path, data):
+        return False
+    with open_output(path, "wb", compare=False) as f:
+        f.write(data)
+    return True
+
+
+def load_state(path, version):
+    """
+    The JSON object save_state wrote to path, or None when there is none,
+    it cannot be read, or it was written with a different version.
+    """
+    if path is None:
+        return None
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if not isinstance(data, dict) or data.get("version") != version:
+        return None
+    return data
+
+
+def save_state(path, version, data, **json_options):
+    """Write data and its version to path as a JSON object, creating the directory it goes in."""
+    dir_path = os.path.dirname(path)
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+    write_output(path, json.dumps({"version": version, **data}, **json_options))
@@ -0,0 +1,136 @@
+from escape import escape_text
+
+FRONT_MATTER_DELIMITER = "---"
+
+_true_values = ("true", "yes", "on", "1")
+
+
+def split_front_matter(lines):
+    """
+    Split a line iterator into (front matter lines, body lines).
+
+    Front matter is present only when the first line is `---`, and runs to
+    the next `---` line. Without it (or if it is never closed) the front
+    matter is None and the body is every line.
+    """
+    lines = iter(lines)
+    first = next(lines, None)
+    if first is None:
+        return None, lines
+    if first.strip() != FRONT_MATTER_DELIMITER:
+        return None, _prepend(first, lines)
+    front = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if line.strip() == FRONT_MATTER_DELIMITER:
+            return front, lines
+        front.append(line)
+    return None, _prepend(first, iter(front))
+
+
+def _prepend(first, lines):
+    yield first
+    yield from lines
+
+
+def parse_front_matter(lines):
+    """
+    Parse `key: value` lines. `[a, b]` values and indented `- item` lines
+    under an empty key become lists; blank lines and `#` comments are
+    skipped.
+    """
+    fields = {}
+    key = None
+    for line in lines:
+        stripped = line.strip()
+        if not stripped or stripped.startswith("#"):
+            continue
+        if stripped.startswith("- ") and key is not None and isinstance(fields[key], list):
+            fields[key].append(_unquote(stripped[2:].strip()))
+            continue
+        name, sep, value = stripped.partition(":")
+        name = name.strip()
+        if not sep or not name:
+            raise ValueError(f"Invalid front matter line: {line!r}")
+        value = value.strip()
+        if not value:
+            fields[name] = []
+        elif value.startswith("[") and value.endswith("]"):
+            fields[name] = [_unquote(item.strip()) for item in value[1:-1].split(",") if item.strip()]
+        else:
+            fields[name] = _unquote(value)
+        key = name
+    return fields
+
+
+def _unquote(value):
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+class PageMeta():
+    """
+    Metadata for one page: its front matter fields, plus the well-known
+    title, date, tags, template and draft keys. The title falls back to the
+    page's first level-1 heading when the front matter does not set one.
+    """
+
+    def __init__(self, fields=None, title=None):
+        self.fields = {}
+        self.title = title
+        self.date = None
+        self.tags = []
+        self.template = None
+        self.draft = False
+        if fields:
+            self.update(fields)
+
+    def update(self, fields):
+        self.fields.update(fields)
+        if "title" in fields:
+            self.title = _text(fields["title"])
+        if "date" in fields:
+            self.date = _text(fields["date"])
+        if "template" in fields:
+            self.template = _text(fields["template"]) or None
+        if "draft" in fields:
+            self.draft = _text(fields["draft"]).lower() in _true_values
+        if "tags" in fields:
+            tags = fields["tags"]
+            if isinstance(tags, str):
+                tags = tags.split(",")
+            self.tags = [tag.strip() for tag in tags if tag.strip()]
+
+    def context(self):
+        """Template context: Title, Date, Tags and every other field with its first letter capitalized."""
+        context = {}
+        for name, value in self.fields.items():
+            context[name[:1].upper() + name[1:]] = escape_text(_text(value))
+        context["Title"] = None if self.title is None else escape_text(self.title)
+        context["Date"] = escape_text(self.date or "")
+        context["Tags"] = escape_text(", ".join(self.tags))
+        return context
+
+    def to_dict(self):
+        return {"title": self.title, "fields": self.fields}
+
+    @classmethod
+    def from_dict(cls, data):
+        meta = cls(data.get("fields"))
+        meta.title = data.get("title")
+        return meta
+
+    def __eq__(self, other):
+        if not isinstance(other, PageMeta):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self):
+        return f"PageMeta({self.title}, {self.fields})"
+
+
+def _text(value):
+    if isinstance(value, list):
+        return ", ".join(value)
+    return value
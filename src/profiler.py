@@ -0,0 +1,119 @@
+import json
+import os
+import time
+from contextlib import nullcontext
+
+PAGE_PHASES = ("read", "block_split", "inline", "serialize", "template", "write")
+
+_null_phase = nullcontext()
+
+
+def phase(profile, name):
+    """Time a block of code into `profile` (a PageProfile), or do nothing for None."""
+    if profile is None:
+        return _null_phase
+    return _PhaseTimer(profile, name)
+
+
+class _PhaseTimer():
+    """
+    Records a phase's own time: time spent in phases entered inside it is
+    counted only there, so the phases of a profile add up to its wall time.
+    """
+
+    def __init__(self, profile, name):
+        self.profile = profile
+        self.name = name
+
+    def __enter__(self):
+        self.nested = 0.0
+        self.outer = self.profile.current_phase
+        self.profile.current_phase = self
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        elapsed = time.perf_counter() - self.start
+        self.profile.current_phase = self.outer
+        if self.outer is not None:
+            self.outer.nested += elapsed
+        timings = self.profile.timings
+        timings[self.name] = timings.get(self.name, 0.0) + elapsed - self.nested
+
+
+class PageProfile():
+    """
+    Per-page phase timings in seconds. `inline` covers turning a classified
+    block into nodes, which is dominated by text_to_textnodes.
+    """
+
+    def __init__(self, path):
+        self.path = str(path)
+        self.timings = {}
+        self.size = 0
+        self.current_phase = None
+
+    @property
+    def total(self):
+        return sum(self.timings.values())
+
+    def to_dict(self):
+        return {
+            "path": self.path,
+            "bytes": self.size,
+            "total": self.total,
+            "phases": {name: self.timings.get(name, 0.0) for name in PAGE_PHASES},
+        }
+
+
+class BuildProfile():
+    def __init__(self):
+        self.pages = []
+        self.timings = {}
+        self.current_phase = None
+        self._start = time.perf_counter()
+
+    def page(self, path):
+        page = PageProfile(path)
+        self.pages.append(page)
+        return page
+
+    def phase(self, name):
+        return _PhaseTimer(self, name)
+
+    def slowest(self, top=10):
+        return sorted(self.pages, key=lambda page: page.total, reverse=True)[:top]
+
+    def report(self, top=10):
+        phases = {name: 0.0 for name in PAGE_PHASES}
+        for page in self.pages:
+            for name, seconds in page.timings.items():
+                phases[name] += seconds
+        return {
+            "total": time.perf_counter() - self._start,
+            "build": dict(self.timings),
+            "phases": phases,
+            "pages": [page.to_dict() for page in self.pages],
+            "slowest": [page.path for page in self.slowest(top)],
+        }
+
+    def write_json(self, path, top=10):
+        dir_path = os.path.dirname(path)
+        if dir_path != "":
+            os.makedirs(dir_path, exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(self.report(top), f, indent=1)
+
+    def summary(self, top=10):
+        report = self.report(top)
+        lines = [f"Build took {report['total'] * 1000:.1f} ms for {len(self.pages)} rendered page(s)"]
+        for name, seconds in report["build"].items():
+            lines.append(f"  {name:<12} {seconds * 1000:10.2f} ms")
+        lines.append("Page phases:")
+        for name, seconds in report["phases"].items():
+            lines.append(f"  {name:<12} {seconds * 1000:10.2f} ms")
+        if self.pages:
+            lines.append(f"Slowest {min(top, len(self.pages))} page(s):")
+            for page in self.slowest(top):
+                worst = max(page.timings, key=page.timings.get)
+                lines.append(f"  {page.total * 1000:10.2f} ms  {page.path} ({page.size} bytes, mostly {worst})")
+        return "\n".join(lines)
@@ -0,0 +1,260 @@
+import hashlib
+import heapq
+import json
+import os
+import re
+import string
+from collections import Counter
+
+from output import load_state, save_state, write_output
+from pagemeta import split_front_matter
+
+SEARCH_VERSION = 2
+SEARCH_DIR = "search"
+# terms are sharded by their first PREFIX_LENGTH characters
+PREFIX_LENGTH = 2
+MAX_TERM_LENGTH = 32
+
+_word_pattern = re.compile(r"[^\W_]{2,}")
+# link and image targets are not page text
+_url_pattern = re.compile(r"\]\([^)]*\)")
+_shard_chars = frozenset(string.ascii_lowercase + string.digits)
+_ascii_separators = str.maketrans({c: " " for c in string.punctuation})
+
+
+def tokenize(text):
+    return [word for word in _word_pattern.findall(_url_pattern.sub("]", text.lower()))
+            if len(word) <= MAX_TERM_LENGTH]
+
+
+def count_terms(text, counts=None):
+    """
+    Add the term counts of text to counts, with the same terms as
+    tokenize. ASCII punctuation is turned into spaces with str.translate
+    before splitting, and only the distinct words left with other
+    characters go through the regex.
+    """
+    if counts is None:
+        counts = Counter()
+    words = Counter(_url_pattern.sub("]", text.lower()).translate(_ascii_separators).split())
+    for word, count in words.items():
+        if word.isalnum():
+            if 2 <= len(word) <= MAX_TERM_LENGTH:
+                counts[word] += count
+            continue
+        for term in _word_pattern.findall(word):
+            if len(term) <= MAX_TERM_LENGTH:
+                counts[term] += count
+    return counts
+
+
+def file_terms(path, chunk_size=1 << 20):
+    """Count the terms of a Markdown file's body, tokenizing about chunk_size characters at a time."""
+    counts = Counter()
+    with open(path, "r") as f:
+        _, lines = split_front_matter(f)
+        batch = []
+        size = 0
+        for line in lines:
+            batch.append(line)
+            size += len(line)
+            if size >= chunk_size:
+                count_terms("".join(batch), counts)
+                batch = []
+                size = 0
+        count_terms("".join(batch), counts)
+    return dict(counts)
+
+
+def shard_name(term):
+    return "".join(c if c in _shard_chars else "_" for c in term[:PREFIX_LENGTH])
+
+
+class SearchIndex():
+    """
+    Full-text index of the published pages, written as static JSON for
+    client-side search.
+
+    The output directory holds docs.json (`docs`: [url, title] per document
+    id, null for an unused id; `shards`: the shard names) and one
+    <prefix>.json shard per term prefix, mapping each term to its posting
+    list: document ids in increasing order, delta-encoded and interleaved
+    with term counts as [gap, count, gap, count, ...].
+
+    Term counts and document ids per source are kept between builds in a
+    state file. A source is only tokenized again when its size or mtime
+    changes, and keeps its id for as long as it is published; a new source
+    takes the lowest id a removed one freed, or the next unused one. So a
+    change only touches the shards of the terms it adds or removes, and
+    only those are encoded and written again.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        # source -> {"id", "size", "mtime_ns", "terms", "url", "title"}
+        self.documents = {}
+        # shard name -> content hash of the last written shard
+        self.shards = {}
+        self.tokenized = 0
+        self._free_ids = []
+        self._next_id = 0
+        # term -> {doc id: count} and shard name -> terms, built by the first write()
+        self._postings = None
+        self._shard_terms = None
+        self._dirty_shards = set()
+        self._docs_changed = True
+
+    @classmethod
+    def load(cls, path):
+        index = cls(path)
+        data = load_state(path, SEARCH_VERSION)
+        if data is None:
+            return index
+        index.documents = data.get("documents", {})
+        index.shards = data.get("shards", {})
+        ids = {document["id"] for document in index.documents.values()}
+        index._next_id = max(ids) + 1 if ids else 0
+        index._free_ids = [doc_id for doc_id in range(index._next_id) if doc_id not in ids]
+        return index
+
+    def save(self):
+        if self.path is not None:
+            save_state(self.path, SEARCH_VERSION, {"documents": self.documents, "shards": self.shards})
+
+    def update(self, site_index, stat_cache=None):
+        """Bring the index in line with the pages of a SiteIndex, tokenizing only changed sources."""
+        pages = {os.path.normpath(page.source): page for page in site_index.pages}
+        for source in [source for source in self.documents if source not in pages]:
+            self.remove_page(source)
+        for source, page in pages.items():
+            st = os.stat(source) if stat_cache is None else stat_cache.stat(source)
+            self.update_page(source, page.url, page.title, st)
+
+    def update_page(self, source, url, title, st=None):
+        """Index one published page, tokenizing its source unless its size and mtime are unchanged."""
+        source = os.path.normpath(source)
+        if st is None:
+            st = os.stat(source)
+        document = self.documents.get(source)
+        if document is None:
+            document = {"id": self._allocate_id(), "size": None, "mtime_ns": None, "terms": {}}
+            self.documents[source] = document
+            self._docs_changed = True
+        if document["size"] != st.st_size or document["mtime_ns"] != st.st_mtime_ns:
+            terms = file_terms(source)
+            self._reindex(document["id"], document["terms"], terms)
+            document["size"] = st.st_size
+            document["mtime_ns"] = st.st_mtime_ns
+            document["terms"] = terms
+            self.tokenized += 1
+        if document.get("url") != url or document.get("title") != title:
+            document["url"] = url
+            document["title"] = title
+            self._docs_changed = True
+
+    def remove_page(self, source):
+        """Drop a page that is no longer published; its id is reused by the next new page."""
+        document = self.documents.pop(os.path.normpath(source), None)
+        if document is None:
+            return
+        self._reindex(document["id"], document["terms"], {})
+        heapq.heappush(self._free_ids, document["id"])
+        self._docs_changed = True
+
+    def _allocate_id(self):
+        if self._free_ids:
+            return heapq.heappop(self._free_ids)
+        self._next_id += 1
+        return self._next_id - 1
+
+    def _reindex(self, doc_id, old_terms, new_terms):
+        """Replace a document's term counts in the postings; only shards with a changed count become dirty."""
+        if self._postings is None:
+            return
+        for term, count in old_terms.items():
+            if new_terms.get(term) == count:
+                continue
+            name = shard_name(term)
+            self._dirty_shards.add(name)
+            if term in new_terms:
+                continue
+            postings = self._postings[term]
+            del postings[doc_id]
+            if not postings:
+                del self._postings[term]
+                self._shard_terms[name].discard(term)
+        for term, count in new_terms.items():
+            if old_terms.get(term) == count:
+                continue
+            postings = self._postings.get(term)
+            if postings is None:
+                postings = self._postings[term] = {}
+                self._shard_terms.setdefault(shard_name(term), set()).add(term)
+            postings[doc_id] = count
+            self._dirty_shards.add(shard_name(term))
+
+    def _build_postings(self):
+        self._postings = {}
+        self._shard_terms = {}
+        for document in self.documents.values():
+            self._reindex(document["id"], {}, document["terms"])
+        # shards that no longer have terms still need dropping
+        self._dirty_shards.update(self.shards)
+
+    def postings(self, term):
+        """The [doc id, count, ...] posting list of term, in increasing doc id order."""
+        if self._postings is None:
+            self._build_postings()
+        postings = self._postings.get(term, {})
+        return [value for doc_id in sorted(postings) for value in (doc_id, postings[doc_id])]
+
+    def docs(self):
+        """[url, title] per document id, None for unused ids."""
+        docs = [None] * self._next_id
+        for document in self.documents.values():
+            docs[document["id"]] = [document["url"], document["title"]]
+        return docs
+
+    def write(self, public_dir):
+        """Write docs.json and the changed shards; returns every path belonging to the index."""
+        out_dir = os.path.join(public_dir, SEARCH_DIR)
+        os.makedirs(out_dir, exist_ok=True)
+        if self._postings is None:
+            self._build_postings()
+        dirty, self._dirty_shards = self._dirty_shards, set()
+        for name in sorted(dirty):
+            path = os.path.join(out_dir, f"{name}.json")
+            terms = self._shard_terms.get(name)
+            if not terms:
+                self._shard_terms.pop(name, None)
+                if self.shards.pop(name, None) is not None:
+                    self._docs_changed = True
+                    if os.path.exists(path):
+                        os.remove(path)
+                continue
+            encoded = {}
+            for term in sorted(terms):
+                postings = self._postings[term]
+                gaps = []
+                previous = 0
+                for doc_id in sorted(postings):
+                    gaps.append(doc_id - previous)
+                    gaps.append(postings[doc_id])
+                    previous = doc_id
+                encoded[term] = gaps
+            data = json.dumps(encoded, separators=(",", ":"))
+            shard_hash = hashlib.blake2b(data.encode(), digest_size=16).hexdigest()
+            if name not in self.shards:
+                self._docs_changed = True
+            if self.shards.get(name) != shard_hash or not os.path.exists(path):
+                write_output(path, data)
+            self.shards[name] = shard_hash
+
+        docs_path = os.path.normpath(os.path.join(out_dir, "docs.json"))
+        if self._docs_changed or not os.path.exists(docs_path):
+            write_output(docs_path, json.dumps({"prefix": PREFIX_LENGTH, "shards": sorted(self.shards),
+                                                "docs": self.docs()}, separators=(",", ":")))
+            self._docs_changed = False
+        written = {os.path.normpath(os.path.join(out_dir, f"{name}.json")) for name in self.shards}
+        written.add(docs_path)
+        return written
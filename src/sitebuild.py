@@ -0,0 +1,218 @@
+import logging
+import os
+import posixpath
+from contextlib import nullcontext
+
+from assets import AssetManifest, rewrite_urls, set_asset_urls
+from backends import FileSystemSink, FileSystemSource
+from blockcache import BlockCache
+from compress import MIN_SIZE, Precompressor
+from discovery import CONTENT_IGNORE_PATTERNS, PAGE_PATTERNS, PathFilter, StatCache
+from manifest import BuildManifest
+from profiler import BuildProfile
+from search import SearchIndex
+from siteindex import SiteIndex, site_index_files, write_site_index
+from sync import remove_stale_outputs, sync_directory
+from templates import SourceTemplateResolver, Template
+from textutils import generate_pages_parallel, generate_pages_recursive, render_page, scan_metadata
+
+
+class BuildConfig():
+    """
+    What to build and how. Paths are relative to the source's root.
+
+    The manifest, block cache and the other state that makes builds
+    incremental live in state_dir, and are used only when both source and
+    sink are on the filesystem; so are fingerprinting, precompression, the
+    search index and profiling. Any other source or sink gets a full build of
+    the pages, static files, listings, sitemap and feed, and a warning naming
+    the options it ignores.
+    """
+
+    def __init__(self, source=None, sink=None, content_dir="content", static_dir="static",
+                 template_path="template.html", state_dir=".sitegen", jobs=1, clean=False, checksum=False,
+                 link=False, block_cache_mb=64, base_url=None, per_page=10, fingerprint=False,
+                 precompress=False, precompress_min_size=MIN_SIZE, search=False, profile=False):
+        self.source = FileSystemSource() if source is None else source
+        self.sink = FileSystemSink("public") if sink is None else sink
+        self.content_dir = content_dir
+        self.static_dir = static_dir
+        self.template_path = template_path
+        self.state_dir = state_dir
+        self.jobs = jobs
+        self.clean = clean
+        self.checksum = checksum
+        self.link = link
+        self.block_cache_mb = block_cache_mb
+        self.base_url = base_url
+        self.per_page = per_page
+        self.fingerprint = fingerprint
+        self.precompress = precompress
+        self.precompress_min_size = precompress_min_size
+        self.search = search
+        self.profile = profile
+
+
+class BuildResult():
+    def __init__(self, pages, outputs, manifest=None, block_cache=None, search_index=None, assets=None,
+                 profile=None, compressor=None):
+        # (source, output) per published page
+        self.pages = pages
+        self.outputs = outputs
+        self.manifest = manifest
+        self.block_cache = block_cache
+        self.search_index = search_index
+        self.assets = assets
+        self.profile = profile
+        self.compressor = compressor
+
+
+def build_site(config):
+    """Build the site described by a BuildConfig; returns a BuildResult."""
+    if isinstance(config.source, FileSystemSource) and isinstance(config.sink, FileSystemSink):
+        return _build_incremental(config)
+    return _build_full(config)
+
+
+def _build_full(config):
+    source, sink = config.source, config.sink
+    ignored = [name for name in ("clean", "checksum", "link", "fingerprint", "precompress", "search", "profile")
+               if getattr(config, name)]
+    if config.jobs != 1:
+        ignored.insert(0, "jobs")
+    if ignored:
+        logging.warning(f"Only filesystem builds use {', '.join(ignored)}; ignoring them")
+    # pages link to the plain asset URLs, whatever an earlier build in this process fingerprinted
+    set_asset_urls(None)
+    outputs = set()
+    static_dir = posixpath.normpath(config.static_dir)
+    for path in source.files(static_dir, PathFilter()):
+        output = posixpath.relpath(path, static_dir)
+        sink.write(output, source.read_bytes(path))
+        outputs.add(output)
+
+    content_dir = posixpath.normpath(config.content_dir)
+    resolver = SourceTemplateResolver(source, content_dir, config.template_path)
+    templates = {}
+    site_index = SiteIndex(".")
+    pages = []
+    for path in source.files(content_dir, PathFilter(PAGE_PATTERNS, CONTENT_IGNORE_PATTERNS)):
+        markdown = source.read_text(path)
+        meta = scan_metadata(markdown.split("\n"))
+        if meta.draft:
+            continue
+        template = _source_template(source, resolver.resolve(path, meta.template), templates)
+        page, meta = render_page(markdown, template)
+        output = posixpath.splitext(posixpath.relpath(path, content_dir))[0] + ".html"
+        sink.write(output, page)
+        outputs.add(output)
+        pages.append((path, output))
+        site_index.add(path, output, meta, len(markdown))
+
+    template = _source_template(source, config.template_path, templates)
+    for path, text in site_index_files(site_index, template, config.base_url, config.per_page):
+        output = os.path.normpath(path).replace(os.sep, "/")
+        sink.write(output, text)
+        outputs.add(output)
+    return BuildResult(pages, outputs)
+
+
+def _source_template(source, path, templates):
+    """Compile a template read from the source, once per build like load_template does on disk."""
+    template = templates.get(path)
+    if template is None:
+        template = templates[path] = Template(rewrite_urls(source.read_text(path)), path)
+    return template
+
+
+def _load_state(cls, clean, path, *args):
+    return cls(path, *args) if clean else cls.load(path, *args)
+
+
+def _build_incremental(config):
+    root = config.source.root
+    content_dir = os.path.join(root, config.content_dir)
+    static_dir = os.path.join(root, config.static_dir)
+    template_path = os.path.join(root, config.template_path)
+    state_dir = os.path.join(root, config.state_dir)
+    public_dir = config.sink.root
+
+    profile = BuildProfile() if config.profile else None
+    jobs = config.jobs
+    if profile is not None and jobs != 1:
+        logging.info("Profiling renders pages serially; ignoring --jobs")
+        jobs = 1
+
+    # a clean build ignores the saved state instead of deleting public/: every
+    # output is replaced in place and stale ones are removed at the end, so
+    # the site being served is never missing files
+    clean = config.clean
+    stat_cache = StatCache()
+    with profile.phase("static_sync") if profile else nullcontext():
+        static_files = sync_directory(static_dir, public_dir, checksum=config.checksum or clean, link=config.link,
+                                      stat_cache=stat_cache)
+    assets = None
+    if config.fingerprint:
+        with profile.phase("assets") if profile else nullcontext():
+            assets = _load_state(AssetManifest, clean, os.path.join(state_dir, "assets.json"))
+            assets.update(static_dir, stat_cache)
+            static_files |= assets.write(static_dir, public_dir, link=config.link)
+            assets.save()
+
+    logging.info("Generating pages")
+
+    manifest = _load_state(BuildManifest, clean, os.path.join(state_dir, "manifest.json"))
+    block_cache = None
+    if config.block_cache_mb > 0:
+        block_cache = _load_state(BlockCache, clean, os.path.join(state_dir, "blocks.json"),
+                                  config.block_cache_mb * 1024 * 1024)
+    asset_digest = set_asset_urls(None if assets is None else assets.urls())
+    manifest.assets = asset_digest
+    if block_cache is not None:
+        block_cache.salt = asset_digest
+    site_index = SiteIndex(public_dir)
+    search_index = None
+    if config.search:
+        search_index = _load_state(SearchIndex, clean, os.path.join(state_dir, "search.json"))
+    compressor = None
+    if config.precompress:
+        compressor = _load_state(Precompressor, clean, os.path.join(state_dir, "compress.json"),
+                                 config.precompress_min_size)
+    try:
+        if jobs == 1:
+            pages = generate_pages_recursive(content_dir, template_path, public_dir, manifest, profile,
+                                             block_cache, stat_cache, site_index, compressor)
+        else:
+            pages = generate_pages_parallel(content_dir, template_path, public_dir, manifest,
+                                            workers=jobs or None, block_cache=block_cache,
+                                            stat_cache=stat_cache, site_index=site_index, compressor=compressor,
+                                            clean=clean)
+        manifest.prune(source for source, _ in pages)
+        with profile.phase("site_index") if profile else nullcontext():
+            index_files = write_site_index(site_index, template_path, config.base_url, config.per_page)
+        if search_index is not None:
+            with profile.phase("search_index") if profile else nullcontext():
+                search_index.update(site_index, stat_cache)
+                index_files |= search_index.write(public_dir)
+        outputs = static_files | index_files | {os.path.normpath(str(dest)) for _, dest in pages}
+        if compressor is not None:
+            with profile.phase("precompress") if profile else nullcontext():
+                # rendered pages were handed over as they were written; the rest
+                # (static files, indexes, unchanged pages) are skipped by stat when unchanged
+                compressor.wait()
+                for path in sorted(outputs):
+                    compressor.add_file(path)
+                compressor.wait()
+                outputs |= compressor.variants(outputs)
+            logging.info(compressor.report())
+        remove_stale_outputs(public_dir, outputs)
+    finally:
+        manifest.save()
+        if block_cache is not None:
+            block_cache.save()
+        if search_index is not None:
+            search_index.save()
+        if compressor is not None:
+            compressor.wait()
+            compressor.save()
+    return BuildResult(pages, outputs, manifest, block_cache, search_index, assets, profile, compressor)
@@ -0,0 +1,195 @@
+import os
+import posixpath
+
+from escape import escape_attr, escape_text
+from leafnode import LeafNode
+from output import write_output
+from pagemeta import PageMeta
+from parentnode import ParentNode
+from templates import load_template
+
+SITEMAP_NAME = "sitemap.xml"
+FEED_NAME = "feed.xml"
+# listing page n of a section is written to <section>/page/<n>/index.html
+LISTING_DIR = "page"
+
+
+class IndexedPage():
+    def __init__(self, source, output, url, title, date, size, tags):
+        self.source = source
+        self.output = output
+        self.url = url
+        self.title = title
+        self.date = date
+        self.size = size
+        self.tags = tags
+
+    def __repr__(self):
+        return f"IndexedPage({self.url}, {self.title}, {self.date})"
+
+
+class SiteIndex():
+    """
+    Metadata of every published page, collected while pages are discovered
+    and rendered, from which the sitemap, feed and section listings are
+    written without reading any Markdown again.
+    """
+
+    def __init__(self, public_dir):
+        self.public_dir = os.path.normpath(str(public_dir))
+        self.pages = []
+
+    def add(self, source, output, meta, size):
+        output = os.path.normpath(str(output))
+        self.pages.append(IndexedPage(source, output, self.url(output), meta.title, meta.date, size, meta.tags))
+
+    @classmethod
+    def from_manifest(cls, manifest, public_dir):
+        """Rebuild the index from the metadata a BuildManifest recorded."""
+        index = cls(public_dir)
+        for source in sorted(manifest.entries):
+            entry = manifest.entries[source]
+            if entry.get("meta") is not None:
+                index.add(source, entry["output"], PageMeta.from_dict(entry["meta"]), entry["size"])
+        return index
+
+    def url(self, output):
+        rel_path = os.path.relpath(output, self.public_dir).replace(os.sep, "/")
+        if rel_path == "index.html":
+            return "/"
+        if rel_path.endswith("/index.html"):
+            return f"/{rel_path[:-len('index.html')]}"
+        return f"/{rel_path}"
+
+    def by_date(self):
+        """Pages newest first; undated pages last, each group in URL order."""
+        dated = sorted((page for page in self.pages if page.date), key=lambda page: page.url)
+        dated.sort(key=lambda page: page.date, reverse=True)
+        undated = sorted((page for page in self.pages if not page.date), key=lambda page: page.url)
+        return dated + undated
+
+    def sections(self):
+        """
+        Map each section URL ("/blog/") to (its index page or None, its other
+        pages newest first). Pages named index.html are their directory's
+        index page and are not listed anywhere.
+        """
+        sections = {}
+        for page in self.by_date():
+            if page.url.endswith("/"):
+                sections.setdefault(page.url, [None, []])[0] = page
+            else:
+                # "/about.html" belongs to "/", not "//"
+                section = posixpath.dirname(page.url).rstrip("/") + "/"
+                sections.setdefault(section, [None, []])[1].append(page)
+        return {section: (index, pages) for section, (index, pages) in sorted(sections.items())}
+
+
+def site_index_files(index, template, base_url=None, per_page=10, feed_limit=20):
+    """
+    Yield (path, text) for the section listings, and with a base_url the
+    sitemap and Atom feed, with paths inside the index's public directory.
+    """
+    yield from section_listings(index, template, per_page)
+    if base_url:
+        yield os.path.join(index.public_dir, SITEMAP_NAME), sitemap_xml(index, base_url)
+        yield os.path.join(index.public_dir, FEED_NAME), feed_xml(index, base_url, feed_limit)
+
+
+def write_site_index(index, template_path, base_url=None, per_page=10, feed_limit=20):
+    """
+    Write the files of site_index_files into the public directory, leaving
+    unchanged ones alone. Returns every path belonging to the index.
+    """
+    written = set()
+    for path, text in site_index_files(index, load_template(template_path), base_url, per_page, feed_limit):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        write_output(path, text)
+        written.add(os.path.normpath(path))
+    return written
+
+
+def sitemap_xml(index, base_url):
+    base_url = base_url.rstrip("/")
+    parts = ['<?xml version="1.0" encoding="UTF-8"?>\n',
+             '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">\n']
+    for page in sorted(index.pages, key=lambda page: page.url):
+        parts.append(f"<url><loc>{escape_text(base_url + page.url)}</loc>")
+        if page.date:
+            parts.append(f"<lastmod>{escape_text(page.date)}</lastmod>")
+        parts.append("</url>\n")
+    parts.append("</urlset>\n")
+    return "".join(parts)
+
+
+def feed_xml(index, base_url, limit=20):
+    base_url = base_url.rstrip("/")
+    entries = [page for page in index.by_date() if page.date][:limit]
+    home = next((page for page in index.pages if page.url == "/"), None)
+    title = home.title if home is not None and home.title else base_url
+    parts = ['<?xml version="1.0" encoding="utf-8"?>\n',
+             '<feed xmlns="http://www.w3.org/2005/Atom">\n',
+             f"<title>{escape_text(title)}</title>\n",
+             f'<link href="{escape_attr(base_url)}/"/>\n',
+             f'<link rel="self" href="{escape_attr(base_url)}/{FEED_NAME}"/>\n',
+             f"<id>{escape_text(base_url)}/</id>\n"]
+    if entries:
+        parts.append(f"<updated>{_atom_date(entries[0].date)}</updated>\n")
+    for page in entries:
+        url = base_url + page.url
+        parts.append(f"<entry><title>{escape_text(page.title or page.url)}</title>"
+                     f'<link href="{escape_attr(url)}"/><id>{escape_text(url)}</id>'
+                     f"<updated>{_atom_date(page.date)}</updated></entry>\n")
+    parts.append("</feed>\n")
+    return "".join(parts)
+
+
+def _atom_date(date):
+    date = escape_text(date)
+    return f"{date}T00:00:00Z" if len(date) == 10 else date
+
+
+def section_listings(index, template, per_page=10):
+    """
+    Yield (path, html) for paginated listings of every section with pages
+    besides its own index page. A section without an index page also gets
+    page 1 as its index.html. Paths a published page is written to are
+    left to that page.
+    """
+    published = {page.output for page in index.pages}
+    for section, (section_page, pages) in index.sections().items():
+        if not pages:
+            continue
+        title = section_page.title if section_page is not None and section_page.title else section
+        count = (len(pages) + per_page - 1) // per_page
+        section_dir = os.path.join(index.public_dir, *section.strip("/").split("/"))
+        for number in range(1, count + 1):
+            content = _listing_node(section, pages[(number - 1) * per_page:number * per_page], number, count)
+            context = PageMeta({"title": title}).context()
+            context["Content"] = content.to_html()
+            page = template.render(context)
+            paths = [os.path.join(section_dir, LISTING_DIR, str(number), "index.html")]
+            if number == 1 and section_page is None:
+                paths.append(os.path.join(section_dir, "index.html"))
+            for path in paths:
+                if os.path.normpath(path) not in published:
+                    yield path, page
+
+
+def _listing_node(section, pages, number, count):
+    items = []
+    for page in pages:
+        children = [LeafNode("a", page.title or page.url, {"href": page.url})]
+        if page.date:
+            children.append(LeafNode(None, " "))
+            children.append(LeafNode("time", page.date, {"datetime": page.date}))
+        items.append(ParentNode("li", children))
+    children = [ParentNode("ul", items)]
+    links = []
+    if number > 1:
+        links.append(LeafNode("a", "Newer", {"href": f"{section}{LISTING_DIR}/{number - 1}/", "rel": "prev"}))
+    if number < count:
+        links.append(LeafNode("a", "Older", {"href": f"{section}{LISTING_DIR}/{number + 1}/", "rel": "next"}))
+    if links:
+        children.append(ParentNode("nav", links))
+    return ParentNode("div", children)
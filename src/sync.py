@@ -0,0 +1,123 @@
+import os
+import shutil
+import logging
+
+from discovery import scan_tree
+from manifest import file_digest
+from output import temporary_path
+
+# files at least this big are copied with os.copy_file_range when available,
+# which lets the kernel (or a reflink-capable filesystem) do the work
+LARGE_FILE_SIZE = 1 << 20
+
+
+def _is_unchanged(src_stat, src_path, dest_path, checksum):
+    try:
+        dest_stat = os.stat(dest_path)
+    except FileNotFoundError:
+        return False
+    if src_stat.st_size != dest_stat.st_size:
+        return False
+    if (src_stat.st_dev, src_stat.st_ino) == (dest_stat.st_dev, dest_stat.st_ino):
+        return True
+    if checksum:
+        return file_digest(src_path) == file_digest(dest_path)
+    return src_stat.st_mtime_ns == dest_stat.st_mtime_ns
+
+
+def _copy_file_range(src_path, dest_path, size):
+    with open(src_path, "rb") as src, open(dest_path, "wb") as dest:
+        remaining = size
+        while remaining > 0:
+            copied = os.copy_file_range(src.fileno(), dest.fileno(), remaining)
+            if copied == 0:
+                break
+            remaining -= copied
+
+
+def copy_file(src_path, dest_path, size=None, link=False):
+    """
+    Copy (or hardlink) src_path to a temporary file next to dest_path and
+    rename it over dest_path, so dest_path is never missing or half copied.
+    """
+    tmp_path = temporary_path(dest_path)
+    try:
+        _copy_to(src_path, tmp_path, size, link)
+        os.replace(tmp_path, dest_path)
+    except BaseException:
+        if os.path.lexists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def _copy_to(src_path, dest_path, size, link):
+    if os.path.lexists(dest_path):
+        os.remove(dest_path)
+    if link:
+        try:
+            os.link(src_path, dest_path)
+            return
+        except OSError:
+            pass
+    if size is None:
+        size = os.path.getsize(src_path)
+    if size >= LARGE_FILE_SIZE and hasattr(os, "copy_file_range"):
+        try:
+            _copy_file_range(src_path, dest_path, size)
+        except OSError:
+            shutil.copyfile(src_path, dest_path)
+    else:
+        shutil.copyfile(src_path, dest_path)
+    shutil.copystat(src_path, dest_path)
+
+
+def sync_directory(src_dir, dest_dir, checksum=False, link=False, path_filter=None, stat_cache=None):
+    """
+    Make dest_dir contain a copy of every file in src_dir.
+
+    Files whose size and mtime (or content hash, with checksum=True) already
+    match are left alone. Copies keep the source mtime so the next sync can
+    compare cheaply. With link=True files are hardlinked instead of copied
+    when the filesystem allows it. Files rejected by path_filter (by default
+    editor swap files and version control directories) are skipped. Returns the set of
+    destination paths that belong to src_dir; nothing in dest_dir is deleted
+    here.
+    """
+    if not os.path.exists(src_dir):
+        raise FileNotFoundError(f"Source directory '{src_dir}' does not exist")
+
+    synced = set()
+    made_dirs = set()
+    copied = 0
+    src_root = os.path.normpath(src_dir)
+    os.makedirs(dest_dir, exist_ok=True)
+    for sp, st in scan_tree(src_root, path_filter, stat_cache):
+        dp = os.path.normpath(os.path.join(dest_dir, os.path.relpath(sp, src_root)))
+        synced.add(dp)
+        if _is_unchanged(st, sp, dp, checksum):
+            continue
+        out_dir = os.path.dirname(dp)
+        if out_dir not in made_dirs:
+            os.makedirs(out_dir, exist_ok=True)
+            made_dirs.add(out_dir)
+        logging.info(f"Copying file: {sp} -> {dp}")
+        copy_file(sp, dp, st.st_size, link)
+        copied += 1
+    logging.info(f"Synced {src_dir} -> {dest_dir}: {copied} copied, {len(synced) - copied} unchanged")
+    return synced
+
+
+def remove_stale_outputs(dest_dir, keep):
+    """Delete files under dest_dir that are not in keep, then any empty directories."""
+    keep = {os.path.normpath(str(path)) for path in keep}
+    removed = []
+    for dir_path, _, filenames in os.walk(dest_dir, topdown=False):
+        for filename in filenames:
+            path = os.path.normpath(os.path.join(dir_path, filename))
+            if path not in keep:
+                logging.info(f"Removing stale file: {path}")
+                os.remove(path)
+                removed.append(path)
+        if dir_path != dest_dir and not os.listdir(dir_path):
+            os.rmdir(dir_path)
+    return removed
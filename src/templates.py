@@ -0,0 +1,134 @@
+import os
+import posixpath
+import re
+
+from assets import asset_digest, rewrite_urls
+
+OVERRIDE_TEMPLATE_NAME = "_template.html"
+
+_placeholder_pattern = re.compile(r"\{\{\s*(\w+)\s*\}\}")
+
+
+class Template():
+    """
+    A page template split once into literal segments and named slots.
+
+    `{{ Name }}` placeholders become slots; rendering joins the literals with
+    the context values in a single pass. Placeholders missing from the
+    context are left in the output untouched.
+    """
+
+    def __init__(self, source, path=None):
+        self.path = path
+        self.segments = []
+        self.slots = []
+        self.placeholders = []
+        pos = 0
+        for match in _placeholder_pattern.finditer(source):
+            self.segments.append(source[pos:match.start()])
+            self.slots.append(match.group(1))
+            self.placeholders.append(match.group(0))
+            pos = match.end()
+        self.segments.append(source[pos:])
+
+    @classmethod
+    def from_file(cls, path):
+        with open(path, "r") as f:
+            return cls(f.read(), path)
+
+    def render(self, context):
+        parts = [self.segments[0]]
+        for i, name in enumerate(self.slots):
+            value = context.get(name)
+            if value is None:
+                parts.append(self.placeholders[i])
+            else:
+                parts.append(value if isinstance(value, str) else str(value))
+            parts.append(self.segments[i + 1])
+        return "".join(parts)
+
+    def render_to(self, stream, context):
+        """
+        Write the rendered template to `stream`. A callable context value is
+        called with the stream and writes its slot's content itself.
+        """
+        stream.write(self.segments[0])
+        for i, name in enumerate(self.slots):
+            value = context.get(name)
+            if value is None:
+                stream.write(self.placeholders[i])
+            elif callable(value):
+                value(stream)
+            else:
+                stream.write(value if isinstance(value, str) else str(value))
+            stream.write(self.segments[i + 1])
+
+
+# path -> (mtime_ns, size, asset digest, Template); each process compiles a template once
+_template_cache = {}
+
+
+def load_template(path):
+    """Load and compile a template, with its asset URLs pointed at the fingerprinted copies."""
+    path = os.path.normpath(str(path))
+    st = os.stat(path)
+    digest = asset_digest()
+    cached = _template_cache.get(path)
+    if cached is not None and cached[:3] == (st.st_mtime_ns, st.st_size, digest):
+        return cached[3]
+    with open(path, "r") as f:
+        template = Template(rewrite_urls(f.read()), path)
+    _template_cache[path] = (st.st_mtime_ns, st.st_size, digest, template)
+    return template
+
+
+class TemplateResolver():
+    """
+    Picks the template for a page: the nearest `_template.html` in the page's
+    directory or one of its parents inside the content root, falling back to
+    the site-wide default template. With a StatCache from the content scan,
+    missing overrides are ruled out without touching the filesystem.
+    """
+
+    # module the resolver joins and splits its paths with
+    path = os.path
+
+    def __init__(self, content_root, default_path, stat_cache=None):
+        self.content_root = self.path.normpath(str(content_root))
+        self.default_path = default_path
+        self._isfile = os.path.isfile if stat_cache is None else stat_cache.isfile
+        self._by_dir = {}
+
+    def resolve(self, source_path, name=None):
+        """
+        `name` is a template chosen by the page itself, given relative to the
+        directory of the default template; it wins over any override.
+        """
+        path = self.path
+        if name is not None:
+            return path.normpath(path.join(path.dirname(str(self.default_path)), name))
+        return self._resolve_dir(path.dirname(path.normpath(str(source_path))))
+
+    def _resolve_dir(self, dir_path):
+        cached = self._by_dir.get(dir_path)
+        if cached is not None:
+            return cached
+        candidate = self.path.join(dir_path, OVERRIDE_TEMPLATE_NAME)
+        if self._isfile(candidate):
+            resolved = candidate
+        elif dir_path == self.content_root or dir_path in ("", self.path.sep):
+            resolved = self.default_path
+        else:
+            resolved = self._resolve_dir(self.path.dirname(dir_path))
+        self._by_dir[dir_path] = resolved
+        return resolved
+
+
+class SourceTemplateResolver(TemplateResolver):
+    """A TemplateResolver over the "/"-separated paths of a build source (see backends)."""
+
+    path = posixpath
+
+    def __init__(self, source, content_root, default_path):
+        super().__init__(content_root, default_path)
+        self._isfile = source.isfile
@@ -0,0 +1,122 @@
+import hashlib
+import json
+import os
+import unittest
+from unittest import mock
+
+import assets
+from assets import AssetManifest, asset_url, fingerprint_path, hash_file, rewrite_urls, set_asset_urls
+from blockcache import BlockCache
+from fixtures import TempDirTestCase, read, write
+from manifest import BuildManifest
+from textnode import TextNode, TextType
+from textutils import generate_pages_recursive, markdown_to_html, text_node_to_html_node
+
+
+class TestAssetUrls(unittest.TestCase):
+    def setUp(self):
+        set_asset_urls({"/index.css": "/index.0123456789.css", "/images/a.png": "/images/a.abcdef0123.png"})
+
+    def tearDown(self):
+        set_asset_urls(None)
+
+    def test_fingerprint_path(self):
+        self.assertEqual(fingerprint_path("images/a.png", "abcdef0123456789"), "images/a.abcdef0123.png")
+
+    def test_asset_url(self):
+        self.assertEqual(asset_url("/index.css"), "/index.0123456789.css")
+        self.assertEqual(asset_url("/index.css?v=1#top"), "/index.0123456789.css?v=1#top")
+        self.assertEqual(asset_url("/other.css"), "/other.css")
+        self.assertEqual(asset_url("https://example.com/index.css"), "https://example.com/index.css")
+
+    def test_rewrite_urls(self):
+        html = '<link href="/index.css" rel="stylesheet"><img src=\'/images/a.png\'><a href="/x/">x</a>'
+        self.assertEqual(rewrite_urls(html),
+                         '<link href="/index.0123456789.css" rel="stylesheet">'
+                         '<img src=\'/images/a.abcdef0123.png\'><a href="/x/">x</a>')
+
+    def test_inline_urls(self):
+        node = text_node_to_html_node(TextNode("alt", TextType.IMAGE, "/images/a.png"))
+        self.assertEqual(node.props["src"], "/images/a.abcdef0123.png")
+        self.assertEqual(markdown_to_html("[css](/index.css) ![a](/images/a.png)"),
+                         '<div><p><a href="/index.0123456789.css">css</a> '
+                         '<img src="/images/a.abcdef0123.png" alt="a"></img></p></div>')
+
+    def test_block_cache_key_includes_salt(self):
+        cache = BlockCache()
+        key = cache.key("paragraph", ["![a](/images/a.png)"])
+        cache.salt = set_asset_urls({"/images/a.png": "/images/a.ffffffffff.png"})
+        self.assertNotEqual(cache.key("paragraph", ["![a](/images/a.png)"]), key)
+
+
+class TestAssetManifest(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "public")
+        self.state = os.path.join(self.root, "state", "assets.json")
+        write(os.path.join(self.static, "index.css"), "body { color: red; }")
+        write(os.path.join(self.static, "images", "a.png"), b"\x89PNG" + bytes(range(256)) * 64)
+        write(os.path.join(self.static, "robots.txt"), "User-agent: *")
+
+    def tearDown(self):
+        set_asset_urls(None)
+
+    def test_hash_file_mmap(self):
+        path = os.path.join(self.static, "images", "a.png")
+        with open(path, "rb") as f:
+            expected = hashlib.blake2b(f.read(), digest_size=16).hexdigest()
+        self.assertEqual(hash_file(path), expected)
+        with mock.patch.object(assets, "MMAP_THRESHOLD", 1):
+            self.assertEqual(hash_file(path), expected)
+
+    def test_update_hashes_changed_assets_only(self):
+        manifest = AssetManifest.load(self.state)
+        manifest.update(self.static)
+        self.assertEqual(manifest.hashed, 2)
+        self.assertEqual(sorted(manifest.entries), ["images/a.png", "index.css"])
+        manifest.save()
+
+        manifest = AssetManifest.load(self.state)
+        manifest.update(self.static)
+        self.assertEqual(manifest.hashed, 0)
+        write(os.path.join(self.static, "index.css"), "body { color: blue; }")
+        manifest.update(self.static)
+        self.assertEqual(manifest.hashed, 1)
+
+    def test_write(self):
+        manifest = AssetManifest()
+        manifest.update(self.static)
+        written = manifest.write(self.static, self.public)
+        urls = manifest.urls()
+        css = os.path.normpath(os.path.join(self.public, urls["/index.css"][1:]))
+        self.assertIn(css, written)
+        self.assertRegex(urls["/index.css"], r"^/index\.[0-9a-f]{10}\.css$")
+        self.assertEqual(read(css), "body { color: red; }")
+        with open(os.path.join(self.public, "assets.json")) as f:
+            self.assertEqual(json.load(f), urls)
+
+    def test_pages_rerender_when_asset_urls_change(self):
+        content = os.path.join(self.root, "content")
+        template = os.path.join(self.root, "template.html")
+        write(os.path.join(content, "index.md"), "# Home\n\n![a](/images/a.png)\n")
+        write(template, '<link href="/index.css">{{ Content }}')
+        page = os.path.join(self.public, "index.html")
+        manifest = BuildManifest()
+        assets_manifest = AssetManifest()
+        assets_manifest.update(self.static)
+        manifest.assets = set_asset_urls(assets_manifest.urls())
+        generate_pages_recursive(content, template, self.public, manifest)
+        urls = assets_manifest.urls()
+        self.assertIn(urls["/index.css"], read(page))
+        self.assertIn(urls["/images/a.png"], read(page))
+
+        manifest.assets = set_asset_urls(None)
+        self.assertFalse(manifest.is_current(os.path.join(content, "index.md"), template, page))
+        generate_pages_recursive(content, template, self.public, manifest)
+        self.assertIn('<link href="/index.css">', read(page))
+        self.assertIn('src="/images/a.png"', read(page))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,80 @@
+import os
+import tempfile
+import unittest
+
+from blockcache import BlockCache
+from textutils import generate_pages_parallel, markdown_to_html, markdown_to_html_node
+
+
+class TestBlockCache(unittest.TestCase):
+    def test_lru_eviction_by_size(self):
+        cache = BlockCache(max_size=10)
+        cache.put("a", "aaaa")
+        cache.put("b", "bbbb")
+        self.assertEqual(cache.get("a"), "aaaa")
+        cache.put("c", "cccc")
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(list(cache.entries), ["a", "c"])
+        self.assertEqual(cache.size, 8)
+
+    def test_oversized_fragment_is_not_cached(self):
+        cache = BlockCache(max_size=3)
+        cache.put("a", "aaaa")
+        self.assertEqual(len(cache.entries), 0)
+
+    def test_save_and_load(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "cache", "blocks.json")
+            cache = BlockCache(path)
+            cache.put("a", "<p>a</p>")
+            cache.put("b", "<p>b</p>")
+            cache.get("a")
+            cache.save()
+            loaded = BlockCache.load(path)
+            self.assertEqual(list(loaded.entries.items()), [("b", "<p>b</p>"), ("a", "<p>a</p>")])
+
+    def test_merge_changes(self):
+        worker = BlockCache()
+        worker.put("old", "x")
+        worker.track_changes = True
+        worker.get("old")
+        worker.put("new", "y")
+        parent = BlockCache()
+        parent.put("old", "x")
+        parent.put("other", "z")
+        parent.merge_changes(worker.take_changes())
+        self.assertEqual(list(parent.entries), ["other", "old", "new"])
+        self.assertEqual(worker.take_changes(), ([], []))
+
+
+class TestCachedRendering(unittest.TestCase):
+    def test_only_changed_blocks_are_rendered(self):
+        markdown = "# Title\n\nfirst **para**\n\n- a\n- b\n\nlast para"
+        cache = BlockCache()
+        html = markdown_to_html(markdown, cache)
+        self.assertEqual(html, markdown_to_html_node(markdown).to_html())
+        self.assertEqual((cache.hits, cache.misses), (0, 4))
+
+        edited = markdown.replace("last para", "last *edited* para")
+        html = markdown_to_html(edited, cache)
+        self.assertEqual(html, markdown_to_html_node(edited).to_html())
+        self.assertEqual((cache.hits, cache.misses), (3, 5))
+
+    def test_parallel_workers_send_back_new_entries(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            os.makedirs(content)
+            template = os.path.join(root, "template.html")
+            with open(template, "w") as f:
+                f.write("{{ Content }}")
+            for i in range(4):
+                with open(os.path.join(content, f"page{i}.md"), "w") as f:
+                    f.write(f"# Page {i}\n\nshared paragraph")
+            cache = BlockCache(os.path.join(root, "blocks.json"))
+            cache.save()
+            generate_pages_parallel(content, template, os.path.join(root, "public"), workers=2, block_cache=cache)
+            self.assertEqual(len(cache.entries), 5)
+
+
+if __name__ == "__main__":
+    unittest.main()
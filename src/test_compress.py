@@ -0,0 +1,104 @@
+import gzip
+import os
+import unittest
+import zlib
+
+from compress import Precompressor
+from fixtures import SiteTestCase, TempDirTestCase, read_bytes, write
+from textutils import generate_pages_parallel, generate_pages_recursive
+
+
+class TestPrecompressor(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.state = os.path.join(self.root, "state", "compress.json")
+        self.data = b"<p>" + b"rivendell " * 200 + b"</p>"
+
+    def test_add_writes_variants(self):
+        path = os.path.join(self.root, "page.html")
+        write(path, self.data)
+        compressor = Precompressor()
+        compressor.add(path, self.data)
+        compressor.wait()
+        self.assertEqual(gzip.decompress(read_bytes(path + ".gz")), self.data)
+        self.assertEqual(zlib.decompress(read_bytes(path + ".zz")), self.data)
+        self.assertEqual(compressor.variants([path]), {path + ".gz", path + ".zz"})
+        self.assertIn(f".gz: {len(self.data)} -> ", compressor.report())
+
+    def test_skips_small_and_other_files(self):
+        small = os.path.join(self.root, "small.html")
+        image = os.path.join(self.root, "image.png")
+        write(small, b"<p>hi</p>")
+        write(image, self.data)
+        compressor = Precompressor()
+        compressor.add(small, b"<p>hi</p>")
+        compressor.add_file(image)
+        compressor.wait()
+        self.assertEqual(compressor.compressed, 0)
+        self.assertFalse(os.path.exists(small + ".gz"))
+        self.assertFalse(os.path.exists(image + ".gz"))
+
+    def test_unchanged_content_is_not_compressed_again(self):
+        path = os.path.join(self.root, "page.html")
+        write(path, self.data)
+        compressor = Precompressor.load(self.state)
+        compressor.add(path, self.data)
+        compressor.wait()
+        compressor.save()
+        gz_mtime = os.stat(path + ".gz").st_mtime_ns
+
+        write(path, self.data)
+        compressor = Precompressor.load(self.state)
+        compressor.add(path, self.data)
+        compressor.add_file(path)
+        compressor.wait()
+        self.assertEqual(compressor.compressed, 0)
+        self.assertEqual(os.stat(path + ".gz").st_mtime_ns, gz_mtime)
+
+        changed = self.data + b"<p>more</p>"
+        write(path, changed)
+        compressor.add_file(path)
+        compressor.wait()
+        self.assertEqual(compressor.compressed, 1)
+        self.assertEqual(gzip.decompress(read_bytes(path + ".gz")), changed)
+
+    def test_shrunk_file_loses_variants(self):
+        path = os.path.join(self.root, "page.html")
+        write(path, self.data)
+        compressor = Precompressor()
+        compressor.add(path, self.data)
+        compressor.wait()
+        write(path, b"<p>hi</p>")
+        compressor.add_file(path)
+        self.assertEqual(compressor.variants([path]), set())
+
+
+class TestPagePrecompression(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(6):
+            write(os.path.join(self.content, f"page{i}.md"), f"# Page {i}\n\n" + "Some **bold** text. " * 100)
+
+    def assert_variants(self, pages, compressor):
+        self.assertEqual(compressor.compressed, 6)
+        for _, dest in pages:
+            self.assertEqual(gzip.decompress(read_bytes(f"{dest}.gz")), read_bytes(dest))
+        self.assertEqual(len(compressor.variants(dest for _, dest in pages)), 12)
+
+    def test_serial(self):
+        compressor = Precompressor()
+        pages = generate_pages_recursive(self.content, self.template, os.path.join(self.root, "public"),
+                                         compressor=compressor)
+        compressor.wait()
+        self.assert_variants(pages, compressor)
+
+    def test_parallel_merges_worker_results(self):
+        compressor = Precompressor()
+        pages = generate_pages_parallel(self.content, self.template, os.path.join(self.root, "public"),
+                                        workers=2, compressor=compressor)
+        compressor.wait()
+        self.assert_variants(pages, compressor)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,106 @@
+import gzip
+import http.client
+import os
+import tempfile
+import threading
+import unittest
+
+from devserver import DevServer, DevSite
+from fixtures import SiteTestCase, write
+
+
+class TestDevSite(SiteTestCase):
+    TEMPLATE = "<title>{{ Title }}</title><body>{{ Content }}</body>"
+
+    def setUp(self):
+        super().setUp()
+        write(os.path.join(self.content, "index.md"), "# Home")
+        write(os.path.join(self.content, "blog", "index.md"), "# Blog")
+        write(os.path.join(self.content, "blog", "post.md"), "# Post\n\n" + "A **long** post. " * 100)
+        write(os.path.join(self.static, "index.css"), "body {}")
+        write(os.path.join(self.static, ".nojekyll"), "")
+        write(os.path.join(self.static, ".git", "config"), "[core]")
+        write(os.path.join(self.content, ".hidden.md"), "# Hidden")
+        write(os.path.join(self.public, "sitemap.xml"), "<urlset/>")
+        self.site = DevSite(self.content, self.static, self.template, self.public)
+
+    def touch(self, path, text):
+        write(path, text)
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    def test_nothing_rendered_until_requested(self):
+        self.assertEqual(self.site.renders, 0)
+        self.assertEqual(self.site.get("/").body, b"<title>Home</title><body><div><h1>Home</h1></div></body>")
+        self.assertEqual(self.site.renders, 1)
+
+    def test_url_mapping(self):
+        self.assertIn(b"<h1>Blog</h1>", self.site.get("/blog/").body)
+        self.assertIn(b"<h1>Post</h1>", self.site.get("/blog/post.html").body)
+        self.assertEqual(self.site.get("/blog").location, "/blog/")
+        self.assertEqual(self.site.get("/index.css").body, b"body {}")
+        self.assertEqual(self.site.get("/sitemap.xml").body, b"<urlset/>")
+        self.assertIsNone(self.site.get("/missing.html"))
+        self.assertIsNone(self.site.get("/../template.html"))
+        self.assertEqual(self.site.get("/.nojekyll").body, b"")
+        self.assertIsNone(self.site.get("/.git/config"))
+        self.assertIsNone(self.site.get("/.hidden.html"))
+
+    def test_cached_until_source_or_template_changes(self):
+        first = self.site.get("/")
+        self.assertIs(self.site.get("/"), first)
+        self.touch(os.path.join(self.content, "index.md"), "# Welcome")
+        self.assertIn(b"<h1>Welcome</h1>", self.site.get("/").body)
+        self.touch(self.template, "<main>{{ Content }}</main>")
+        self.assertEqual(self.site.get("/").body, b"<main><div><h1>Welcome</h1></div></main>")
+        self.assertEqual(self.site.renders, 3)
+
+    def test_gzip_body(self):
+        response = self.site.get("/blog/post.html")
+        self.assertEqual(gzip.decompress(response.gzipped), response.body)
+        self.assertNotEqual(response.gzip_etag, response.etag)
+        self.assertIsNone(self.site.get("/").gzipped)
+
+
+class TestDevServer(unittest.TestCase):
+    def test_etag_and_gzip(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            template = os.path.join(root, "template.html")
+            write(template, "<body>{{ Content }}</body>")
+            write(os.path.join(content, "index.md"), "# Home\n\n" + "Some text. " * 200)
+            server = DevServer(("127.0.0.1", 0), DevSite(content, os.path.join(root, "static"), template))
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            connection = http.client.HTTPConnection("127.0.0.1", server.server_address[1])
+            try:
+                connection.request("GET", "/")
+                response = connection.getresponse()
+                body = response.read()
+                etag = response.getheader("ETag")
+                self.assertEqual(response.status, 200)
+                self.assertTrue(body.startswith(b"<body><div><h1>Home</h1>"))
+
+                connection.request("GET", "/", headers={"If-None-Match": etag})
+                response = connection.getresponse()
+                response.read()
+                self.assertEqual(response.status, 304)
+
+                connection.request("GET", "/", headers={"Accept-Encoding": "gzip"})
+                response = connection.getresponse()
+                self.assertEqual(response.getheader("Content-Encoding"), "gzip")
+                self.assertEqual(gzip.decompress(response.read()), body)
+                self.assertNotEqual(response.getheader("ETag"), etag)
+
+                connection.request("GET", "/missing.html")
+                response = connection.getresponse()
+                response.read()
+                self.assertEqual(response.status, 404)
+            finally:
+                connection.close()
+                server.shutdown()
+                server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
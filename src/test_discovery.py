@@ -0,0 +1,60 @@
+import os
+import unittest
+from pathlib import Path
+
+from discovery import CONTENT_IGNORE_PATTERNS, PAGE_PATTERNS, PathFilter, StatCache, discover_pages, scan_tree
+from fixtures import TempDirTestCase
+
+
+class TestDiscovery(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = os.path.join(self.root, "content")
+        for rel_path in ["index.md", "b.md", "a/index.md", "a/_template.html", "a/photo.png", ".hidden.md",
+                         ".git/config", "notes.md~", ".index.md.swp", "draft.md.swp", "z/deep/page.md",
+                         ".well-known/security.txt"]:
+            path = os.path.join(self.root, rel_path)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write("# Page")
+
+    def rel(self, paths):
+        return [os.path.relpath(path, self.root) for path in paths]
+
+    def test_discover_pages_in_sorted_order(self):
+        pages = discover_pages(self.root, "public")
+        self.assertEqual(self.rel(source for source, _ in pages),
+                         ["a/index.md", "b.md", "index.md", "z/deep/page.md"])
+        self.assertEqual(pages[0][1], Path("public/a/index.html"))
+
+    def test_default_ignore_rules(self):
+        paths = self.rel(path for path, _ in scan_tree(self.root))
+        self.assertEqual(paths, [".hidden.md", ".well-known/security.txt", "a/_template.html", "a/index.md",
+                                 "a/photo.png", "b.md", "index.md", "z/deep/page.md"])
+
+    def test_content_ignore_rules(self):
+        path_filter = PathFilter(ignore=CONTENT_IGNORE_PATTERNS)
+        paths = self.rel(path for path, _ in scan_tree(self.root, path_filter))
+        self.assertEqual(paths, [".well-known/security.txt", "a/_template.html", "a/index.md", "a/photo.png",
+                                 "b.md", "index.md", "z/deep/page.md"])
+
+    def test_custom_patterns(self):
+        path_filter = PathFilter(include=["*.png", "*.md"], ignore=["z"])
+        paths = self.rel(path for path, _ in scan_tree(self.root, path_filter))
+        self.assertIn(".hidden.md", paths)
+        self.assertIn("a/photo.png", paths)
+        self.assertNotIn("z/deep/page.md", paths)
+
+    def test_stat_cache(self):
+        stat_cache = StatCache()
+        pages = discover_pages(self.root, "public", PathFilter(PAGE_PATTERNS, CONTENT_IGNORE_PATTERNS), stat_cache)
+        source = pages[0][0]
+        self.assertEqual(stat_cache.stat(source).st_size, os.stat(source).st_size)
+        # non-page files are recorded too, so template lookup needs no syscall
+        self.assertTrue(stat_cache.isfile(os.path.join(self.root, "a", "_template.html")))
+        self.assertFalse(stat_cache.isfile(os.path.join(self.root, "_template.html")))
+        self.assertFalse(stat_cache.isfile(os.path.join(self.root, ".hidden.md")))
+
+
+if __name__ == "__main__":
+    unittest.main()
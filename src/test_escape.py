@@ -0,0 +1,42 @@
+import unittest
+
+from escape import escape_attr, escape_text, props_to_html
+from leafnode import LeafNode
+from parentnode import ParentNode
+from textutils import markdown_to_html_node
+
+
+class TestEscape(unittest.TestCase):
+    def test_clean_text_is_returned_unchanged(self):
+        text = "nothing to escape here"
+        self.assertIs(escape_text(text), text)
+        self.assertIs(escape_attr(text), text)
+
+    def test_escape_text(self):
+        self.assertEqual(escape_text('a < b && c > "d"'), 'a &lt; b &amp;&amp; c &gt; "d"')
+
+    def test_escape_attr(self):
+        self.assertEqual(escape_attr('/q?a=1&b="2"'), "/q?a=1&amp;b=&quot;2&quot;")
+
+    def test_props_to_html_is_cached(self):
+        first = props_to_html({"href": "/docs?a&b"})
+        self.assertEqual(first, ' href="/docs?a&amp;b"')
+        self.assertIs(props_to_html({"href": "/docs?a&b"}), first)
+
+    def test_props_with_unhashable_value(self):
+        self.assertEqual(props_to_html({"data-x": ["a"]}), ''' data-x="['a']"''')
+
+    def test_nodes_escape_values_and_props(self):
+        node = ParentNode("p", [
+            LeafNode(None, "1 < 2 & "),
+            LeafNode("a", "<b>", {"href": '/x?"y"'}),
+        ])
+        self.assertEqual(node.to_html(), '<p>1 &lt; 2 &amp; <a href="/x?&quot;y&quot;">&lt;b&gt;</a></p>')
+
+    def test_markdown_code_block_is_escaped(self):
+        html = markdown_to_html_node("```\nif a < b && c:\n```").to_html()
+        self.assertEqual(html, "<div><pre><code>if a &lt; b &amp;&amp; c:\n</code></pre></div>")
+
+
+if __name__ == "__main__":
+    unittest.main()
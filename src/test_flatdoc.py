@@ -0,0 +1,74 @@
+import unittest
+
+from flatdoc import (
+    KIND_ELEMENT,
+    KIND_LEAF,
+    TAGS,
+    flat_document_to_html_node,
+    render_flat_document,
+)
+from textutils import FLAT_BLOCK_LINES, markdown_to_flat_document, markdown_to_html, markdown_to_html_node
+
+SAMPLE = """# Title with **bold**
+
+This is **bolded** paragraph
+text in a p
+tag here with a [link](https://example.com) and ![img](/a.png)
+
+> quoted *text*
+> with `code`
+
+* one
+* two with _italic_
+
+1. first
+2. second
+
+```
+raw **not bold**
+    indented
+```
+"""
+
+
+class TestFlatDocument(unittest.TestCase):
+    def test_render_matches_node_tree(self):
+        doc = markdown_to_flat_document(SAMPLE)
+        self.assertEqual(render_flat_document(doc), markdown_to_html_node(SAMPLE).to_html())
+
+    def test_converter_round_trips(self):
+        doc = markdown_to_flat_document(SAMPLE)
+        self.assertEqual(flat_document_to_html_node(doc).to_html(), markdown_to_html_node(SAMPLE).to_html())
+
+    def test_children_navigation(self):
+        doc = markdown_to_flat_document("# Head\n\n* a\n* b **c**")
+        root = 0
+        blocks = list(doc.children(root))
+        self.assertEqual([TAGS[doc.tags[i]] for i in blocks], ["h1", "ul"])
+        items = list(doc.children(blocks[1]))
+        self.assertEqual([doc.kinds[i] for i in items], [KIND_ELEMENT, KIND_ELEMENT])
+        leaves = list(doc.children(items[1]))
+        self.assertEqual([TAGS[doc.tags[i]] for i in leaves], [None, "b"])
+        self.assertEqual(doc.kinds[leaves[1]], KIND_LEAF)
+        self.assertEqual(doc.text[doc.text_start[leaves[1]]:doc.text_end[leaves[1]]], "c")
+        self.assertTrue(all(doc.parents[i] == items[1] for i in leaves))
+
+    def test_render_escapes_like_node_tree(self):
+        markdown = "# A & B\n\nx < y [go](/q?a=1&b=\"2\") ![<i>](/i.png)\n\n```\n<tag>\n```"
+        doc = markdown_to_flat_document(markdown)
+        self.assertEqual(render_flat_document(doc), markdown_to_html_node(markdown).to_html())
+
+    def test_empty_document(self):
+        doc = markdown_to_flat_document("")
+        self.assertEqual(render_flat_document(doc), markdown_to_html_node("").to_html())
+        self.assertEqual(len(doc), 1)
+
+    def test_large_blocks_render_flat(self):
+        items = "\n".join(f"* item **{i}** [link](/{i})" for i in range(FLAT_BLOCK_LINES))
+        quote = "\n".join(f"> line *{i}*" for i in range(FLAT_BLOCK_LINES))
+        markdown = f"# Big\n\n{items}\n\n{quote}\n\nsmall"
+        self.assertEqual(markdown_to_html(markdown), markdown_to_html_node(markdown).to_html())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,72 @@
+import pickle
+import unittest
+
+from frozennode import FrozenLeafNode, FrozenParentNode, NodeInterner, freeze
+from leafnode import LeafNode
+from parentnode import ParentNode
+from textutils import markdown_to_html_node
+
+NAV = "* [Home](/)\n* [Docs](/docs?a&b)\n* [About](/about)"
+
+
+class TestFrozenNode(unittest.TestCase):
+    def test_freeze_preserves_html_and_equality(self):
+        tree = markdown_to_html_node(f"# Title\n\n{NAV}\n\n> a *quote*")
+        frozen = freeze(tree)
+        self.assertEqual(frozen.to_html(), tree.to_html())
+        self.assertEqual(frozen, tree)
+        self.assertEqual(tree, frozen)
+
+    def test_structural_hash(self):
+        first = freeze(markdown_to_html_node(NAV))
+        second = freeze(markdown_to_html_node(NAV))
+        self.assertIsNot(first, second)
+        self.assertEqual(hash(first), hash(second))
+        self.assertEqual(len({first, second}), 1)
+        self.assertNotEqual(first, freeze(markdown_to_html_node("* [Home](/)")))
+
+    def test_immutable(self):
+        node = FrozenParentNode("p", [LeafNode("b", "x")], {"class": "note"})
+        with self.assertRaises(AttributeError):
+            node.tag = "div"
+        self.assertIsInstance(node.children, tuple)
+        self.assertIsInstance(node.children[0], FrozenLeafNode)
+
+    def test_html_is_memoized(self):
+        node = freeze(ParentNode("p", [LeafNode(None, "a < b")]))
+        self.assertEqual(node.to_html(), "<p>a &lt; b</p>")
+        self.assertIs(node.to_html(), node.to_html())
+
+    def test_invalid_tree_still_raises(self):
+        with self.assertRaises(ValueError):
+            freeze(ParentNode(None, [LeafNode("b", "x")])).to_html()
+
+    def test_deep_tree_without_recursion(self):
+        node = LeafNode(None, "deep")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        self.assertEqual(freeze(node).to_html(), node.to_html())
+
+    def test_pickle_round_trip(self):
+        frozen = freeze(markdown_to_html_node(NAV))
+        self.assertEqual(pickle.loads(pickle.dumps(frozen)), frozen)
+
+    def test_mutable_nodes_are_not_hashable(self):
+        with self.assertRaises(TypeError):
+            hash(LeafNode("b", "x"))
+
+
+class TestNodeInterner(unittest.TestCase):
+    def test_repeated_subtrees_are_shared(self):
+        interner = NodeInterner()
+        page_one = interner.intern(markdown_to_html_node(f"# One\n\n{NAV}"))
+        page_two = interner.intern(markdown_to_html_node(f"# Two\n\n{NAV}"))
+        self.assertIs(page_one.children[1], page_two.children[1])
+        self.assertGreater(interner.hits, 0)
+        page_one.to_html()
+        self.assertIsNotNone(page_two.children[1]._html)
+        self.assertEqual(page_two.to_html(), markdown_to_html_node(f"# Two\n\n{NAV}").to_html())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,4 +1,6 @@
 from htmlnode import HTMLNode
+from leafnode import LeafNode
+from parentnode import ParentNode
 import unittest
 
 class TestHTMLNode(unittest.TestCase):
@@ -38,5 +40,20 @@ class TestHTMLNode(unittest.TestCase):
         with self.assertRaises(NotImplementedError):
             node.to_html()
 
+    def test_structural_equality(self):
+        """Test that nodes compare by tag, value, props and children"""
+        node = ParentNode("p", [LeafNode("b", "x"), LeafNode(None, "y")], {"class": "a"})
+        same = ParentNode("p", [LeafNode("b", "x"), LeafNode(None, "y")], {"class": "a"})
+        self.assertEqual(node, same)
+        self.assertNotEqual(node, ParentNode("p", [LeafNode("b", "x")], {"class": "a"}))
+        self.assertNotEqual(node, ParentNode("p", [LeafNode("i", "x"), LeafNode(None, "y")], {"class": "a"}))
+        self.assertNotEqual(LeafNode("b", "x"), "x")
+
+    def test_slots(self):
+        """Test that nodes carry no per-instance __dict__"""
+        self.assertFalse(hasattr(HTMLNode(tag="div"), "__dict__"))
+        self.assertFalse(hasattr(LeafNode("b", "x"), "__dict__"))
+        self.assertFalse(hasattr(ParentNode("p", []), "__dict__"))
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
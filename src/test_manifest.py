@@ -0,0 +1,77 @@
+import os
+import unittest
+
+from fixtures import SiteTestCase, write
+from manifest import BuildManifest
+from textutils import generate_pages_recursive
+
+
+class TestBuildManifest(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        self.manifest_path = os.path.join(self.root, ".sitegen", "manifest.json")
+        write(os.path.join(self.content, "index.md"), "# Home\n\nhello")
+        write(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nposts")
+
+    def build(self):
+        manifest = BuildManifest.load(self.manifest_path)
+        pages = generate_pages_recursive(self.content, self.template, self.public, manifest)
+        manifest.prune(source for source, _ in pages)
+        manifest.save()
+        return manifest
+
+    def output_mtimes(self):
+        return {
+            name: os.stat(os.path.join(self.public, name)).st_mtime_ns
+            for name in ("index.html", os.path.join("blog", "index.html"))
+        }
+
+    def test_unchanged_pages_are_skipped(self):
+        self.build()
+        os.remove(os.path.join(self.public, "index.html"))
+        with open(os.path.join(self.public, "blog", "index.html"), "w") as f:
+            f.write("untouched")
+        self.build()
+        self.assertTrue(os.path.exists(os.path.join(self.public, "index.html")))
+        with open(os.path.join(self.public, "blog", "index.html")) as f:
+            self.assertEqual(f.read(), "untouched")
+
+    def test_edited_page_is_rebuilt(self):
+        self.build()
+        write(os.path.join(self.content, "index.md"), "# Home\n\nchanged text")
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertFalse(manifest.is_current(
+            os.path.join(self.content, "index.md"), self.template, os.path.join(self.public, "index.html")))
+        self.assertTrue(manifest.is_current(
+            os.path.join(self.content, "blog", "index.md"), self.template,
+            os.path.join(self.public, "blog", "index.html")))
+
+    def test_template_change_invalidates_all_pages(self):
+        self.build()
+        write(self.template, "<h1>{{ Title }}</h1>{{ Content }}")
+        manifest = BuildManifest.load(self.manifest_path)
+        self.assertFalse(manifest.is_current(
+            os.path.join(self.content, "blog", "index.md"), self.template,
+            os.path.join(self.public, "blog", "index.html")))
+
+    def test_renderer_change_invalidates_all_pages(self):
+        self.build()
+        manifest = BuildManifest.load(self.manifest_path)
+        source = os.path.join(self.content, "index.md")
+        dest = os.path.join(self.public, "index.html")
+        self.assertTrue(manifest.is_current(source, self.template, dest))
+        manifest.entries[os.path.normpath(source)]["render"] -= 1
+        self.assertFalse(manifest.is_current(source, self.template, dest))
+        del manifest.entries[os.path.normpath(source)]["render"]
+        self.assertFalse(manifest.is_current(source, self.template, dest))
+
+    def test_prune_removed_sources(self):
+        manifest = self.build()
+        self.assertEqual(len(manifest.entries), 2)
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        manifest = self.build()
+        self.assertEqual(list(manifest.entries), [os.path.normpath(os.path.join(self.content, "index.md"))])
+
+
+if __name__ == "__main__":
+    unittest.main()
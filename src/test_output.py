@@ -0,0 +1,79 @@
+import os
+import unittest
+
+from fixtures import TempDirTestCase, read, write
+from output import load_state, open_output, save_state, write_output
+from sync import copy_file
+from textutils import generate_page
+
+
+class TestOutput(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.path = os.path.join(self.root, "index.html")
+
+    def age(self, path):
+        # push the mtime into the past so a rewrite would be visible
+        os.utime(path, ns=(0, 1_000_000_000))
+
+    def test_write_output(self):
+        self.assertTrue(write_output(self.path, "<p>one</p>"))
+        self.assertEqual(read(self.path), "<p>one</p>")
+        self.assertTrue(write_output(self.path, b"<p>two</p>"))
+        self.assertEqual(read(self.path), "<p>two</p>")
+        self.assertEqual(os.listdir(self.root), ["index.html"])
+
+    def test_identical_bytes_are_not_rewritten(self):
+        write_output(self.path, "<p>same</p>")
+        self.age(self.path)
+        self.assertFalse(write_output(self.path, "<p>same</p>"))
+        self.assertEqual(os.stat(self.path).st_mtime_ns, 1_000_000_000)
+
+    def test_failed_write_keeps_old_file(self):
+        write_output(self.path, "<p>old</p>")
+        with self.assertRaises(RuntimeError):
+            with open_output(self.path) as f:
+                f.write("<p>half")
+                raise RuntimeError("render failed")
+        self.assertEqual(read(self.path), "<p>old</p>")
+        self.assertEqual(os.listdir(self.root), ["index.html"])
+
+    def test_state_files(self):
+        path = os.path.join(self.root, "state", "cache.json")
+        self.assertIsNone(load_state(path, 1))
+        save_state(path, 1, {"entries": {"a": 1}})
+        self.assertEqual(load_state(path, 1), {"version": 1, "entries": {"a": 1}})
+        self.assertIsNone(load_state(path, 2))
+        write(path, "{not json")
+        self.assertIsNone(load_state(path, 1))
+        self.assertEqual(os.listdir(os.path.dirname(path)), ["cache.json"])
+
+    def test_copy_file_replaces_in_place(self):
+        src = os.path.join(self.root, "src", "a.css")
+        dest = os.path.join(self.root, "dest", "a.css")
+        write(src, "new")
+        write(dest, "old")
+        copy_file(src, dest)
+        self.assertEqual(read(dest), "new")
+        self.assertEqual(os.listdir(os.path.dirname(dest)), ["a.css"])
+
+    def test_unchanged_page_keeps_mtime(self):
+        source = os.path.join(self.root, "index.md")
+        template = os.path.join(self.root, "template.html")
+        write(source, "# Home")
+        write(template, "<body>{{ Content }}</body>")
+        for stream in (False, True):
+            generate_page(source, template, self.path, stream=stream)
+        self.assertEqual(read(self.path), "<body><div><h1>Home</h1></div></body>")
+        for stream in (False, True):
+            self.age(self.path)
+            generate_page(source, template, self.path, stream=stream)
+            self.assertEqual(os.stat(self.path).st_mtime_ns, 1_000_000_000)
+        self.assertEqual(sorted(os.listdir(self.root)), ["index.html", "index.md", "template.html"])
+        write(source, "# Changed")
+        generate_page(source, template, self.path, stream=True)
+        self.assertEqual(read(self.path), "<body><div><h1>Changed</h1></div></body>")
+
+
+if __name__ == "__main__":
+    unittest.main()
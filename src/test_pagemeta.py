@@ -0,0 +1,124 @@
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+import textutils
+from fixtures import SiteTestCase, write
+from manifest import BuildManifest
+from pagemeta import PageMeta, parse_front_matter, split_front_matter
+from textutils import (
+    extract_title,
+    generate_pages_parallel,
+    generate_pages_recursive,
+    markdown_to_html,
+    read_metadata,
+    scan_metadata,
+)
+
+PAGE = """---
+title: "Custom <title>"
+date: 2024-05-01
+tags: [python, web]
+author: Frodo
+---
+
+# Heading
+
+Body text
+"""
+
+
+class TestFrontMatter(unittest.TestCase):
+    def test_parse_fields(self):
+        fields = parse_front_matter(["title: A: B", "# comment", "", "tags:", "  - one", "  - 'two'", "draft: yes"])
+        self.assertEqual(fields, {"title": "A: B", "tags": ["one", "two"], "draft": "yes"})
+        meta = PageMeta(fields)
+        self.assertTrue(meta.draft)
+        self.assertEqual(meta.tags, ["one", "two"])
+
+    def test_invalid_line(self):
+        with self.assertRaises(ValueError):
+            parse_front_matter(["not a field"])
+
+    def test_unclosed_front_matter_is_body(self):
+        front, body = split_front_matter(["---", "title: x", "text"])
+        self.assertIsNone(front)
+        self.assertEqual(list(body), ["---", "title: x", "text"])
+
+    def test_front_matter_is_not_rendered(self):
+        meta = PageMeta()
+        html = markdown_to_html(PAGE, meta=meta)
+        self.assertEqual(html, "<div><h1>Heading</h1><p>Body text</p></div>")
+        self.assertEqual(meta.title, "Custom <title>")
+        self.assertEqual(meta.date, "2024-05-01")
+        self.assertEqual(meta.tags, ["python", "web"])
+
+    def test_title_falls_back_to_first_heading(self):
+        meta = PageMeta()
+        markdown_to_html("```\n# not a title\n```\n\n## Sub\n\n# Real title\n\n# Second", meta=meta)
+        self.assertEqual(meta.title, "Real title")
+        self.assertEqual(extract_title("```\n# not a title\n```\n\n# Real title"), "Real title")
+        self.assertEqual(extract_title(PAGE), "Custom <title>")
+
+    def test_context(self):
+        context = PageMeta(parse_front_matter(PAGE.split("---")[1].splitlines())).context()
+        self.assertEqual(context["Title"], "Custom &lt;title&gt;")
+        self.assertEqual(context["Tags"], "python, web")
+        self.assertEqual(context["Author"], "Frodo")
+        self.assertEqual(PageMeta().context()["Date"], "")
+
+    def test_read_metadata_stops_at_title(self):
+        def lines():
+            yield "---\n"
+            yield "date: 2024-01-01\n"
+            yield "---\n"
+            yield "# Title\n"
+            raise AssertionError("read past the title")
+
+        meta = scan_metadata(lines())
+        self.assertEqual((meta.title, meta.date), ("Title", "2024-01-01"))
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "page.md")
+            write(path, "intro\n\n# Title\n")
+            self.assertEqual(read_metadata(path).to_dict(), {"title": "Title", "fields": {}})
+
+
+class TestMetadataInBuild(SiteTestCase):
+    TEMPLATE = "<title>{{ Title }}</title><time>{{ Date }}</time>{{ Content }}"
+
+    def setUp(self):
+        super().setUp()
+        write(os.path.join(self.root, "layouts", "post.html"), "<article>{{ Title }} by {{ Author }}</article>")
+        write(os.path.join(self.content, "index.md"), PAGE)
+        write(os.path.join(self.content, "post.md"),
+              "---\ntemplate: layouts/post.html\nauthor: Sam\n---\n# Post\n\ntext")
+        write(os.path.join(self.content, "draft.md"), "---\ndraft: true\n---\n# Draft")
+
+    def read(self, name):
+        with open(os.path.join(self.public, name)) as f:
+            return f.read()
+
+    def test_fields_reach_template_and_drafts_are_skipped(self):
+        for build in (generate_pages_recursive, generate_pages_parallel):
+            pages = build(self.content, self.template, self.public)
+            self.assertEqual([os.path.basename(source) for source, _ in pages], ["index.md", "post.md"])
+            self.assertEqual(self.read("index.html"),
+                             "<title>Custom &lt;title&gt;</title><time>2024-05-01</time>"
+                             "<div><h1>Heading</h1><p>Body text</p></div>")
+            self.assertEqual(self.read("post.html"), "<article>Post by Sam</article>")
+            self.assertFalse(os.path.exists(os.path.join(self.public, "draft.html")))
+
+    def test_manifest_keeps_metadata_of_unchanged_pages(self):
+        manifest = BuildManifest()
+        generate_pages_recursive(self.content, self.template, self.public, manifest)
+        source = os.path.join(self.content, "index.md")
+        self.assertEqual(manifest.metadata(source).title, "Custom <title>")
+        with mock.patch.object(textutils, "read_metadata") as read:
+            generate_pages_recursive(self.content, self.template, self.public, manifest)
+        # only the draft, which is never recorded, has to be read again
+        self.assertEqual([call.args[0] for call in read.call_args_list], [os.path.join(self.content, "draft.md")])
+
+
+if __name__ == "__main__":
+    unittest.main()
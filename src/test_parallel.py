@@ -0,0 +1,49 @@
+import os
+import unittest
+
+from fixtures import SiteTestCase, write
+from textutils import BuildError, generate_pages_parallel, generate_pages_recursive
+
+
+def read_tree(root):
+    files = {}
+    for dir_path, _, filenames in os.walk(root):
+        for filename in filenames:
+            path = os.path.join(dir_path, filename)
+            with open(path) as f:
+                files[os.path.relpath(path, root)] = f.read()
+    return files
+
+
+class TestParallelGeneration(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        for i in range(12):
+            write(os.path.join(self.content, f"section{i % 3}", f"page{i}.md"), f"# Page {i}\n\nSome **bold** text {i}")
+
+    def test_matches_serial_output(self):
+        serial = os.path.join(self.root, "serial")
+        parallel = os.path.join(self.root, "parallel")
+        serial_pages = generate_pages_recursive(self.content, self.template, serial)
+        parallel_pages = generate_pages_parallel(self.content, self.template, parallel, workers=4)
+        self.assertEqual(
+            [os.path.relpath(dest, serial) for _, dest in serial_pages],
+            [os.path.relpath(dest, parallel) for _, dest in parallel_pages],
+        )
+        self.assertEqual(read_tree(serial), read_tree(parallel))
+        self.assertEqual(len(read_tree(parallel)), 12)
+
+    def test_errors_are_aggregated(self):
+        write(os.path.join(self.content, "bad1.md"), "no title here")
+        write(os.path.join(self.content, "bad2.md"), "also no title")
+        public = os.path.join(self.root, "public")
+        with self.assertRaises(BuildError) as cm:
+            generate_pages_parallel(self.content, self.template, public, workers=2)
+        self.assertEqual([path for path, _ in cm.exception.errors],
+                         [os.path.join(self.content, "bad1.md"), os.path.join(self.content, "bad2.md")])
+        self.assertIn("No title found", cm.exception.errors[0][1])
+        self.assertEqual(len(read_tree(public)), 12)
+
+
+if __name__ == "__main__":
+    unittest.main()
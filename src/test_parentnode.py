@@ -1,4 +1,5 @@
 
+import io
 import unittest
 from parentnode import ParentNode
 from leafnode import LeafNode
@@ -34,6 +35,27 @@ class TestParentNode(unittest.TestCase):
             "<p><b>Bold text</b>Normal text<i>italic text</i>Normal text</p>",
         )
 
+    def test_to_html_deeply_nested(self):
+        node = LeafNode("b", "deep")
+        for _ in range(5000):
+            node = ParentNode("span", [node])
+        html = node.to_html()
+        self.assertTrue(html.startswith("<span><span>"))
+        self.assertEqual(len(html), len("<b>deep</b>") + 5000 * len("<span></span>"))
+
+    def test_render_to_stream(self):
+        node = ParentNode("ul", [ParentNode("li", [LeafNode(None, f"item {i}")]) for i in range(100)],
+                          {"class": "list"})
+        stream = io.StringIO()
+        node.render_to(stream)
+        self.assertEqual(stream.getvalue(), node.to_html())
+        self.assertTrue(stream.getvalue().startswith('<ul class="list"><li>item 0</li>'))
+
+    def test_to_html_invalid_child(self):
+        node = ParentNode("div", [ParentNode(None, [LeafNode("b", "x")])])
+        with self.assertRaises(ValueError):
+            node.to_html()
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,58 @@
+import json
+import os
+import time
+import unittest
+
+from fixtures import SiteTestCase, write
+from profiler import PAGE_PHASES, BuildProfile
+from textutils import generate_page, generate_pages_recursive
+
+
+class TestBuildProfile(SiteTestCase):
+    TEMPLATE = "{{ Title }}{{ Content }}"
+
+    def setUp(self):
+        super().setUp()
+        write(os.path.join(self.content, "small.md"), "# Small\n\nshort")
+        write(os.path.join(self.content, "large.md"),
+              "# Large\n\n" + "\n\n".join(f"paragraph **{i}** with *text*" for i in range(300)))
+
+    def test_records_every_phase_per_page(self):
+        profile = BuildProfile()
+        generate_pages_recursive(self.content, self.template, self.public, profile=profile)
+        self.assertEqual(len(profile.pages), 2)
+        for page in profile.pages:
+            self.assertEqual(set(page.timings), set(PAGE_PHASES))
+            self.assertGreater(page.size, 0)
+        self.assertEqual(profile.slowest(1)[0].path, os.path.join(self.content, "large.md"))
+
+    def test_json_report_and_summary(self):
+        profile = BuildProfile()
+        with profile.phase("static_sync"):
+            pass
+        generate_pages_recursive(self.content, self.template, self.public, profile=profile)
+        report_path = os.path.join(self.root, "out", "profile.json")
+        profile.write_json(report_path, top=1)
+        with open(report_path) as f:
+            report = json.load(f)
+        self.assertIn("static_sync", report["build"])
+        self.assertEqual(list(report["phases"]), list(PAGE_PHASES))
+        self.assertEqual(len(report["pages"]), 2)
+        self.assertEqual(report["slowest"], [os.path.join(self.content, "large.md")])
+        summary = profile.summary(top=1)
+        self.assertIn("Slowest 1 page(s):", summary)
+        self.assertIn("large.md", summary)
+
+    def test_streamed_page_phases_add_up_to_wall_time(self):
+        page = BuildProfile().page("large.md")
+        start = time.perf_counter()
+        generate_page(os.path.join(self.content, "large.md"), self.template, os.path.join(self.public, "large.html"),
+                      page, stream=True)
+        elapsed = time.perf_counter() - start
+        self.assertGreater(page.timings["block_split"], 0)
+        self.assertGreater(page.timings["write"], 0)
+        self.assertLessEqual(page.total, elapsed)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,110 @@
+import json
+import os
+import tempfile
+import unittest
+
+from fixtures import SiteTestCase, write
+from search import SearchIndex, file_terms, shard_name, tokenize
+from siteindex import SiteIndex
+from textutils import generate_pages_recursive
+
+
+def read_json(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+class TestTokenize(unittest.TestCase):
+    def test_tokenize(self):
+        self.assertEqual(tokenize("The **Hobbit** [link](https://example.com/x) a ![Élan](/i.png) snake_case 42"),
+                         ["the", "hobbit", "link", "élan", "snake", "case", "42"])
+
+    def test_file_terms_skip_front_matter(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "page.md")
+            write(path, "---\ntitle: Secret\n---\n# Ring ring\n")
+            self.assertEqual(file_terms(path), {"ring": 2})
+
+    def test_shard_name(self):
+        self.assertEqual(shard_name("hobbit"), "ho")
+        self.assertEqual(shard_name("élan"), "_l")
+
+
+class TestSearchIndex(SiteTestCase):
+    TEMPLATE = "{{ Content }}"
+
+    def setUp(self):
+        super().setUp()
+        self.state = os.path.join(self.root, ".sitegen", "search.json")
+        write(os.path.join(self.content, "a.md"), "# Alpha\n\nshire hobbit")
+        write(os.path.join(self.content, "b.md"), "# Beta\n\nhobbit hobbit ring")
+        write(os.path.join(self.content, "c.md"), "# Gamma\n\nhobbit")
+
+    def build(self):
+        site_index = SiteIndex(self.public)
+        generate_pages_recursive(self.content, self.template, self.public, site_index=site_index)
+        index = SearchIndex.load(self.state)
+        index.update(site_index)
+        written = index.write(self.public)
+        index.save()
+        return index, written
+
+    def test_delta_encoded_postings(self):
+        _, written = self.build()
+        docs = read_json(os.path.join(self.public, "search", "docs.json"))
+        self.assertEqual(docs["docs"], [["/a.html", "Alpha"], ["/b.html", "Beta"], ["/c.html", "Gamma"]])
+        shard = read_json(os.path.join(self.public, "search", "ho.json"))
+        # doc ids 0, 1, 2 as gaps 0, 1, 1 with counts 1, 2, 1
+        self.assertEqual(shard["hobbit"], [0, 1, 1, 2, 1, 1])
+        self.assertIn("ho", docs["shards"])
+        self.assertIn(os.path.join(self.public, "search", "ho.json"), written)
+
+    def test_incremental_update(self):
+        index, _ = self.build()
+        self.assertEqual(index.tokenized, 3)
+        ri_shard = os.path.join(self.public, "search", "ri.json")
+        mtime = os.stat(ri_shard).st_mtime_ns
+        write(os.path.join(self.content, "c.md"), "# Gamma\n\nhobbit shire")
+        index, _ = self.build()
+        self.assertEqual(index.tokenized, 1)
+        self.assertEqual(read_json(os.path.join(self.public, "search", "sh.json"))["shire"], [0, 1, 2, 1])
+        self.assertEqual(os.stat(ri_shard).st_mtime_ns, mtime)
+
+        os.remove(os.path.join(self.content, "b.md"))
+        os.remove(os.path.join(self.public, "b.html"))
+        index, written = self.build()
+        self.assertEqual(index.tokenized, 0)
+        self.assertNotIn(ri_shard, written)
+
+    def shard_mtimes(self):
+        out_dir = os.path.join(self.public, "search")
+        return {name: os.stat(os.path.join(out_dir, name)).st_mtime_ns for name in os.listdir(out_dir)}
+
+    def test_document_ids_are_stable(self):
+        self.build()
+        out_dir = os.path.join(self.public, "search")
+        for name in os.listdir(out_dir):
+            os.utime(os.path.join(out_dir, name), ns=(0, 0))
+        # sorts first, but appends an id instead of renumbering a, b and c
+        write(os.path.join(self.content, "0.md"), "# Zero\n\nhobbit")
+        self.build()
+        changed = sorted(name for name, mtime in self.shard_mtimes().items() if mtime != 0)
+        self.assertEqual(changed, ["docs.json", "ho.json", "ze.json"])
+        docs = read_json(os.path.join(out_dir, "docs.json"))["docs"]
+        self.assertEqual(docs, [["/a.html", "Alpha"], ["/b.html", "Beta"], ["/c.html", "Gamma"], ["/0.html", "Zero"]])
+        self.assertEqual(read_json(os.path.join(out_dir, "ho.json"))["hobbit"], [0, 1, 1, 2, 1, 1, 1, 1])
+
+        os.remove(os.path.join(self.content, "b.md"))
+        os.remove(os.path.join(self.public, "b.html"))
+        self.build()
+        docs = read_json(os.path.join(out_dir, "docs.json"))["docs"]
+        self.assertEqual(docs, [["/a.html", "Alpha"], None, ["/c.html", "Gamma"], ["/0.html", "Zero"]])
+        self.assertFalse(os.path.exists(os.path.join(out_dir, "ri.json")))
+        write(os.path.join(self.content, "d.md"), "# Delta\n\nring")
+        index, _ = self.build()
+        self.assertEqual(index.documents[os.path.join(self.content, "d.md")]["id"], 1)
+        self.assertEqual(read_json(os.path.join(out_dir, "ri.json")), {"ring": [1, 1]})
+
+
+if __name__ == "__main__":
+    unittest.main()
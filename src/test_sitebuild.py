@@ -0,0 +1,160 @@
+import contextlib
+import io
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from backends import FileSystemSink, FileSystemSource, MemorySink, MemorySource, TarSink, ZipSink
+from blockcache import BlockCache
+from fixtures import read, write
+from main import parse_args
+from sitebuild import BuildConfig, build_site
+
+FILES = {
+    "template.html": "<title>{{ Title }}</title><body>{{ Content }}</body>",
+    "content/index.md": "# Home",
+    "content/about.md": "# About",
+    "content/blog/_template.html": "<main>{{ Content }}</main>",
+    "content/blog/first.md": "---\ndate: 2024-01-02\n---\n# First\n\n![a](/images/a.png)",
+    "content/blog/draft.md": "---\ndraft: true\n---\n# Draft",
+    "content/.hidden.md": "# Hidden",
+    "static/index.css": "body {}",
+    "static/images/a.png": b"\x89PNG",
+}
+
+
+class TestMemoryBuild(unittest.TestCase):
+    def build(self, sink, **options):
+        return build_site(BuildConfig(MemorySource(FILES), sink, **options))
+
+    def test_pages_static_files_and_listings(self):
+        sink = MemorySink()
+        result = self.build(sink, base_url="https://example.com")
+        self.assertEqual(sorted(sink.files), [
+            "about.html",
+            "blog/first.html",
+            "blog/index.html",
+            "blog/page/1/index.html",
+            "feed.xml",
+            "images/a.png",
+            "index.css",
+            "index.html",
+            "page/1/index.html",
+            "sitemap.xml",
+        ])
+        self.assertEqual(sink.files["index.html"], b"<title>Home</title><body><div><h1>Home</h1></div></body>")
+        self.assertEqual(sink.files["blog/first.html"],
+                         b'<main><div><h1>First</h1><p><img src="/images/a.png" alt="a"></img></p></div></main>')
+        self.assertEqual(sink.files["images/a.png"], b"\x89PNG")
+        self.assertIn(b'<a href="/blog/first.html">First</a>', sink.files["blog/index.html"])
+        self.assertIn(b'<a href="/about.html">About</a>', sink.files["page/1/index.html"])
+        self.assertEqual(result.pages, [("content/about.md", "about.html"),
+                                        ("content/blog/first.md", "blog/first.html"),
+                                        ("content/index.md", "index.html")])
+        self.assertEqual(result.outputs, set(sink.files))
+
+    def test_builds_report_through_logging(self):
+        stdout = io.StringIO()
+        with tempfile.TemporaryDirectory() as root, contextlib.redirect_stdout(stdout), \
+                self.assertLogs(level="INFO") as logs:
+            for path, data in FILES.items():
+                write(os.path.join(root, path), data)
+            with FileSystemSink(os.path.join(root, "public")) as sink:
+                build_site(BuildConfig(FileSystemSource(root), sink, precompress=True))
+            self.build(MemorySink())
+        self.assertEqual(stdout.getvalue(), "")
+        self.assertTrue(any("Generating page: " in line for line in logs.output))
+
+    def test_matches_filesystem_build(self):
+        with tempfile.TemporaryDirectory() as root:
+            for path, data in FILES.items():
+                write(os.path.join(root, path), data)
+            public = os.path.join(root, "public")
+            with FileSystemSink(public) as sink:
+                build_site(BuildConfig(FileSystemSource(root), sink, block_cache_mb=0))
+            on_disk = {}
+            for dir_path, _, filenames in os.walk(public):
+                for filename in filenames:
+                    path = os.path.join(dir_path, filename)
+                    with open(path, "rb") as f:
+                        on_disk[os.path.relpath(path, public).replace(os.sep, "/")] = f.read()
+        sink = MemorySink()
+        self.build(sink)
+        self.assertEqual(sink.files, on_disk)
+
+    def test_ignores_urls_fingerprinted_by_an_earlier_build(self):
+        with tempfile.TemporaryDirectory() as root:
+            for path, data in FILES.items():
+                write(os.path.join(root, path), data)
+            with FileSystemSink(os.path.join(root, "public")) as sink:
+                build_site(BuildConfig(FileSystemSource(root), sink, fingerprint=True))
+        sink = MemorySink()
+        with self.assertLogs(level="WARNING") as logs:
+            self.build(sink, fingerprint=True)
+        self.assertIn("Only filesystem builds use fingerprint", logs.output[0])
+        self.assertIn(b'src="/images/a.png"', sink.files["blog/first.html"])
+
+    def test_clean_parallel_build_ignores_saved_blocks(self):
+        with tempfile.TemporaryDirectory() as root:
+            for path, data in FILES.items():
+                write(os.path.join(root, path), data)
+            public = os.path.join(root, "public")
+            with FileSystemSink(public) as sink:
+                build_site(BuildConfig(FileSystemSource(root), sink, jobs=2))
+            blocks_path = os.path.join(root, ".sitegen", "blocks.json")
+            cache = BlockCache.load(blocks_path)
+            for key in cache.entries:
+                cache.entries[key] = "<p>STALE</p>"
+            cache.save()
+            with FileSystemSink(public) as sink:
+                build_site(BuildConfig(FileSystemSource(root), sink, jobs=2, clean=True))
+            self.assertEqual(read(os.path.join(public, "index.html")),
+                             "<title>Home</title><body><div><h1>Home</h1></div></body>")
+            self.assertNotIn("STALE", read(os.path.join(public, "blog", "first.html")))
+
+    def test_archive_sinks(self):
+        with tempfile.TemporaryDirectory() as root:
+            tar_path = os.path.join(root, "site.tar.gz")
+            with TarSink(tar_path) as sink:
+                self.build(sink)
+            with tarfile.open(tar_path) as archive:
+                self.assertIn("blog/first.html", archive.getnames())
+                self.assertEqual(archive.extractfile("index.css").read(), b"body {}")
+
+            zip_path = os.path.join(root, "site.zip")
+            with ZipSink(zip_path) as sink:
+                self.build(sink)
+            with zipfile.ZipFile(zip_path) as archive:
+                self.assertEqual(archive.read("images/a.png"), b"\x89PNG")
+
+
+class TestArchiveOptions(unittest.TestCase):
+    def test_rejects_options_a_full_build_ignores(self):
+        self.assertEqual(parse_args(["--archive", "site.zip", "--base-url", "https://example.com"]).archive,
+                         "site.zip")
+        stderr = io.StringIO()
+        with self.assertRaises(SystemExit), contextlib.redirect_stderr(stderr):
+            parse_args(["--archive", "site.zip", "-j", "4", "--search"])
+        self.assertIn("--archive cannot be combined with --jobs, --search", stderr.getvalue())
+
+
+class TestSources(unittest.TestCase):
+    def test_memory_source_files(self):
+        source = MemorySource({"static/a.css": "", "static/.git/config": "", "static/b~": "", "other/c": ""})
+        self.assertEqual(source.files("static"), ["static/a.css"])
+        self.assertEqual(source.read_bytes("static/a.css"), b"")
+
+    def test_filesystem_source_files(self):
+        with tempfile.TemporaryDirectory() as root:
+            write(os.path.join(root, "static", "sub", "a.css"), "a")
+            write(os.path.join(root, "static", ".swp"), "")
+            source = FileSystemSource(root)
+            self.assertEqual(source.files("static"), ["static/sub/a.css"])
+            self.assertEqual(source.read_text("static/sub/a.css"), "a")
+            self.assertEqual(source.files("missing"), [])
+
+
+if __name__ == "__main__":
+    unittest.main()
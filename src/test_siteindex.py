@@ -0,0 +1,83 @@
+import os
+import unittest
+from unittest import mock
+
+import textutils
+from fixtures import SiteTestCase, read, write
+from manifest import BuildManifest
+from siteindex import SiteIndex, write_site_index
+from textutils import generate_pages_parallel, generate_pages_recursive
+
+
+class TestSiteIndex(SiteTestCase):
+    def setUp(self):
+        super().setUp()
+        write(os.path.join(self.content, "index.md"), "# Home")
+        write(os.path.join(self.content, "about.md"), "# About")
+        write(os.path.join(self.content, "blog", "index.md"), "# The Blog")
+        for day in range(1, 4):
+            write(os.path.join(self.content, "blog", f"post{day}.md"),
+                  f"---\ndate: 2024-01-0{day}\n---\n# Post {day} & more")
+        write(os.path.join(self.content, "notes", "a.md"), "# Note A")
+        write(os.path.join(self.content, "blog", "draft.md"), "---\ndraft: true\n---\n# Draft")
+
+    def build(self, generate=generate_pages_recursive, manifest=None):
+        index = SiteIndex(self.public)
+        generate(self.content, self.template, self.public, manifest, site_index=index)
+        return index
+
+    def test_index_collects_published_pages(self):
+        for generate in (generate_pages_recursive, generate_pages_parallel):
+            index = self.build(generate)
+            self.assertEqual([page.url for page in index.by_date()],
+                             ["/blog/post3.html", "/blog/post2.html", "/blog/post1.html", "/", "/about.html",
+                              "/blog/", "/notes/a.html"])
+            post = index.by_date()[0]
+            self.assertEqual((post.title, post.date), ("Post 3 & more", "2024-01-03"))
+            self.assertEqual(post.size, os.path.getsize(os.path.join(self.content, "blog", "post3.md")))
+
+    def test_unchanged_pages_are_indexed_without_reading(self):
+        manifest = BuildManifest()
+        self.build(manifest=manifest)
+        with mock.patch.object(textutils, "read_metadata", side_effect=AssertionError("read")), \
+                mock.patch.object(textutils, "generate_page", side_effect=AssertionError("rendered")):
+            os.remove(os.path.join(self.content, "blog", "draft.md"))
+            index = self.build(manifest=manifest)
+        self.assertEqual(len(index.pages), 7)
+        self.assertEqual(sorted(page.url for page in SiteIndex.from_manifest(manifest, self.public).pages),
+                         sorted(page.url for page in index.pages))
+
+    def test_sitemap_feed_and_listings(self):
+        index = self.build()
+        written = write_site_index(index, self.template, "https://example.com/", per_page=2)
+        sitemap = read(os.path.join(self.public, "sitemap.xml"))
+        self.assertIn("<url><loc>https://example.com/blog/post1.html</loc><lastmod>2024-01-01</lastmod></url>",
+                      sitemap)
+        self.assertEqual(sitemap.count("<url>"), 7)
+        feed = read(os.path.join(self.public, "feed.xml"))
+        self.assertEqual(feed.count("<entry>"), 3)
+        self.assertIn("<title>Post 3 &amp; more</title>", feed)
+        self.assertIn("<updated>2024-01-03T00:00:00Z</updated>", feed)
+
+        first = read(os.path.join(self.public, "blog", "page", "1", "index.html"))
+        self.assertEqual(first, '<title>The Blog</title><div><ul>'
+                         '<li><a href="/blog/post3.html">Post 3 &amp; more</a> <time datetime="2024-01-03">2024-01-03</time></li>'
+                         '<li><a href="/blog/post2.html">Post 2 &amp; more</a> <time datetime="2024-01-02">2024-01-02</time></li>'
+                         '</ul><nav><a href="/blog/page/2/" rel="next">Older</a></nav></div>')
+        self.assertIn('rel="prev"', read(os.path.join(self.public, "blog", "page", "2", "index.html")))
+        # the blog has its own index page; notes gets the listing as its index
+        self.assertEqual(read(os.path.join(self.public, "blog", "index.html")), "<title>The Blog</title><div><h1>The Blog</h1></div>")
+        self.assertIn('<a href="/notes/a.html">Note A</a>', read(os.path.join(self.public, "notes", "index.html")))
+        self.assertIn(os.path.join(self.public, "notes", "index.html"), written)
+        # root-level pages are listed under "/", which keeps the home page as its index
+        self.assertIn('<a href="/about.html">About</a>', read(os.path.join(self.public, "page", "1", "index.html")))
+        self.assertEqual(read(os.path.join(self.public, "index.html")), "<title>Home</title><div><h1>Home</h1></div>")
+        self.assertNotIn(os.path.join(self.public, "index.html"), written)
+
+    def test_no_sitemap_without_base_url(self):
+        write_site_index(self.build(), self.template)
+        self.assertFalse(os.path.exists(os.path.join(self.public, "sitemap.xml")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,56 @@
+import io
+import os
+import tracemalloc
+import unittest
+
+from fixtures import TempDirTestCase
+from templates import Template
+from textutils import generate_page
+
+
+class TestTemplateRenderTo(unittest.TestCase):
+    def test_callable_slot_writes_to_stream(self):
+        template = Template("<title>{{ Title }}</title><main>{{ Content }}</main>{{ Missing }}")
+        stream = io.StringIO()
+        template.render_to(stream, {"Title": "Log", "Content": lambda out: out.write("<p>streamed</p>")})
+        self.assertEqual(stream.getvalue(), "<title>Log</title><main><p>streamed</p></main>{{ Missing }}")
+
+
+class TestStreamingGeneration(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        root = self.root
+        self.template = os.path.join(root, "template.html")
+        with open(self.template, "w") as f:
+            f.write("<title>{{ Title }}</title><body>{{ Content }}</body>")
+        self.source = os.path.join(root, "changelog.md")
+        with open(self.source, "w") as f:
+            f.write("Generated changelog\n\n# Changelog\n\n")
+            for i in range(3000):
+                f.write(f"## Release {i}\n\n- fixed **bug** {i}\n- added `feature` {i}\n\n")
+                f.write("```\nlog line one\n\nlog line two\n```\n\n")
+
+    def render(self, dest, stream):
+        tracemalloc.start()
+        try:
+            generate_page(self.source, self.template, dest, stream=stream)
+            return tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+    def test_streamed_output_matches_and_uses_bounded_memory(self):
+        buffered_dest = os.path.join(self.root, "buffered.html")
+        streamed_dest = os.path.join(self.root, "out", "streamed.html")
+        buffered_peak = self.render(buffered_dest, stream=False)
+        streamed_peak = self.render(streamed_dest, stream=True)
+        with open(buffered_dest) as f:
+            buffered = f.read()
+        with open(streamed_dest) as f:
+            self.assertEqual(f.read(), buffered)
+        self.assertTrue(buffered.startswith("<title>Changelog</title><body><div><p>Generated changelog</p>"))
+        self.assertLess(streamed_peak, len(buffered) // 2)
+        self.assertLess(streamed_peak, buffered_peak // 10)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import unittest
+
+import sync
+from fixtures import TempDirTestCase, read_bytes, write
+from sync import remove_stale_outputs, sync_directory
+
+
+class TestSyncDirectory(TempDirTestCase):
+    def setUp(self):
+        super().setUp()
+        self.static = os.path.join(self.root, "static")
+        self.public = os.path.join(self.root, "public")
+        write(os.path.join(self.static, "index.css"), b"body {}")
+        write(os.path.join(self.static, "images", "logo.png"), b"\x89PNG" * 10)
+
+    def test_skips_ignored_files(self):
+        write(os.path.join(self.static, ".index.css.swp"), b"swap")
+        write(os.path.join(self.static, "images", ".DS_Store"), b"junk")
+        synced = sync_directory(self.static, self.public)
+        self.assertEqual(len(synced), 2)
+        self.assertFalse(os.path.exists(os.path.join(self.public, ".index.css.swp")))
+
+    def test_publishes_dotfiles(self):
+        write(os.path.join(self.static, ".nojekyll"), b"")
+        write(os.path.join(self.static, "downloads", ".htaccess"), b"Options -Indexes")
+        synced = sync_directory(self.static, self.public)
+        self.assertEqual(remove_stale_outputs(self.public, synced), [])
+        self.assertTrue(os.path.exists(os.path.join(self.public, ".nojekyll")))
+        self.assertEqual(read_bytes(os.path.join(self.public, "downloads", ".htaccess")), b"Options -Indexes")
+
+    def test_copies_new_files_and_preserves_mtime(self):
+        synced = sync_directory(self.static, self.public)
+        self.assertEqual(synced, {
+            os.path.join(self.public, "index.css"),
+            os.path.join(self.public, "images", "logo.png"),
+        })
+        self.assertEqual(read_bytes(os.path.join(self.public, "index.css")), b"body {}")
+        self.assertEqual(os.stat(os.path.join(self.static, "index.css")).st_mtime_ns,
+                         os.stat(os.path.join(self.public, "index.css")).st_mtime_ns)
+
+    def test_skips_unchanged_files(self):
+        sync_directory(self.static, self.public)
+        dest = os.path.join(self.public, "index.css")
+        inode = os.stat(dest).st_ino
+        sync_directory(self.static, self.public)
+        self.assertEqual(os.stat(dest).st_ino, inode)
+
+    def test_recopies_changed_files(self):
+        sync_directory(self.static, self.public)
+        write(os.path.join(self.static, "index.css"), b"body { color: red }")
+        sync_directory(self.static, self.public)
+        self.assertEqual(read_bytes(os.path.join(self.public, "index.css")), b"body { color: red }")
+
+    def test_checksum_detects_same_size_edit(self):
+        sync_directory(self.static, self.public)
+        src = os.path.join(self.static, "index.css")
+        st = os.stat(src)
+        write(src, b"body {;")
+        os.utime(src, ns=(st.st_atime_ns, st.st_mtime_ns))
+        sync_directory(self.static, self.public)
+        self.assertEqual(read_bytes(os.path.join(self.public, "index.css")), b"body {}")
+        sync_directory(self.static, self.public, checksum=True)
+        self.assertEqual(read_bytes(os.path.join(self.public, "index.css")), b"body {;")
+
+    def test_link(self):
+        sync_directory(self.static, self.public, link=True)
+        self.assertTrue(os.path.samefile(os.path.join(self.static, "index.css"),
+                                         os.path.join(self.public, "index.css")))
+
+    def test_large_files_use_copy_file_range(self):
+        old_size = sync.LARGE_FILE_SIZE
+        sync.LARGE_FILE_SIZE = 8
+        try:
+            sync_directory(self.static, self.public)
+        finally:
+            sync.LARGE_FILE_SIZE = old_size
+        self.assertEqual(read_bytes(os.path.join(self.public, "images", "logo.png")), b"\x89PNG" * 10)
+
+    def test_remove_stale_outputs(self):
+        synced = sync_directory(self.static, self.public)
+        page = os.path.join(self.public, "blog", "index.html")
+        write(page, b"<p>page</p>")
+        write(os.path.join(self.public, "old", "gone.css"), b"")
+        removed = remove_stale_outputs(self.public, synced | {page})
+        self.assertEqual(removed, [os.path.join(self.public, "old", "gone.css")])
+        self.assertFalse(os.path.exists(os.path.join(self.public, "old")))
+        self.assertTrue(os.path.exists(page))
+
+
+if __name__ == "__main__":
+    unittest.main()
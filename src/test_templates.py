@@ -0,0 +1,72 @@
+import os
+import tempfile
+import unittest
+
+from templates import Template, TemplateResolver, load_template
+from textutils import generate_pages_recursive
+
+
+class TestTemplate(unittest.TestCase):
+    def test_render(self):
+        template = Template("<title> {{ Title }} </title><body>{{Content}}</body>")
+        self.assertEqual(template.slots, ["Title", "Content"])
+        self.assertEqual(
+            template.render({"Title": "Home", "Content": "<p>hi</p>"}),
+            "<title> Home </title><body><p>hi</p></body>",
+        )
+
+    def test_extra_and_missing_fields(self):
+        template = Template("{{ Title }} by {{ Author }} on {{ Date }}")
+        self.assertEqual(template.render({"Title": "Post", "Author": "Bilbo"}), "Post by Bilbo on {{ Date }}")
+
+    def test_no_placeholders(self):
+        template = Template("static")
+        self.assertEqual(template.render({"Title": "x"}), "static")
+
+    def test_load_template_is_cached_until_modified(self):
+        with tempfile.TemporaryDirectory() as root:
+            path = os.path.join(root, "template.html")
+            with open(path, "w") as f:
+                f.write("a {{ Content }}")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            with open(path, "w") as f:
+                f.write("changed {{ Content }}")
+            os.utime(path, ns=(0, 0))
+            self.assertEqual(load_template(path).render({"Content": "x"}), "changed x")
+
+
+class TestTemplateOverrides(unittest.TestCase):
+    def test_nearest_override_wins(self):
+        with tempfile.TemporaryDirectory() as root:
+            content = os.path.join(root, "content")
+            public = os.path.join(root, "public")
+            default = os.path.join(root, "template.html")
+            os.makedirs(os.path.join(content, "blog", "2024"))
+            os.makedirs(os.path.join(content, "about"))
+            files = {
+                default: "default: {{ Content }}",
+                os.path.join(content, "blog", "_template.html"): "blog: {{ Title }}",
+                os.path.join(content, "index.md"): "# Home",
+                os.path.join(content, "about", "index.md"): "# About",
+                os.path.join(content, "blog", "2024", "post.md"): "# Post",
+            }
+            for path, text in files.items():
+                with open(path, "w") as f:
+                    f.write(text)
+
+            resolver = TemplateResolver(content, default)
+            self.assertEqual(resolver.resolve(os.path.join(content, "about", "index.md")), default)
+            self.assertEqual(resolver.resolve(os.path.join(content, "blog", "2024", "post.md")),
+                             os.path.join(content, "blog", "_template.html"))
+
+            generate_pages_recursive(content, default, public)
+            with open(os.path.join(public, "blog", "2024", "post.html")) as f:
+                self.assertEqual(f.read(), "blog: Post")
+            with open(os.path.join(public, "index.html")) as f:
+                self.assertEqual(f.read(), "default: <div><h1>Home</h1></div>")
+            self.assertFalse(os.path.exists(os.path.join(public, "blog", "_template.html")))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -25,6 +25,20 @@ class TestTextNode(unittest.TestCase):
         node2 = TextNode("This is a text node", TextType.TEXT, "https://www.boot.dev")
         self.assertEqual(node, node2)
 
+    def test_eq_other_type(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertNotEqual(node, "This is a text node")
+        self.assertNotEqual(node, None)
+
+    def test_text_type_is_enum_member(self):
+        node = TextNode("This is a text node", TextType.BOLD)
+        self.assertIs(node.text_type, TextType.BOLD)
+        self.assertEqual(TextNode("This is a text node", "bold"), node)
+
+    def test_slots(self):
+        node = TextNode("This is a text node", TextType.TEXT)
+        self.assertFalse(hasattr(node, "__dict__"))
+
     def test_repr(self):
         node = TextNode("This is a text node", TextType.TEXT, "https://www.boot.dev")
         self.assertEqual(
@@ -5,8 +5,12 @@ from textutils import (
     extract_markdown_links,
     split_nodes_link,
     text_to_textnodes,
+    scan_inline,
     markdown_to_blocks,
+    scan_blocks,
+    markdown_to_html_node,
     block_to_block_type,
+    block_to_html_node,
     extract_title
 )
 
@@ -183,6 +187,52 @@ class TestSplitLink(unittest.TestCase):
             ],
             nodes,
         )
+
+class TestScanInline(unittest.TestCase):
+    def test_spans(self):
+        text = "a **b** [c](d)"
+        self.assertEqual(
+            scan_inline(text),
+            [
+                (TextType.TEXT, 0, 2, 0, 0),
+                (TextType.BOLD, 4, 5, 0, 0),
+                (TextType.TEXT, 7, 8, 0, 0),
+                (TextType.LINK, 9, 10, 12, 13),
+            ],
+        )
+
+    def test_code_span_keeps_delimiters_literal(self):
+        self.assertListEqual(
+            [
+                TextNode("use ", TextType.TEXT),
+                TextNode("a * b [x](y)", TextType.CODE),
+                TextNode(" here", TextType.TEXT),
+            ],
+            text_to_textnodes("use `a * b [x](y)` here"),
+        )
+
+    def test_link_url_with_delimiters(self):
+        self.assertListEqual(
+            [
+                TextNode("see ", TextType.TEXT),
+                TextNode("docs", TextType.LINK, "/a*b`c"),
+                TextNode(" and ", TextType.TEXT),
+                TextNode("bold", TextType.BOLD),
+            ],
+            text_to_textnodes("see [docs](/a*b`c) and **bold**"),
+        )
+
+    def test_unmatched_brackets_stay_text(self):
+        self.assertListEqual(
+            [TextNode("1. [ ] task ![not an image] done", TextType.TEXT)],
+            text_to_textnodes("1. [ ] task ![not an image] done"),
+        )
+
+    def test_unclosed_delimiter(self):
+        with self.assertRaises(ValueError):
+            text_to_textnodes("this is **not closed")
+
+
 class TestMarkdownToBlock(unittest.TestCase):
     def test_markdown_to_blocks(self):
         """Test the markdown_to_blocks function with various inputs"""
@@ -242,6 +292,57 @@ Third block"""
         assert len(blocks5) == 1
         assert blocks5[0] == "Just one block"
 
+    def test_fenced_code_keeps_blank_lines(self):
+        markdown = "Intro\n\n```python\ndef foo():\n\n    return 1\n```\n\nOutro"
+        self.assertEqual(
+            markdown_to_blocks(markdown),
+            ["Intro", "```python\ndef foo():\n\n    return 1\n```", "Outro"],
+        )
+        self.assertEqual(
+            markdown_to_html_node(markdown).to_html(),
+            "<div><p>Intro</p><pre><code>def foo():\n\n    return 1\n</code></pre><p>Outro</p></div>",
+        )
+
+
+class TestScanBlocks(unittest.TestCase):
+    def test_classifies_while_scanning(self):
+        markdown = """# Title
+Intro line
+continues here
+
+> quoted
+> twice
+
+- a
+- b
+
+1. one
+2. two
+
+```
+unclosed fence *stays* raw"""
+        self.assertEqual(
+            list(scan_blocks(markdown.split("\n"))),
+            [
+                ("heading", ["# Title"]),
+                ("paragraph", ["Intro line", "continues here"]),
+                ("quote", ["> quoted", "> twice"]),
+                ("unordered_list", ["- a", "- b"]),
+                ("ordered_list", ["1. one", "2. two"]),
+                ("code", ["```", "unclosed fence *stays* raw"]),
+            ],
+        )
+
+    def test_accepts_file_lines(self):
+        lines = ["# Title\n", "\n", "text\r\n"]
+        self.assertEqual(list(scan_blocks(lines)), [("heading", ["# Title"]), ("paragraph", ["text"])])
+
+    def test_long_ordered_list(self):
+        markdown = "\n".join(f"{i}. item {i}" for i in range(1, 12))
+        html = markdown_to_html_node(markdown).to_html()
+        self.assertTrue(html.endswith("<li>item 10</li><li>item 11</li></ol></div>"))
+
+
 class TestBlockToBlock(unittest.TestCase):
     def test_block_to_block_type(self):
         """Test the block_to_block_type function with various inputs"""
@@ -281,6 +382,12 @@ class TestBlockToBlock(unittest.TestCase):
         assert block_to_block_type("Multiple\nlines\nof text") == "paragraph"
         assert block_to_block_type("") == "paragraph"
 
+    def test_block_to_html_node(self):
+        self.assertEqual(block_to_html_node("## Heading").to_html(), "<h2>Heading</h2>")
+        self.assertEqual(block_to_html_node("one\ntwo").to_html(), "<p>one two</p>")
+        with self.assertRaises(ValueError):
+            block_to_html_node("para\n# heading")
+
     
 class TestExtractTitle(unittest.TestCase):
     def test_eq(self):
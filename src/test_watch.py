@@ -0,0 +1,147 @@
+import gzip
+import json
+import os
+import tempfile
+import threading
+import unittest
+import urllib.request
+from unittest import mock
+
+from compress import Precompressor
+from fixtures import SiteTestCase, read, read_bytes, write
+from manifest import BuildManifest
+from search import SearchIndex
+from siteindex import SiteIndex
+from sync import sync_directory
+from textutils import generate_pages_recursive
+import watch
+from watch import LIVERELOAD_SCRIPT, LiveReloadServer, SiteWatcher
+
+
+class TestSiteWatcher(SiteTestCase):
+    TEMPLATE = "<body>{{ Content }}</body>"
+
+    def setUp(self):
+        super().setUp()
+        write(os.path.join(self.content, "index.md"), "# Home")
+        write(os.path.join(self.content, "blog", "index.md"), "# Blog")
+        write(os.path.join(self.static, "index.css"), "body {}")
+        self.manifest = BuildManifest(os.path.join(self.root, "manifest.json"))
+        sync_directory(self.static, self.public)
+        generate_pages_recursive(self.content, self.template, self.public, self.manifest)
+        self.watcher = SiteWatcher(self.content, self.static, self.template, self.public, self.manifest)
+
+    def touch(self, path, text):
+        write(path, text)
+        st = os.stat(path)
+        os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns + 1_000_000_000))
+
+    def test_no_changes(self):
+        self.assertEqual(self.watcher.poll(), [])
+
+    def test_page_edit_rebuilds_only_that_page(self):
+        blog_output = os.path.join(self.public, "blog", "index.html")
+        write(blog_output, "stale but untouched")
+        self.touch(os.path.join(self.content, "index.md"), "# Home\n\nnew text")
+        self.assertEqual(self.watcher.poll(), [os.path.join(self.content, "index.md")])
+        self.assertEqual(read(os.path.join(self.public, "index.html")),
+                         "<body><div><h1>Home</h1><p>new text</p></div></body>")
+        self.assertEqual(read(blog_output), "stale but untouched")
+
+    def test_new_and_removed_pages(self):
+        self.touch(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.watcher.poll()
+        self.assertTrue(os.path.exists(os.path.join(self.public, "blog", "post.html")))
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.watcher.poll()
+        self.assertFalse(os.path.exists(os.path.join(self.public, "blog", "post.html")))
+        self.assertNotIn(os.path.join(self.content, "blog", "post.md"), self.manifest.entries)
+
+    def test_static_edit(self):
+        self.touch(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        self.watcher.poll()
+        self.assertEqual(read(os.path.join(self.public, "index.css")), "body { margin: 0 }")
+
+    def test_template_edit_rebuilds_all_pages(self):
+        self.touch(self.template, "<main>{{ Content }}</main>")
+        self.watcher.poll()
+        self.assertEqual(read(os.path.join(self.public, "blog", "index.html")), "<main><div><h1>Blog</h1></div></main>")
+
+    def test_listings_follow_metadata_changes_only(self):
+        post = os.path.join(self.content, "blog", "post.md")
+        listing = os.path.join(self.public, "blog", "page", "1", "index.html")
+        self.touch(post, "# Post")
+        self.watcher.poll()
+        self.assertIn("Post</a>", read(listing))
+        os.utime(listing, ns=(0, 0))
+        self.touch(post, "# Post\n\nnew body")
+        self.watcher.poll()
+        self.assertEqual(os.stat(listing).st_mtime_ns, 0)
+        self.touch(post, "# Renamed\n\nnew body")
+        self.watcher.poll()
+        self.assertIn("Renamed</a>", read(listing))
+
+    def test_search_index_follows_edited_pages(self):
+        search_index = SearchIndex()
+        site_index = SiteIndex(self.public)
+        generate_pages_recursive(self.content, self.template, self.public, site_index=site_index)
+        search_index.update(site_index)
+        search_index.write(self.public)
+        self.watcher.search_index = search_index
+        self.touch(os.path.join(self.content, "blog", "index.md"), "# Blog\n\nrivendell")
+        self.watcher.poll()
+        self.assertEqual(search_index.tokenized, 3)
+        with open(os.path.join(self.public, "search", "ri.json")) as f:
+            self.assertEqual(json.load(f), {"rivendell": [0, 1]})
+        os.remove(os.path.join(self.content, "blog", "index.md"))
+        self.watcher.poll()
+        self.assertFalse(os.path.exists(os.path.join(self.public, "search", "ri.json")))
+
+    def test_manifest_is_saved_once_idle(self):
+        self.touch(os.path.join(self.content, "index.md"), "# Home\n\nnew text")
+        self.watcher.poll()
+        self.assertFalse(os.path.exists(self.manifest.path))
+        with mock.patch.object(watch, "SAVE_DELAY", 0):
+            self.assertEqual(self.watcher.poll(), [])
+        self.assertTrue(os.path.exists(self.manifest.path))
+
+    def test_precompressed_variants_follow_edits(self):
+        compressor = Precompressor(min_size=0)
+        self.watcher.compressor = compressor
+        self.touch(os.path.join(self.content, "blog", "post.md"), "# Post")
+        self.touch(os.path.join(self.static, "index.css"), "body { margin: 0 }")
+        self.watcher.poll()
+        post = os.path.join(self.public, "blog", "post.html")
+        self.assertEqual(gzip.decompress(read_bytes(post + ".gz")), b"<body><div><h1>Post</h1></div></body>")
+        css = os.path.join(self.public, "index.css")
+        self.assertEqual(gzip.decompress(read_bytes(css + ".gz")), b"body { margin: 0 }")
+        self.touch(os.path.join(self.content, "blog", "post.md"), "# Edited")
+        self.watcher.poll()
+        self.assertEqual(gzip.decompress(read_bytes(post + ".gz")), b"<body><div><h1>Edited</h1></div></body>")
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        self.watcher.poll()
+        self.assertFalse(os.path.exists(post + ".gz"))
+        self.assertFalse(os.path.exists(post + ".zz"))
+
+
+class TestLiveReloadServer(unittest.TestCase):
+    def test_injects_reload_script_into_html(self):
+        with tempfile.TemporaryDirectory() as public:
+            write(os.path.join(public, "index.html"), "<body><p>hi</p></body>")
+            write(os.path.join(public, "index.css"), "body {}")
+            server = LiveReloadServer(("127.0.0.1", 0), public)
+            thread = threading.Thread(target=server.serve_forever, daemon=True)
+            thread.start()
+            try:
+                base = f"http://127.0.0.1:{server.server_address[1]}"
+                with urllib.request.urlopen(base + "/") as response:
+                    self.assertEqual(response.read().decode(), f"<body><p>hi</p>{LIVERELOAD_SCRIPT}</body>")
+                with urllib.request.urlopen(base + "/index.css") as response:
+                    self.assertEqual(response.read(), b"body {}")
+            finally:
+                server.shutdown()
+                server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
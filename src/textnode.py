@@ -9,14 +9,18 @@ class TextType(Enum):
     IMAGE = 'image'
 
 class TextNode():
+    __slots__ = ("text", "text_type", "url")
+
     def __init__(self, text: str, text_type: TextType, url: str = None):
         self.text = text
-        self.text_type = text_type.value
+        self.text_type = text_type if isinstance(text_type, TextType) else TextType(text_type)
         self.url = url
     
     def __eq__(self, value):
+        if not isinstance(value, TextNode):
+            return NotImplemented
         return value.text == self.text and value.text_type == self.text_type and value.url == self.url
     
     def __repr__(self):
-        return f"TextNode({self.text}, {self.text_type}, {self.url})"
+        return f"TextNode({self.text}, {self.text_type.value}, {self.url})"
     
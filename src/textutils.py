@@ -1,11 +1,22 @@
 from leafnode import LeafNode
 from textnode import TextType, TextNode
+import logging
 import re
 from typing import List
 import os
+import traceback
+from concurrent.futures import ProcessPoolExecutor
 
 from parentnode import ParentNode
-from pathlib import Path
+from assets import asset_url, asset_urls, set_asset_urls
+from blockcache import BlockCache
+from compress import Precompressor
+from discovery import StatCache, discover_pages
+from flatdoc import FlatDocument
+from output import open_output, write_output
+from pagemeta import PageMeta, parse_front_matter, split_front_matter
+from profiler import phase
+from templates import TemplateResolver, load_template
 
 
 block_type_paragraph = "paragraph"
@@ -15,120 +26,317 @@ block_type_quote = "quote"
 block_type_olist = "ordered_list"
 block_type_ulist = "unordered_list"
 
-def block_to_html_node(block):
-    block_type = block_to_block_type(block)
-    if block_type == block_type_paragraph:
-        return paragraph_to_html_node(block)
-    if block_type == block_type_heading:
-        return heading_to_html_node(block)
-    if block_type == block_type_code:
-        return code_to_html_node(block)
-    if block_type == block_type_olist:
-        return olist_to_html_node(block)
-    if block_type == block_type_ulist:
-        return ulist_to_html_node(block)
-    if block_type == block_type_quote:
-        return quote_to_html_node(block)
-    raise ValueError("Invalid block type")
+def block_to_html_node(block, profile=None):
+    with phase(profile, "block_split"):
+        blocks = list(scan_blocks(block.split("\n")))
+    if not blocks:
+        return paragraph_to_html_node([])
+    if len(blocks) > 1:
+        raise ValueError(f"Expected one block, found {len(blocks)}")
+    block_type, lines = blocks[0]
+    with phase(profile, "inline"):
+        return _block_builders[block_type](lines)
 
 
 def text_to_children(text):
-    text_nodes = text_to_textnodes(text)
+    # builds LeafNodes straight from the scanned spans; no TextNode per fragment
     children = []
-    for text_node in text_nodes:
-        html_node = text_node_to_html_node(text_node)
-        children.append(html_node)
+    for text_type, start, end, url_start, url_end in scan_inline(text):
+        tag = _inline_tags[text_type]
+        if text_type is TextType.LINK:
+            children.append(LeafNode(tag, text[start:end], {"href": asset_url(text[url_start:url_end])}))
+        elif text_type is TextType.IMAGE:
+            children.append(LeafNode(tag, "", {"src": asset_url(text[url_start:url_end]), "alt": text[start:end]}))
+        else:
+            children.append(LeafNode(tag, text[start:end]))
     return children
 
 
-def paragraph_to_html_node(block):
-    lines = block.split("\n")
+def paragraph_to_html_node(lines):
     paragraph = " ".join(lines)
     children = text_to_children(paragraph)
     return ParentNode("p", children)
 
 
-def heading_to_html_node(block):
-    level = 0
-    for char in block:
-        if char == "#":
-            level += 1
-        else:
-            break
-    if level + 1 >= len(block):
-        raise ValueError(f"Invalid heading level: {level}")
-    text = block[level + 1 :]
+def heading_to_html_node(lines):
+    level, text = heading_parts(lines)
     children = text_to_children(text)
     return ParentNode(f"h{level}", children)
 
 
-def code_to_html_node(block):
-    if not block.startswith("```") or not block.endswith("```"):
-        raise ValueError("Invalid code block")
-    text = block[4:-3]
-    children = text_to_children(text)
-    code = ParentNode("code", children)
+def code_to_html_node(lines):
+    code = ParentNode("code", [LeafNode(None, code_block_text(lines))])
     return ParentNode("pre", [code])
 
 
-def olist_to_html_node(block):
-    items = block.split("\n")
+def olist_to_html_node(lines):
     html_items = []
-    for item in items:
-        text = item[3:]
-        children = text_to_children(text)
+    for item in lines:
+        children = text_to_children(list_item_text(block_type_olist, item))
         html_items.append(ParentNode("li", children))
     return ParentNode("ol", html_items)
 
 
-def ulist_to_html_node(block):
-    items = block.split("\n")
+def ulist_to_html_node(lines):
     html_items = []
-    for item in items:
-        text = item[2:]
-        children = text_to_children(text)
+    for item in lines:
+        children = text_to_children(list_item_text(block_type_ulist, item))
         html_items.append(ParentNode("li", children))
     return ParentNode("ul", html_items)
 
 
-def quote_to_html_node(block):
-    lines = block.split("\n")
+def quote_to_html_node(lines):
+    children = text_to_children(quote_block_text(lines))
+    return ParentNode("blockquote", children)
+
+
+# Text extraction shared by the node builders above and the FlatDocument builder below
+
+def heading_parts(lines):
+    line = lines[0]
+    level = _heading_level(line)
+    if level == 0:
+        raise ValueError(f"Invalid heading: {line}")
+    return level, line[level + 1 :]
+
+
+def code_block_text(lines):
+    if not lines or not _is_fence(lines[0]):
+        raise ValueError("Invalid code block")
+    body = lines[1:]
+    if len(body) > 0 and _is_closing_fence(body[-1]):
+        body = body[:-1]
+    return "".join(line + "\n" for line in body)
+
+
+def list_item_text(block_type, item):
+    if block_type == block_type_olist:
+        return item.split(". ", 1)[1]
+    return item[2:]
+
+
+def quote_block_text(lines):
     new_lines = []
     for line in lines:
         if not line.startswith(">"):
             raise ValueError("Invalid quote block")
         new_lines.append(line.lstrip(">").strip())
-    content = " ".join(new_lines)
-    children = text_to_children(content)
-    return ParentNode("blockquote", children)
+    return " ".join(new_lines)
+
+
+_block_builders = {
+    block_type_paragraph: paragraph_to_html_node,
+    block_type_heading: heading_to_html_node,
+    block_type_code: code_to_html_node,
+    block_type_olist: olist_to_html_node,
+    block_type_ulist: ulist_to_html_node,
+    block_type_quote: quote_to_html_node,
+}
+
+
+# blocks with at least this many lines are built as a FlatDocument: a few
+# arrays instead of an object per list item and text span
+FLAT_BLOCK_LINES = 1024
+
+
+def block_to_flat_document(block_type, lines):
+    """The FlatDocument of one scanned block; it renders like the block's node tree."""
+    doc = FlatDocument()
+    _add_flat_block(doc, -1, block_type, lines)
+    return doc.finish()
+
 
-def markdown_to_html_node(markdown):
-    blocks = markdown_to_blocks(markdown)
+def markdown_to_flat_document(markdown):
+    doc = FlatDocument()
+    root = doc.add_element("div", -1)
+    for block_type, lines in scan_blocks(markdown.split("\n")):
+        _add_flat_block(doc, root, block_type, lines)
+    return doc.finish()
+
+
+def _add_flat_block(doc, parent, block_type, lines):
+    if block_type == block_type_paragraph:
+        _add_flat_inline(doc, " ".join(lines), doc.add_element("p", parent))
+    elif block_type == block_type_heading:
+        level, text = heading_parts(lines)
+        _add_flat_inline(doc, text, doc.add_element(f"h{level}", parent))
+    elif block_type == block_type_code:
+        pre = doc.add_element("pre", parent)
+        doc.add_text(code_block_text(lines), doc.add_element("code", pre))
+    elif block_type == block_type_quote:
+        _add_flat_inline(doc, quote_block_text(lines), doc.add_element("blockquote", parent))
+    else:
+        list_index = doc.add_element("ol" if block_type == block_type_olist else "ul", parent)
+        for item in lines:
+            _add_flat_inline(doc, list_item_text(block_type, item), doc.add_element("li", list_index))
+
+
+def _add_flat_inline(doc, text, parent):
+    doc.add_inline(text, scan_inline(text), parent)
+
+
+def _heading_level(line):
+    level = 0
+    while level < len(line) and line[level] == "#":
+        level += 1
+    if 1 <= level <= 6 and line[level:level + 1] == " " and line[level + 1:].strip():
+        return level
+    return 0
+
+
+def _is_fence(stripped):
+    return stripped.startswith("```") and "`" not in stripped[3:]
+
+
+def _is_closing_fence(line):
+    stripped = line.strip()
+    return stripped.startswith("```") and not stripped.strip("`")
+
+
+def scan_blocks(lines, meta=None):
+    """
+    Split Markdown into classified blocks in a single pass over its lines.
+
+    Yields (block_type, lines) pairs. Blank lines separate blocks, headings
+    are always one line, and a ``` fence runs until the closing fence (or
+    the end of input) with its blank lines and indentation intact; the lines
+    of every other block are stripped. List and quote blocks are recognised
+    while lines are collected: a block is a quote or list only if every line
+    qualifies, otherwise it is a paragraph.
+
+    Leading `---` front matter is not part of the body. Given a PageMeta, its
+    fields are parsed into `meta` and, unless they set a title, the first
+    level-1 heading becomes meta.title.
+    """
+    front_matter, lines = split_front_matter(lines)
+    if meta is not None and front_matter is not None:
+        meta.update(parse_front_matter(front_matter))
+    block = []
+    fence = False
+    is_quote = is_ulist = is_olist = True
+    for line in lines:
+        line = line.rstrip("\r\n")
+        if fence:
+            block.append(line)
+            if "```" in line and _is_closing_fence(line):
+                yield block_type_code, block
+                block = []
+                fence = False
+            continue
+        stripped = line.strip()
+        if not stripped:
+            if block:
+                yield _classify(is_quote, is_ulist, is_olist), block
+                block = []
+            continue
+        if _is_fence(stripped) or (stripped[0] == "#" and _heading_level(stripped)):
+            if block:
+                yield _classify(is_quote, is_ulist, is_olist), block
+                block = []
+            if stripped[0] == "#":
+                if meta is not None and meta.title is None and stripped[1] == " ":
+                    meta.title = stripped[2:]
+                yield block_type_heading, [stripped]
+            else:
+                block.append(stripped)
+                fence = True
+            continue
+        if not block:
+            is_quote = is_ulist = is_olist = True
+        if is_quote and stripped[0] != ">":
+            is_quote = False
+        if is_ulist and not stripped.startswith(("* ", "- ")):
+            is_ulist = False
+        if is_olist and not stripped.startswith(f"{len(block) + 1}. "):
+            is_olist = False
+        block.append(stripped)
+    if block:
+        yield (block_type_code if fence else _classify(is_quote, is_ulist, is_olist)), block
+
+
+def _classify(is_quote, is_ulist, is_olist):
+    if is_quote:
+        return block_type_quote
+    if is_ulist:
+        return block_type_ulist
+    if is_olist:
+        return block_type_olist
+    return block_type_paragraph
+
+
+def markdown_to_html_node(markdown, profile=None):
+    with phase(profile, "block_split"):
+        blocks = list(scan_blocks(markdown.split("\n")))
     children = []
-    for block in blocks:
-        html_node = block_to_html_node(block)
-        children.append(html_node)
+    with phase(profile, "inline"):
+        for block_type, lines in blocks:
+            children.append(_block_builders[block_type](lines))
     return ParentNode("div", children, None)
 
+def markdown_to_html(markdown, block_cache=None, profile=None, meta=None):
+    """
+    Render a Markdown document to its HTML string. With a block_cache,
+    blocks whose rendered fragment is cached are not parsed again. A PageMeta
+    passed as `meta` is filled in by the same scan.
+    """
+    with phase(profile, "block_split"):
+        blocks = list(scan_blocks(markdown.split("\n"), meta))
+    parts = []
+    render_blocks(blocks, parts.append, block_cache, profile)
+    return "".join(parts)
+
+
+def render_blocks(blocks, write, block_cache=None, profile=None):
+    """
+    Convert and serialize (block_type, lines) pairs one at a time, passing
+    each fragment to `write`. Given a scan_blocks generator over an open
+    file, only one block is held in memory at a time. Blocks of
+    FLAT_BLOCK_LINES lines or more are built as a FlatDocument rather than
+    as node objects.
+    """
+    write("<div>")
+    for block_type, lines in blocks:
+        key = html = None
+        if block_cache is not None:
+            key = block_cache.key(block_type, lines)
+            html = block_cache.get(key)
+        if html is None:
+            with phase(profile, "inline"):
+                if len(lines) >= FLAT_BLOCK_LINES:
+                    node = block_to_flat_document(block_type, lines)
+                else:
+                    node = _block_builders[block_type](lines)
+            with phase(profile, "serialize"):
+                html = node.to_html()
+            if block_cache is not None:
+                block_cache.put(key, html)
+        write(html)
+    write("</div>")
+
+_inline_tags = {
+    TextType.TEXT: None,
+    TextType.BOLD: "b",
+    TextType.ITALIC: "i",
+    TextType.CODE: "code",
+    TextType.LINK: "a",
+    TextType.IMAGE: "img",
+}
+
+
 def text_node_to_html_node(text_node):
-    if text_node.text_type == TextType.TEXT.value:
-        return LeafNode(None, text_node.text)
-    if text_node.text_type == TextType.BOLD.value:
-        return LeafNode("b", text_node.text)
-    if text_node.text_type == TextType.ITALIC.value:
-        return LeafNode("i", text_node.text)
-    if text_node.text_type == TextType.CODE.value:
-        return LeafNode("code", text_node.text)
-    if text_node.text_type == TextType.LINK.value:
-        return LeafNode("a", text_node.text, {"href": text_node.url})
-    if text_node.text_type == TextType.IMAGE.value:
-        return LeafNode("img", "", {"src": text_node.url, "alt": text_node.text})
-    raise ValueError(f"Invalid text type: {text_node.text_type}")
+    text_type = text_node.text_type
+    if text_type is TextType.LINK:
+        return LeafNode("a", text_node.text, {"href": asset_url(text_node.url)})
+    if text_type is TextType.IMAGE:
+        return LeafNode("img", "", {"src": asset_url(text_node.url), "alt": text_node.text})
+    if text_type in _inline_tags:
+        return LeafNode(_inline_tags[text_type], text_node.text)
+    raise ValueError(f"Invalid text type: {text_type}")
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
     new_nodes = []
     for old_node in old_nodes:
-        if old_node.text_type != TextType.TEXT.value:
+        if old_node.text_type is not TextType.TEXT:
             new_nodes.append(old_node)
             continue
         split_nodes = []
@@ -161,7 +369,7 @@ def extract_markdown_links(text: str):
 def split_nodes_image(old_nodes):
     new_nodes = []
     for old_node in old_nodes:
-        if old_node.text_type != TextType.TEXT.value:
+        if old_node.text_type is not TextType.TEXT:
             new_nodes.append(old_node)
             continue
         original_text = old_node.text
@@ -191,7 +399,7 @@ def split_nodes_link(nodes: List[TextNode]) -> List[TextNode]:
     result = []
     
     for node in nodes:
-        if node.text_type != TextType.TEXT.value:
+        if node.text_type is not TextType.TEXT:
             result.append(node)
             continue
             
@@ -234,21 +442,74 @@ def split_nodes_link(nodes: List[TextNode]) -> List[TextNode]:
     
     return result
 
+_inline_token_pattern = re.compile(r"`|\*\*|\*|!\[|\[")
+_image_pattern = re.compile(r'!\[(.*?)\]\((.*?)\)')
+_link_pattern = re.compile(r'\[(.*?)\]\((.*?)\)')
+_delimiters = {"`": TextType.CODE, "**": TextType.BOLD, "*": TextType.ITALIC}
+
+
+def scan_inline(text):
+    """
+    Tokenize inline Markdown in one left-to-right pass.
+
+    Returns (text_type, start, end, url_start, url_end) spans into `text`;
+    the url offsets are only meaningful for links and images. Code spans are
+    matched before anything else at their position, so `*` or `[` inside
+    backticks stays literal. Empty formatted sections are dropped, and an
+    unclosed delimiter raises ValueError like split_nodes_delimiter does.
+    """
+    spans = []
+    text_start = 0
+    pos = 0
+    search = _inline_token_pattern.search
+    while True:
+        match = search(text, pos)
+        if match is None:
+            break
+        token = match.group()
+        start = match.start()
+        text_type = _delimiters.get(token)
+        if text_type is not None:
+            inner_start = start + len(token)
+            inner_end = text.find(token, inner_start)
+            if inner_end == -1:
+                raise ValueError("Invalid markdown, formatted section not closed")
+            pos = inner_end + len(token)
+            if start > text_start:
+                spans.append((TextType.TEXT, text_start, start, 0, 0))
+            if inner_end > inner_start:
+                spans.append((text_type, inner_start, inner_end, 0, 0))
+            text_start = pos
+            continue
+        if token == "![":
+            link = _image_pattern.match(text, start)
+            text_type = TextType.IMAGE
+        else:
+            link = _link_pattern.match(text, start)
+            text_type = TextType.LINK
+        if link is None:
+            pos = start + len(token)
+            continue
+        if start > text_start:
+            spans.append((TextType.TEXT, text_start, start, 0, 0))
+        spans.append((text_type, link.start(1), link.end(1), link.start(2), link.end(2)))
+        pos = text_start = link.end()
+    if text_start < len(text):
+        spans.append((TextType.TEXT, text_start, len(text), 0, 0))
+    return spans
+
+
 def text_to_textnodes(text):
-    nodes = [TextNode(text, TextType.TEXT)]
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "*", TextType.ITALIC)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    nodes = []
+    for text_type, start, end, url_start, url_end in scan_inline(text):
+        if text_type is TextType.LINK or text_type is TextType.IMAGE:
+            nodes.append(TextNode(text[start:end], text_type, text[url_start:url_end]))
+        else:
+            nodes.append(TextNode(text[start:end], text_type))
     return nodes
 
 def markdown_to_blocks(markdown):
-    blocks = [block.strip() for block in markdown.split('\n\n')]
-    
-    blocks = [block for block in blocks if block]
-    
-    return blocks
+    return ["\n".join(lines) for _, lines in scan_blocks(markdown.split("\n"))]
 
 def block_to_block_type(block):
     """
@@ -261,85 +522,297 @@ def block_to_block_type(block):
         str: One of: 'paragraph', 'heading', 'code', 'quote', 
              'unordered_list', 'ordered_list'
     """
-    if not block:
-        return "paragraph"
-        
-    # Split into lines for multi-line analysis
-    lines = block.split('\n')
-    first_line = lines[0]
-    
-    # Check for heading (# followed by space)
-    if first_line.startswith(('#', '##', '###', '####', '#####', '######')):
-        parts = first_line.split(' ', 1)
-        if len(parts) > 1 and len(parts[0]) <= 6:
-            return "heading"
-            
-    # Check for code block (starts and ends with ```)
-    if block.startswith('```') and block.endswith('```'):
-        return "code"
-        
-    # Check for quote block (every line starts with >)
-    if all(line.startswith('>') for line in lines):
-        return "quote"
-        
-    # Check for unordered list (every line starts with * or -)
-    if all(line.strip().startswith(('* ', '- ')) for line in lines):
-        return "unordered_list"
-        
-    # Check for ordered list (lines start with 1. 2. 3. etc)
-    if all(line.strip() and line.strip()[0].isdigit() for line in lines):
-        expected_number = 1
-        for line in lines:
-            stripped = line.strip()
-            if not stripped.startswith(f"{expected_number}. "):
-                break
-            expected_number += 1
-        else:
-            return "ordered_list"
-            
-    # Default to paragraph
-    return "paragraph"
+    for block_type, _ in scan_blocks(block.split("\n")):
+        return block_type
+    return block_type_paragraph
 
 def extract_title(md):
-    lines = md.split("\n")
+    title = scan_metadata(md.split("\n")).title
+    if title is None:
+        raise ValueError("No title found")
+    return title
+
+
+def _first_title(lines):
+    # the same rule scan_blocks applies, without building any blocks
+    fence = False
     for line in lines:
-        if line.startswith("# "):
-            return line[2:]
-    raise ValueError("No title found")
-
-
-def generate_page(from_path, template_path, dest_path):
-    print(f" * {from_path} {template_path} -> {dest_path}")
-    from_file = open(from_path, "r")
-    markdown_content = from_file.read()
-    from_file.close()
-
-    template_file = open(template_path, "r")
-    template = template_file.read()
-    template_file.close()
-
-    node = markdown_to_html_node(markdown_content)
-    html = node.to_html()
-
-    title = extract_title(markdown_content)
-    template = template.replace("{{ Title }}", title)
-    template = template.replace("{{ Content }}", html)
-
-    dest_dir_path = os.path.dirname(dest_path)
-    if dest_dir_path != "":
-        os.makedirs(dest_dir_path, exist_ok=True)
-    to_file = open(dest_path, "w")
-    to_file.write(template)
-
-def generate_pages_recursive(dir_path_content, template_path, dest_dir_path):
-    for filename in os.listdir(dir_path_content):
-        from_path = os.path.join(dir_path_content, filename)
-        dest_path = os.path.join(dest_dir_path, filename)
-        if os.path.isfile(from_path):
-            dest_path = Path(dest_path).with_suffix(".html")
-            generate_page(from_path, template_path, dest_path)
+        if fence:
+            fence = not ("```" in line and _is_closing_fence(line))
+            continue
+        stripped = line.strip()
+        if stripped[:2] == "# " and _heading_level(stripped) == 1:
+            return stripped[2:]
+        fence = _is_fence(stripped)
+    return None
+
+
+def scan_metadata(lines):
+    """
+    Read a page's metadata: its front matter, and only when that sets no
+    title, the body lines up to the first level-1 heading.
+    """
+    front_matter, lines = split_front_matter(lines)
+    meta = PageMeta() if front_matter is None else PageMeta(parse_front_matter(front_matter))
+    if meta.title is None:
+        meta.title = _first_title(lines)
+    return meta
+
+
+def read_metadata(path):
+    with open(path, "r") as f:
+        return scan_metadata(f)
+
+
+def page_metadata(path, manifest=None, stat_cache=None):
+    """Metadata recorded by the manifest while the source is unchanged, otherwise read from the file."""
+    meta = None if manifest is None else manifest.metadata(path, stat_cache)
+    return read_metadata(path) if meta is None else meta
+
+
+# Markdown files at least this big are streamed from disk block by block
+STREAM_THRESHOLD = 8 * 1024 * 1024
+
+
+def render_page(markdown, template, profile=None, block_cache=None):
+    """Render Markdown source into a Template; returns (page HTML, PageMeta)."""
+    meta = PageMeta()
+    html = markdown_to_html(markdown, block_cache, profile, meta)
+    if meta.title is None:
+        raise ValueError("No title found")
+
+    with phase(profile, "template"):
+        context = meta.context()
+        context["Content"] = html
+        return template.render(context), meta
+
+
+def generate_page(from_path, template_path, dest_path, profile=None, block_cache=None, stream=None,
+                  compressor=None):
+    """
+    Render one Markdown file into the template at dest_path and return its
+    PageMeta, whose fields are passed to the template alongside Content.
+    The page replaces dest_path atomically, and is not written at all when
+    dest_path already holds the same bytes. The written bytes are handed to
+    compressor, a Precompressor, if given.
+
+    With stream=True (the default for files of STREAM_THRESHOLD bytes or
+    more) the source is read line by line and each block is written to the
+    output through the template's content slot as soon as it is rendered,
+    so memory use is bounded by the largest block instead of the page.
+    """
+    logging.info(f"Generating page: {from_path} -> {dest_path} ({template_path})")
+    if stream is None:
+        stream = os.path.getsize(from_path) >= STREAM_THRESHOLD
+    if stream:
+        return _stream_page(from_path, template_path, dest_path, profile, block_cache, compressor)
+    with phase(profile, "read"):
+        from_file = open(from_path, "r")
+        markdown_content = from_file.read()
+        from_file.close()
+
+    with phase(profile, "template"):
+        template = load_template(template_path)
+    page, meta = render_page(markdown_content, template, profile, block_cache)
+
+    with phase(profile, "write"):
+        _make_parent_dir(dest_path)
+        data = page.encode()
+        write_output(dest_path, data)
+    if compressor is not None:
+        with phase(profile, "write"):
+            compressor.add(dest_path, data)
+    if profile is not None:
+        profile.size = len(markdown_content)
+    return meta
+
+
+def _stream_page(from_path, template_path, dest_path, profile, block_cache, compressor):
+    with phase(profile, "read"):
+        meta = read_metadata(from_path)
+    if meta.title is None:
+        raise ValueError("No title found")
+    with phase(profile, "template"):
+        template = load_template(template_path)
+    _make_parent_dir(dest_path)
+    # block_split, inline and serialize run inside the write phase and are counted apart from it
+    with phase(profile, "write"):
+        with open(from_path, "r") as from_file, open_output(dest_path) as to_file:
+            def write_content(out):
+                blocks = scan_blocks(from_file)
+                if profile is not None:
+                    blocks = _timed_blocks(blocks, profile)
+                render_blocks(blocks, out.write, block_cache, profile)
+            context = meta.context()
+            context["Content"] = write_content
+            template.render_to(to_file, context)
+    if compressor is not None:
+        # the page was never held in memory as a whole, so it is read back
+        with phase(profile, "write"):
+            compressor.add_file(dest_path)
+    if profile is not None:
+        profile.size = os.path.getsize(from_path)
+    return meta
+
+
+def _timed_blocks(blocks, profile):
+    # a lazy scan does its work as each block is asked for
+    blocks = iter(blocks)
+    while True:
+        with phase(profile, "block_split"):
+            block = next(blocks, None)
+        if block is None:
+            return
+        yield block
+
+
+def _make_parent_dir(path):
+    dir_path = os.path.dirname(path)
+    if dir_path != "":
+        os.makedirs(dir_path, exist_ok=True)
+
+class BuildError(Exception):
+    def __init__(self, errors):
+        self.errors = errors
+        details = "\n".join(f"{path}: {error}" for path, error in errors)
+        super().__init__(f"{len(errors)} page(s) failed to build:\n{details}")
+
+
+def generate_pages_recursive(dir_path_content, template_path, dest_dir_path, manifest=None, profile=None,
+                             block_cache=None, stat_cache=None, site_index=None, compressor=None):
+    """
+    Render every page that is not current in the manifest. Returns the
+    (source, destination) pairs of the published pages; drafts are left out.
+    Every published page's metadata is added to site_index, if given.
+    """
+    if stat_cache is None:
+        stat_cache = StatCache()
+    pages = discover_pages(dir_path_content, dest_dir_path, stat_cache=stat_cache)
+    templates = TemplateResolver(dir_path_content, template_path, stat_cache)
+    published = []
+    for from_path, dest_path in pages:
+        meta = page_metadata(from_path, manifest, stat_cache)
+        if meta.draft:
+            continue
+        published.append((from_path, dest_path))
+        page_template = templates.resolve(from_path, meta.template)
+        if manifest is not None and manifest.is_current(from_path, page_template, dest_path, stat_cache):
+            _index_page(site_index, from_path, dest_path, meta, stat_cache)
+            continue
+        page_profile = None if profile is None else profile.page(from_path)
+        meta = generate_page(from_path, page_template, dest_path, page_profile, block_cache,
+                             compressor=compressor)
+        if manifest is not None:
+            manifest.record(from_path, page_template, dest_path, stat_cache, meta)
+        _index_page(site_index, from_path, dest_path, meta, stat_cache)
+    return published
+
+
+def _index_page(site_index, from_path, dest_path, meta, stat_cache):
+    if site_index is not None:
+        site_index.add(from_path, dest_path, meta, stat_cache.stat(from_path).st_size)
+
+
+# per-process block cache and precompressor for pool workers, loaded by _init_page_worker
+_worker_block_cache = None
+_worker_compressor = None
+
+
+def _init_page_worker(block_cache_path, block_cache_size, asset_urls=None, compressor_options=None, clean=False):
+    global _worker_block_cache, _worker_compressor
+    salt = set_asset_urls(asset_urls)
+    if block_cache_path is not None:
+        if clean:
+            _worker_block_cache = BlockCache(block_cache_path, block_cache_size)
         else:
-            generate_pages_recursive(from_path, template_path, dest_path)
+            _worker_block_cache = BlockCache.load(block_cache_path, block_cache_size)
+        _worker_block_cache.salt = salt
+        _worker_block_cache.track_changes = True
+    if compressor_options is not None:
+        path, min_size, level = compressor_options
+        # the worker processes are the pool here, so each compresses inline
+        if clean:
+            _worker_compressor = Precompressor(path, min_size, level, workers=0)
+        else:
+            _worker_compressor = Precompressor.load(path, min_size, level, workers=0)
+        _worker_compressor.track_changes = True
+
+
+def _render_job(job, block_cache, compressor=None):
+    from_path, template_path, dest_path = job
+    try:
+        generate_page(from_path, template_path, dest_path, block_cache=block_cache, compressor=compressor)
+    except Exception:
+        return traceback.format_exc().rstrip()
+    return None
+
 
+def _generate_page_worker(job):
+    error = _render_job(job, _worker_block_cache, _worker_compressor)
+    changes = None if _worker_block_cache is None else _worker_block_cache.take_changes()
+    compressed = None if _worker_compressor is None else _worker_compressor.take_changes()
+    return error, (changes, compressed)
 
 
+def generate_pages_parallel(dir_path_content, template_path, dest_dir_path, manifest=None, workers=None,
+                            block_cache=None, stat_cache=None, site_index=None, compressor=None, clean=False):
+    """
+    Render pages on a process pool.
+
+    All pages are discovered up front and fanned out to `workers` processes
+    (defaults to the CPU count). Results are collected in discovery order, so
+    the manifest and error report are deterministic; every failing page is
+    reported in a single BuildError once the rest of the site is written.
+    Each worker loads the block cache from disk once and sends back what it
+    added, which is merged into `block_cache`; likewise what each worker
+    precompressed is merged into `compressor`. With clean=True the workers
+    start from empty ones instead, as a clean build's caches do.
+    """
+    if stat_cache is None:
+        stat_cache = StatCache()
+    pages = discover_pages(dir_path_content, dest_dir_path, stat_cache=stat_cache)
+    templates = TemplateResolver(dir_path_content, template_path, stat_cache)
+    published = []
+    jobs = []
+    metas = []
+    for from_path, dest_path in pages:
+        meta = page_metadata(from_path, manifest, stat_cache)
+        if meta.draft:
+            continue
+        published.append((from_path, dest_path))
+        _index_page(site_index, from_path, dest_path, meta, stat_cache)
+        page_template = templates.resolve(from_path, meta.template)
+        if manifest is None or not manifest.is_current(from_path, page_template, dest_path, stat_cache):
+            jobs.append((from_path, page_template, dest_path))
+            metas.append(meta)
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = min(workers, len(jobs))
+    if workers <= 1:
+        results = ((_render_job(job, block_cache, compressor), (None, None)) for job in jobs)
+        return _collect_page_results(published, jobs, metas, results, manifest, block_cache, stat_cache,
+                                     compressor)
+    chunksize = max(1, len(jobs) // (workers * 4))
+    initargs = (None, None) if block_cache is None else (block_cache.path, block_cache.max_size)
+    initargs += (asset_urls(),)
+    initargs += (None if compressor is None else (compressor.path, compressor.min_size, compressor.level), clean)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_page_worker, initargs=initargs) as executor:
+        results = executor.map(_generate_page_worker, jobs, chunksize=chunksize)
+        return _collect_page_results(published, jobs, metas, results, manifest, block_cache, stat_cache,
+                                     compressor)
+
+
+def _collect_page_results(pages, jobs, metas, results, manifest, block_cache, stat_cache, compressor=None):
+    errors = []
+    for (from_path, template_path, dest_path), meta, (error, (changes, compressed)) in zip(jobs, metas, results):
+        if changes is not None and block_cache is not None:
+            block_cache.merge_changes(changes)
+        if compressed is not None and compressor is not None:
+            compressor.merge_changes(compressed)
+        if error is not None:
+            errors.append((from_path, error))
+        elif manifest is not None:
+            manifest.record(from_path, template_path, dest_path, stat_cache, meta)
+    if errors:
+        raise BuildError(errors)
+    return pages
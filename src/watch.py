@@ -0,0 +1,317 @@
+import os
+import time
+import logging
+import threading
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+from assets import set_asset_urls
+from discovery import CONTENT_IGNORE_PATTERNS, PAGE_PATTERNS, PathFilter, scan_tree
+from siteindex import SiteIndex, write_site_index
+from sync import copy_file
+from templates import OVERRIDE_TEMPLATE_NAME, TemplateResolver
+from textutils import generate_page, generate_pages_recursive, read_metadata
+
+# the manifest is saved once the watched files have been quiet for this many seconds
+SAVE_DELAY = 2.0
+LIVERELOAD_PATH = "/__livereload"
+LIVERELOAD_SCRIPT = (
+    f'<script>new EventSource("{LIVERELOAD_PATH}").onmessage = function () {{ location.reload(); }};</script>'
+)
+
+
+def snapshot(paths, path_filter=None):
+    """
+    Map every file under the given files/directories to (mtime_ns, size),
+    skipping what path_filter ignores (by default editor swap files, so
+    saving in an editor does not trigger extra rebuilds).
+    """
+    stats = {}
+    for root in paths:
+        try:
+            st = os.stat(root)
+        except FileNotFoundError:
+            continue
+        if not os.path.isdir(root):
+            stats[os.path.normpath(root)] = (st.st_mtime_ns, st.st_size)
+            continue
+        for path, st in scan_tree(root, path_filter):
+            stats[path] = (st.st_mtime_ns, st.st_size)
+    return stats
+
+
+def diff_snapshots(old, new):
+    changed = [path for path, stat in new.items() if old.get(path) != stat]
+    removed = [path for path in old if path not in new]
+    return changed, removed
+
+
+def _is_within(path, root):
+    return os.path.commonpath([path, root]) == root
+
+
+class SiteWatcher():
+    """
+    Polls the content, static and template paths with a stat cache and
+    rebuilds only what a change affects: one page for a content edit, one
+    file for a static edit, and the manifest-driven incremental build for
+    template edits. With fingerprinted assets, a static edit that changes an
+    asset's URL goes through the incremental build as well. Given a
+    Precompressor, every output the watcher writes gets its variants
+    refreshed, and every output it removes loses them.
+
+    Listings, the sitemap and the feed are only written again when a
+    page's recorded metadata changes or pages come and go, and the search
+    index is updated for the edited pages alone. The manifest is saved
+    once edits have stopped for SAVE_DELAY seconds, and everything else
+    the watcher holds by save() on exit.
+    """
+
+    def __init__(self, content_dir, static_dir, template_path, public_dir, manifest, link=False,
+                 block_cache=None, base_url=None, per_page=10, search_index=None, assets=None, compressor=None):
+        self.content_dir = os.path.normpath(content_dir)
+        self.static_dir = os.path.normpath(static_dir)
+        self.template_path = os.path.normpath(template_path)
+        self.public_dir = os.path.normpath(public_dir)
+        self.manifest = manifest
+        self.link = link
+        self.block_cache = block_cache
+        self.base_url = base_url
+        self.per_page = per_page
+        self.search_index = search_index
+        self.assets = assets
+        self.compressor = compressor
+        self.content_filter = PathFilter(ignore=CONTENT_IGNORE_PATTERNS)
+        self.page_filter = PathFilter(PAGE_PATTERNS, CONTENT_IGNORE_PATTERNS)
+        self.stats = self._snapshot()
+        self._unsaved_since = None
+
+    def _snapshot(self):
+        # content/ hides its dotfiles, static/ publishes them
+        stats = snapshot([self.content_dir], self.content_filter)
+        stats.update(snapshot([self.static_dir, self.template_path]))
+        return stats
+
+    def poll(self):
+        stats = self._snapshot()
+        changed, removed = diff_snapshots(self.stats, stats)
+        self.stats = stats
+        if not changed and not removed:
+            if self._unsaved_since is not None and time.monotonic() - self._unsaved_since >= SAVE_DELAY:
+                self.manifest.save()
+                self._unsaved_since = None
+            return []
+        self.rebuild(changed, removed)
+        self._unsaved_since = time.monotonic()
+        return changed + removed
+
+    def save(self):
+        """Save the manifest and every cache the watcher updates."""
+        self.manifest.save()
+        self._unsaved_since = None
+        if self.block_cache is not None:
+            self.block_cache.save()
+        if self.search_index is not None:
+            self.search_index.save()
+        if self.compressor is not None:
+            self.compressor.wait()
+            self.compressor.save()
+
+    def rebuild(self, changed, removed):
+        templates_changed = False
+        index_changed = False
+        # (source, output, PageMeta) of every page rendered, for the search index
+        rendered = []
+        if self.assets is not None and any(_is_within(path, self.static_dir) for path in changed + removed):
+            templates_changed = self._refresh_assets()
+        for path in changed:
+            if path == self.template_path or os.path.basename(path) == OVERRIDE_TEMPLATE_NAME:
+                templates_changed = True
+            elif _is_within(path, self.content_dir):
+                if self.page_filter.accepts(os.path.basename(path)):
+                    index_changed |= self._render_page(path, rendered)
+            elif _is_within(path, self.static_dir):
+                dest = self._static_dest(path)
+                copy_file(path, dest, link=self.link)
+                self._compress(dest)
+        for path in removed:
+            if path == self.template_path:
+                continue
+            if os.path.basename(path) == OVERRIDE_TEMPLATE_NAME:
+                templates_changed = True
+            elif _is_within(path, self.content_dir):
+                if self.page_filter.accepts(os.path.basename(path)):
+                    index_changed |= self._remove_page(path)
+            elif _is_within(path, self.static_dir):
+                self._remove_output(self._static_dest(path))
+        site_index = None
+        if templates_changed:
+            site_index = SiteIndex(self.public_dir)
+            generate_pages_recursive(self.content_dir, self.template_path, self.public_dir, self.manifest,
+                                     block_cache=self.block_cache, site_index=site_index,
+                                     compressor=self.compressor)
+        elif index_changed:
+            site_index = SiteIndex.from_manifest(self.manifest, self.public_dir)
+        if site_index is not None:
+            for path in write_site_index(site_index, self.template_path, self.base_url, self.per_page):
+                self._compress(path)
+        if self.search_index is not None:
+            if templates_changed:
+                self.search_index.update(site_index)
+            else:
+                urls = SiteIndex(self.public_dir)
+                for source, dest, meta in rendered:
+                    self.search_index.update_page(source, urls.url(dest), meta.title)
+            self.search_index.write(self.public_dir)
+        if self.compressor is not None:
+            self.compressor.wait()
+
+    def _refresh_assets(self):
+        """Re-hash the static assets; True when their URLs changed and every page needs rendering again."""
+        self.assets.update(self.static_dir)
+        for path in self.assets.write(self.static_dir, self.public_dir, link=self.link):
+            self._compress(path)
+        self.assets.save()
+        digest = set_asset_urls(self.assets.urls())
+        if digest == self.manifest.assets:
+            return False
+        self.manifest.assets = digest
+        if self.block_cache is not None:
+            self.block_cache.salt = digest
+        return True
+
+    def _page_dest(self, path):
+        rel_path = os.path.relpath(path, self.content_dir)
+        return Path(os.path.join(self.public_dir, rel_path)).with_suffix(".html")
+
+    def _static_dest(self, path):
+        dest = os.path.join(self.public_dir, os.path.relpath(path, self.static_dir))
+        os.makedirs(os.path.dirname(dest), exist_ok=True)
+        return dest
+
+    def _render_page(self, path, rendered):
+        """Render one page and add it to rendered; True when the site index needs writing again."""
+        dest = self._page_dest(path)
+        meta = read_metadata(path)
+        if meta.draft:
+            return self._remove_page(path)
+        entry = self.manifest.entries.get(path)
+        # a fresh resolver picks up overrides added since the last rebuild
+        template = TemplateResolver(self.content_dir, self.template_path).resolve(path, meta.template)
+        meta = generate_page(path, template, dest, block_cache=self.block_cache, compressor=self.compressor)
+        self.manifest.record(path, template, dest, meta=meta)
+        rendered.append((path, dest, meta))
+        return entry is None or entry.get("meta") != meta.to_dict()
+
+    def _remove_page(self, path):
+        """Unpublish a removed or drafted page; True when it had been published."""
+        self._remove_output(self._page_dest(path))
+        if self.search_index is not None:
+            self.search_index.remove_page(path)
+        return self.manifest.entries.pop(path, None) is not None
+
+    def _compress(self, path):
+        # unchanged outputs are skipped by their size and mtime
+        if self.compressor is not None:
+            self.compressor.add_file(path)
+
+    def _remove_output(self, dest):
+        if os.path.exists(dest):
+            logging.info(f"Removing: {dest}")
+            os.remove(dest)
+        if self.compressor is not None:
+            self.compressor.remove(dest)
+
+
+class LiveReloadHandler(SimpleHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path == LIVERELOAD_PATH:
+            self._stream_reload_events()
+            return
+        path = self.translate_path(self.path)
+        if os.path.isdir(path) and self.path.split("?", 1)[0].endswith("/"):
+            path = os.path.join(path, "index.html")
+        if path.endswith(".html") and os.path.isfile(path):
+            self._send_html(path)
+            return
+        super().do_GET()
+
+    def _send_html(self, path):
+        with open(path, "rb") as f:
+            body = f.read()
+        script = LIVERELOAD_SCRIPT.encode()
+        if b"</body>" in body:
+            body = body.replace(b"</body>", script + b"</body>", 1)
+        else:
+            body += script
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream_reload_events(self):
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Cache-Control", "no-store")
+        self.end_headers()
+        server = self.server
+        with server.reload_condition:
+            seen = server.reload_generation
+        try:
+            while True:
+                with server.reload_condition:
+                    server.reload_condition.wait_for(lambda: server.reload_generation != seen, timeout=15)
+                    generation = server.reload_generation
+                if generation != seen:
+                    seen = generation
+                    self.wfile.write(b"data: reload\n\n")
+                else:
+                    self.wfile.write(b": ping\n\n")
+                self.wfile.flush()
+        except (BrokenPipeError, ConnectionResetError):
+            pass
+
+
+class LiveReloadServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, address, public_dir):
+        super().__init__(address, partial(LiveReloadHandler, directory=public_dir))
+        self.reload_condition = threading.Condition()
+        self.reload_generation = 0
+
+    def notify_reload(self):
+        with self.reload_condition:
+            self.reload_generation += 1
+            self.reload_condition.notify_all()
+
+
+def watch(watcher, port=8888, interval=0.1):
+    server = LiveReloadServer(("", port), watcher.public_dir)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    print(f"Serving {watcher.public_dir} on http://localhost:{port}, watching for changes...")
+    try:
+        while True:
+            time.sleep(interval)
+            start = time.perf_counter()
+            try:
+                changes = watcher.poll()
+            except Exception as e:
+                logging.error(f"Rebuild failed: {e}")
+                continue
+            if changes:
+                elapsed = (time.perf_counter() - start) * 1000
+                print(f"Rebuilt {len(changes)} change(s) in {elapsed:.1f} ms")
+                server.notify_reload()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        watcher.save()